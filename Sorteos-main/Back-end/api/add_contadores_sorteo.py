@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Script para agregar los contadores materializados a la tabla sorteo
+(total_participantes, total_elegibles, total_ganadores) y calcularlos.
+También sirve para reconstruirlos si se desvían: las columnas existentes no
+se tocan y los contadores se recalculan desde detalle_sorteo.
+"""
+
+import mysql.connector
+from config.database import DB_CONFIG
+from services.contadores import ContadoresSorteo
+
+COLUMNAS = ("total_participantes", "total_elegibles", "total_ganadores")
+
+def add_contadores_sorteo():
+    """Agrega las columnas de contadores y las completa"""
+    connection = None
+    cursor = None
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        for columna in COLUMNAS:
+            cursor.execute("""
+                SELECT COUNT(*)
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'sorteo' AND COLUMN_NAME = %s
+            """, (DB_CONFIG['database'], columna))
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(f"ALTER TABLE sorteo ADD COLUMN {columna} INT NOT NULL DEFAULT 0")
+                print(f"✅ Columna '{columna}' agregada a la tabla 'sorteo'")
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        return
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+    corregidos = ContadoresSorteo.recalcular()
+    print(f"✅ Contadores recalculados ({corregidos} sorteos actualizados)")
+
+if __name__ == "__main__":
+    print("Agregando contadores a la tabla sorteo...")
+    add_contadores_sorteo()
+    print("Proceso completado.")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script para agregar el índice (id_sorteo, id) a la tabla detalle_sorteo.
+
+El selector aleatorio de participantes consulta MIN(id)/MAX(id) por sorteo;
+con este índice esa consulta se resuelve leyendo solo los extremos.
+"""
+
+import mysql.connector
+from config.database import DB_CONFIG
+
+def add_indice_rango_detalle_sorteo():
+    """Agrega el índice idx_detalle_sorteo_rango a detalle_sorteo"""
+    connection = None
+    cursor = None
+    
+    try:
+        # Conectar a la base de datos
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+        
+        # Verificar si el índice ya existe
+        check_index_query = """
+        SELECT COUNT(*) 
+        FROM INFORMATION_SCHEMA.STATISTICS 
+        WHERE TABLE_SCHEMA = %s 
+        AND TABLE_NAME = 'detalle_sorteo' 
+        AND INDEX_NAME = 'idx_detalle_sorteo_rango'
+        """
+        
+        cursor.execute(check_index_query, (DB_CONFIG['database'],))
+        index_exists = cursor.fetchone()[0] > 0
+        
+        if index_exists:
+            print("El índice 'idx_detalle_sorteo_rango' ya existe en la tabla 'detalle_sorteo'")
+            return
+        
+        # Crear el índice sin bloquear escrituras
+        alter_query = """
+        ALTER TABLE detalle_sorteo 
+        ADD INDEX idx_detalle_sorteo_rango (id_sorteo, id), 
+        ALGORITHM=INPLACE, LOCK=NONE
+        """
+        
+        cursor.execute(alter_query)
+        connection.commit()
+        
+        print("✅ Índice 'idx_detalle_sorteo_rango' agregado exitosamente a la tabla 'detalle_sorteo'")
+        
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        if connection:
+            connection.rollback()
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Agregando índice (id_sorteo, id) a la tabla detalle_sorteo...")
+    add_indice_rango_detalle_sorteo()
+    print("Proceso completado.")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Script para agregar los índices de las consultas frecuentes y quitar el
+índice único duplicado de detalle_sorteo.
+
+- detalle_sorteo (id_sorteo, estado, documento_participante): índice
+  compuesto para el filtro por sorteo y estado de los sorteos, las listas de
+  ganadores y los participantes elegibles. No es un índice que cubra esas
+  consultas: leen ds.* y unen participantes, así que MySQL sigue leyendo las
+  filas encontradas, solo que ya no recorre las del resto del sorteo.
+- sorteo (estado, fecha_creacion): índice compuesto para el filtro y el orden
+  del listado de sorteos activos (sin ordenar aparte).
+- detalle_sorteo tenía dos índices únicos iguales sobre
+  (id_sorteo, documento_participante); se conserva uq_sorteo_participante.
+
+Después de aplicarlo, `python analizar_consultas.py` verifica los planes.
+"""
+
+import mysql.connector
+from config.database import DB_CONFIG
+
+INDICES = [
+    ("detalle_sorteo", "idx_detalle_sorteo_estado", "(id_sorteo, estado, documento_participante)"),
+    ("sorteo", "idx_sorteo_estado_fecha", "(estado, fecha_creacion)"),
+]
+
+INDICES_DUPLICADOS = [
+    # (tabla, índice a quitar, índice equivalente que se conserva)
+    ("detalle_sorteo", "unique_sorteo_participante", "uq_sorteo_participante"),
+]
+
+def _indice_existe(cursor, tabla: str, indice: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (DB_CONFIG['database'], tabla, indice))
+    return cursor.fetchone()[0] > 0
+
+def add_indices_consultas():
+    """Crea los índices que falten y quita los duplicados"""
+    connection = None
+    cursor = None
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        for tabla, indice, columnas in INDICES:
+            if _indice_existe(cursor, tabla, indice):
+                print(f"El índice '{indice}' ya existe en la tabla '{tabla}'")
+                continue
+            # Crear el índice sin bloquear escrituras
+            cursor.execute(f"ALTER TABLE {tabla} ADD INDEX {indice} {columnas}, ALGORITHM=INPLACE, LOCK=NONE")
+            print(f"✅ Índice '{indice}' {columnas} agregado a la tabla '{tabla}'")
+
+        for tabla, indice, conservado in INDICES_DUPLICADOS:
+            if not _indice_existe(cursor, tabla, indice):
+                continue
+            if not _indice_existe(cursor, tabla, conservado):
+                print(f"⚠️  No se quita '{indice}': falta '{conservado}' en la tabla '{tabla}'")
+                continue
+            cursor.execute(f"ALTER TABLE {tabla} DROP INDEX {indice}, ALGORITHM=INPLACE, LOCK=NONE")
+            print(f"✅ Índice duplicado '{indice}' eliminado de la tabla '{tabla}'")
+
+        connection.commit()
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Actualizando índices de sorteo y detalle_sorteo...")
+    add_indices_consultas()
+    print("Proceso completado.")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script para agregar el número de participante por sorteo (detalle_sorteo.numero)
+y su contador (sorteo.ultimo_numero), numerando las asignaciones existentes
+en el orden en que se crearon.
+"""
+
+import mysql.connector
+from config.database import DB_CONFIG
+
+def columna_existe(cursor, tabla, columna):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (DB_CONFIG['database'], tabla, columna))
+    return cursor.fetchone()[0] > 0
+
+def add_numero_detalle_sorteo():
+    """Agrega y completa las columnas de numeración de participantes"""
+    connection = None
+    cursor = None
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        if not columna_existe(cursor, 'sorteo', 'ultimo_numero'):
+            cursor.execute("ALTER TABLE sorteo ADD COLUMN ultimo_numero INT NOT NULL DEFAULT 0")
+            print("✅ Columna 'ultimo_numero' agregada a la tabla 'sorteo'")
+
+        if not columna_existe(cursor, 'detalle_sorteo', 'numero'):
+            cursor.execute("ALTER TABLE detalle_sorteo ADD COLUMN numero INT NULL AFTER id_sorteo")
+            print("✅ Columna 'numero' agregada a la tabla 'detalle_sorteo'")
+
+        # Numerar las asignaciones existentes por sorteo, en orden de creación
+        cursor.execute("""
+            UPDATE detalle_sorteo ds
+            JOIN (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY id_sorteo ORDER BY id) AS numero
+                FROM detalle_sorteo
+            ) n ON n.id = ds.id
+            SET ds.numero = n.numero
+            WHERE ds.numero IS NULL
+        """)
+        print(f"✅ {cursor.rowcount} asignaciones numeradas")
+
+        # El contador de cada sorteo continúa desde su número más alto
+        cursor.execute("""
+            UPDATE sorteo s
+            JOIN (
+                SELECT id_sorteo, MAX(numero) AS ultimo
+                FROM detalle_sorteo
+                GROUP BY id_sorteo
+            ) m ON m.id_sorteo = s.id
+            SET s.ultimo_numero = GREATEST(s.ultimo_numero, m.ultimo)
+        """)
+        connection.commit()
+
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'detalle_sorteo' AND INDEX_NAME = 'uq_sorteo_numero'
+        """, (DB_CONFIG['database'],))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("ALTER TABLE detalle_sorteo ADD UNIQUE KEY uq_sorteo_numero (id_sorteo, numero)")
+            print("✅ Índice único 'uq_sorteo_numero' creado")
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        if connection:
+            connection.rollback()
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Agregando número de participante por sorteo...")
+    add_numero_detalle_sorteo()
+    print("Proceso completado.")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Script para agregar la columna version a la tabla sorteo. La API la
+incrementa en cada cambio de los datos del sorteo para invalidar la caché
+en memoria de cada proceso (services/cache_sorteos.py).
+"""
+
+import mysql.connector
+from config.database import DB_CONFIG
+
+def add_version_sorteo():
+    """Agrega la columna version a la tabla sorteo si no existe"""
+    connection = None
+    cursor = None
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'sorteo' AND COLUMN_NAME = 'version'
+        """, (DB_CONFIG['database'],))
+
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("ALTER TABLE sorteo ADD COLUMN version INT NOT NULL DEFAULT 0")
+            connection.commit()
+            print("✅ Columna 'version' agregada a la tabla 'sorteo'")
+        else:
+            print("La columna 'version' ya existe en la tabla 'sorteo'")
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Agregando columna version a la tabla sorteo...")
+    add_version_sorteo()
+    print("Proceso completado.")
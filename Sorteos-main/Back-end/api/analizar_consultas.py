@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Revisa el plan de ejecución de las consultas SQL de los servicios.
+
+Extrae del código fuente (sin importarlo) cada cadena que empieza con
+SELECT, UPDATE o DELETE, reemplaza los %s por valores de ejemplo tomados de
+la base de datos (el sorteo con más participantes, uno de sus documentos) y
+ejecuta EXPLAIN sobre ella. Marca los recorridos completos de tablas con
+muchas filas y los "Using filesort" / "Using temporary" sobre muchas filas.
+
+Debe ejecutarse contra una base con datos representativos (ver
+generar_datos.py): con tablas casi vacías el optimizador prefiere
+recorrerlas completas y los avisos no sirven.
+EXPLAIN no ejecuta las sentencias UPDATE/DELETE.
+
+Uso:
+    python analizar_consultas.py [--umbral-filas 1000] [archivo.py ...]
+
+Retorna 1 si alguna consulta quedó marcada (útil en CI).
+"""
+
+import argparse
+import ast
+import glob
+import re
+import sys
+
+import mysql.connector
+from config.database import DB_CONFIG
+
+ARCHIVOS = sorted(glob.glob("services/*.py") + glob.glob("database/*.py"))
+
+_SENTENCIA = re.compile(r"^\s*(SELECT|UPDATE|DELETE)\b", re.IGNORECASE)
+# Columna (o palabra clave) inmediatamente antes de un %s
+_CONTEXTO = re.compile(
+    r"(?:(\w+)\s*(?:=|<=|>=|<|>|!=|LIKE)\s*|(\w+)\s+(?:NOT\s+)?IN\s*\(\s*(?:%s\s*,\s*)*|\b(LIMIT|OFFSET)\s+|(\w+)\s*\(\s*\w+\s*,\s*(?:%s\s*,\s*)*)$",
+    re.IGNORECASE
+)
+_DINAMICA = "\0"
+
+
+def _texto(nodo) -> str:
+    """El texto de una cadena o f-string; las partes que no son listas de %s quedan marcadas como dinámicas"""
+    if isinstance(nodo, ast.Constant):
+        return nodo.value
+    partes = []
+    for valor in nodo.values:
+        if isinstance(valor, ast.Constant):
+            partes.append(valor.value)
+        elif "placeholders" in ast.unparse(valor.value):
+            # p.ej. {placeholders} = "%s, %s, ..."
+            partes.append("%s, %s")
+        else:
+            partes.append(_DINAMICA)
+    return "".join(partes)
+
+
+def extraer_consultas(archivo: str):
+    """Retorna [(línea, sql)] con las consultas SELECT/UPDATE/DELETE del archivo"""
+    with open(archivo, encoding="utf-8") as f:
+        arbol = ast.parse(f.read(), filename=archivo)
+
+    consultas = []
+    anidadas = set()
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.JoinedStr):
+            anidadas.update(id(valor) for valor in nodo.values)
+    for nodo in ast.walk(arbol):
+        if id(nodo) in anidadas:
+            continue
+        if isinstance(nodo, ast.Constant) and isinstance(nodo.value, str) or isinstance(nodo, ast.JoinedStr):
+            sql = _texto(nodo)
+            if _SENTENCIA.match(sql):
+                consultas.append((nodo.lineno, sql))
+    return sorted(consultas)
+
+
+def _valor_ejemplo(antes: str, muestras: dict) -> str:
+    contexto = _CONTEXTO.search(antes)
+    nombre = ""
+    if contexto:
+        nombre = next(grupo for grupo in contexto.groups() if grupo).lower()
+    if nombre in ("limit", "offset"):
+        return "100" if nombre == "limit" else "0"
+    if "documento" in nombre:
+        return f"'{muestras['documento']}'"
+    if "estado" in nombre:
+        return "'participando'"
+    if "fecha" in nombre:
+        return "NOW()"
+    if nombre in ("nombre", "descripcion", "tipo", "imagen", "datos"):
+        return "'x'"
+    if nombre in ("id_sorteo", "sorteo_id") or "sorteo" in antes[-60:].lower() and nombre == "id":
+        return str(muestras["sorteo_id"])
+    return "1"
+
+
+def completar_parametros(sql: str, muestras: dict) -> str:
+    """Reemplaza cada %s por un literal de ejemplo según la columna con la que se compara"""
+    partes = sql.split("%s")
+    resultado = partes[0]
+    for i, parte in enumerate(partes[1:], start=1):
+        # El contexto se toma del SQL original, así todos los %s de un IN (...) se ven igual
+        resultado += _valor_ejemplo("%s".join(partes[:i]), muestras) + parte
+    return resultado
+
+
+def obtener_muestras(cursor) -> dict:
+    """El sorteo con más participantes y uno de sus documentos"""
+    cursor.execute("""
+        SELECT id_sorteo, COUNT(*) AS cantidad
+        FROM detalle_sorteo
+        GROUP BY id_sorteo
+        ORDER BY cantidad DESC
+        LIMIT 1
+    """)
+    fila = cursor.fetchone()
+    if not fila:
+        return {"sorteo_id": 1, "documento": "0"}
+    cursor.execute(
+        "SELECT documento_participante FROM detalle_sorteo WHERE id_sorteo = %s LIMIT 1",
+        (fila["id_sorteo"],)
+    )
+    return {"sorteo_id": fila["id_sorteo"], "documento": cursor.fetchone()["documento_participante"]}
+
+
+def revisar_plan(plan: list, umbral_filas: int) -> list:
+    """Los problemas de un resultado de EXPLAIN"""
+    problemas = []
+    for fila in plan:
+        tabla = fila.get("table")
+        filas = int(fila.get("rows") or 0)
+        extra = fila.get("Extra") or ""
+        if fila.get("type") == "ALL" and filas >= umbral_filas:
+            problemas.append(f"recorrido completo de {tabla} (~{filas} filas)")
+        elif fila.get("type") == "index" and filas >= umbral_filas and "Using index" not in extra:
+            problemas.append(f"recorrido completo del índice {fila.get('key')} de {tabla} (~{filas} filas)")
+        # Ordenar unas pocas filas (p.ej. los ganadores de un sorteo) no es un problema
+        if "Using filesort" in extra and filas >= umbral_filas:
+            problemas.append(f"filesort en {tabla} (~{filas} filas)")
+        if "Using temporary" in extra and filas >= umbral_filas:
+            problemas.append(f"tabla temporal en {tabla} (~{filas} filas)")
+    return problemas
+
+
+def analizar_consultas(archivos, umbral_filas: int) -> int:
+    """Ejecuta EXPLAIN sobre las consultas de los archivos y retorna cuántas quedaron marcadas"""
+    connection = None
+    cursor = None
+    marcadas = 0
+    omitidas = 0
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor(dictionary=True)
+        muestras = obtener_muestras(cursor)
+        print(f"Valores de ejemplo: sorteo {muestras['sorteo_id']}, documento {muestras['documento']}")
+
+        for archivo in archivos:
+            for linea, sql in extraer_consultas(archivo):
+                resumen = " ".join(sql.split())[:90]
+                if _DINAMICA in sql:
+                    omitidas += 1
+                    print(f"  {archivo}:{linea} (omitida: SQL armado dinámicamente) {resumen}")
+                    continue
+                try:
+                    cursor.execute("EXPLAIN " + completar_parametros(sql, muestras))
+                    plan = cursor.fetchall()
+                except mysql.connector.Error as err:
+                    omitidas += 1
+                    print(f"  {archivo}:{linea} (omitida: {err.msg}) {resumen}")
+                    continue
+
+                problemas = revisar_plan(plan, umbral_filas)
+                if problemas:
+                    marcadas += 1
+                    print(f"❌ {archivo}:{linea} {resumen}")
+                    for problema in problemas:
+                        print(f"     - {problema}")
+                    for fila in plan:
+                        print(f"       {fila.get('table')}: type={fila.get('type')} key={fila.get('key')} rows={fila.get('rows')} extra={fila.get('Extra')}")
+                else:
+                    print(f"✅ {archivo}:{linea} {resumen}")
+
+        connection.rollback()
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        return -1
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+    print(f"\n{marcadas} consultas con problemas, {omitidas} omitidas")
+    return marcadas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN de las consultas de los servicios")
+    parser.add_argument("archivos", nargs="*", default=ARCHIVOS)
+    parser.add_argument("--umbral-filas", type=int, default=1000,
+                        help="filas estimadas a partir de las cuales un recorrido completo, filesort o tabla temporal se marca")
+    args = parser.parse_args()
+
+    resultado = analizar_consultas(args.archivos, args.umbral_filas)
+    sys.exit(0 if resultado == 0 else 1)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Prueba de estrés de sorteos concurrentes.
+
+Crea sorteos temporales, lanza muchos hilos que sortean y marcan ganadores a la
+vez (como varias consolas de la sala de control, o solicitudes reintentadas) y
+verifica que ningún sorteo termine con más ganadores que cantidad_premio.
+
+Uso:
+    python benchmark_concurrencia.py --sorteos 4 --participantes 2000 --premios 25 --hilos 32
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config.database as database
+from config.database import DatabaseConnection
+from database import bulk
+from models.participante import Participante
+from services.sorteo_service import SorteoService
+
+PREFIJO = "bench_concurrencia"
+
+
+def crear_sorteo_de_prueba(indice: int, participantes: int, premios: int, simultaneos: int) -> int:
+    """Crea un sorteo con participantes sintéticos y retorna su ID"""
+    lista = [
+        Participante(documento=f"{PREFIJO}_{indice}_{n}", nombre=f"Participante {n}")
+        for n in range(participantes)
+    ]
+    resultado = SorteoService.crear_sorteo_con_participantes(f"{PREFIJO}_{indice}", lista)
+    if not resultado.sorteo_id:
+        raise RuntimeError(f"No se pudo crear el sorteo de prueba: {resultado.errores}")
+    SorteoService.actualizar_sorteo(resultado.sorteo_id, cantidad_premio=premios, ganadores_simultaneos=simultaneos)
+    return resultado.sorteo_id
+
+
+def contar_ganadores(sorteo_id: int) -> int:
+    resultado = DatabaseConnection.execute_query(
+        "SELECT COUNT(*) as total FROM detalle_sorteo WHERE id_sorteo = %s AND estado = 'ganador'",
+        (sorteo_id,),
+        fetch_one=True
+    )
+    return resultado['total']
+
+
+def contador_ganadores(sorteo_id: int) -> int:
+    """Valor del contador materializado (debe coincidir con contar_ganadores)"""
+    resultado = DatabaseConnection.execute_query(
+        "SELECT total_ganadores FROM sorteo WHERE id = %s",
+        (sorteo_id,),
+        fetch_one=True
+    )
+    return resultado['total_ganadores']
+
+
+def limpiar():
+    """Elimina los sorteos y participantes creados por la prueba"""
+    # Prefijo literal y con mayúsculas exactas: "_" no actúa como comodín
+    patron = bulk.patron_prefijo(f"{PREFIJO}_")
+    DatabaseConnection.execute_query("DELETE FROM sorteo WHERE nombre LIKE CAST(%s AS BINARY)", (patron,))
+    DatabaseConnection.execute_query("DELETE FROM participantes WHERE documento LIKE CAST(%s AS BINARY)", (patron,))
+
+
+def intento_sortear(sorteo_id: int):
+    """Sorteo atómico de ganadores simultáneos"""
+    return len(SorteoService.sortear_ganadores(sorteo_id) or [])
+
+
+def intento_marcar(sorteo_id: int):
+    """Flujo de dos pasos del frontend: obtener candidatos y marcarlos uno por uno"""
+    marcados = 0
+    for candidato in SorteoService.obtener_multiples_participantes_aleatorios(sorteo_id, 3):
+        try:
+            if SorteoService.marcar_participante_ganador(sorteo_id, candidato['documento']):
+                marcados += 1
+        except ValueError:
+            # Cupo agotado por otra consola: es el comportamiento esperado
+            pass
+    return marcados
+
+
+def intento_realizar(sorteo_id: int):
+    return 1 if SorteoService.realizar_sorteo(sorteo_id) else 0
+
+
+MODOS = {
+    "sortear": intento_sortear,
+    "marcar": intento_marcar,
+    "realizar": intento_realizar,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de estrés de sorteos concurrentes")
+    parser.add_argument("--sorteos", type=int, default=4, help="Sorteos que se sortean en paralelo")
+    parser.add_argument("--participantes", type=int, default=2000, help="Participantes por sorteo")
+    parser.add_argument("--premios", type=int, default=25, help="cantidad_premio de cada sorteo")
+    parser.add_argument("--simultaneos", type=int, default=3, help="ganadores_simultaneos de cada sorteo")
+    parser.add_argument("--hilos", type=int, default=32, help="Solicitudes concurrentes")
+    parser.add_argument("--intentos", type=int, default=400, help="Total de solicitudes de sorteo")
+    parser.add_argument("--modo", choices=sorted(MODOS), default="sortear")
+    parser.add_argument("--conservar", action="store_true", help="No borrar los datos al terminar")
+    args = parser.parse_args()
+
+    # Un hilo por conexión: el pool no debe ser el cuello de botella de la prueba
+    database.POOL_CONFIG["pool_size"] = max(database.POOL_CONFIG["pool_size"], args.hilos)
+
+    limpiar()
+    print(f"Creando {args.sorteos} sorteos de {args.participantes} participantes...")
+    sorteos = [
+        crear_sorteo_de_prueba(i, args.participantes, args.premios, args.simultaneos)
+        for i in range(args.sorteos)
+    ]
+
+    intento = MODOS[args.modo]
+    latencias = []
+    errores = []
+    lock = threading.Lock()
+
+    def ejecutar(n: int):
+        sorteo_id = sorteos[n % len(sorteos)]
+        inicio = time.perf_counter()
+        try:
+            intento(sorteo_id)
+        except Exception as e:
+            with lock:
+                errores.append(f"{type(e).__name__}: {e}")
+        finally:
+            with lock:
+                latencias.append(time.perf_counter() - inicio)
+
+    print(f"Lanzando {args.intentos} solicitudes '{args.modo}' con {args.hilos} hilos...")
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.hilos) as executor:
+        list(executor.map(ejecutar, range(args.intentos)))
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    print(f"\nDuración: {duracion:.2f}s ({args.intentos / duracion:.1f} solicitudes/s)")
+    print(f"Latencia p50: {statistics.median(latencias) * 1000:.1f} ms, "
+          f"p95: {latencias[int(len(latencias) * 0.95) - 1] * 1000:.1f} ms, "
+          f"máx: {latencias[-1] * 1000:.1f} ms")
+    print(f"Errores: {len(errores)}")
+    for error in sorted(set(errores))[:10]:
+        print(f"  {error}")
+    print(f"Pool: {DatabaseConnection.pool_stats()}")
+
+    excedidos = 0
+    desviados = 0
+    print("\nGanadores por sorteo:")
+    for sorteo_id in sorteos:
+        ganadores = contar_ganadores(sorteo_id)
+        contador = contador_ganadores(sorteo_id)
+        estado = "OK" if ganadores <= args.premios else "EXCEDIDO"
+        if ganadores > args.premios:
+            excedidos += 1
+        if contador != ganadores:
+            desviados += 1
+            estado += f" (contador: {contador})"
+        print(f"  Sorteo {sorteo_id}: {ganadores}/{args.premios} {estado}")
+
+    if not args.conservar:
+        limpiar()
+
+    if desviados:
+        print(f"\n❌ {desviados} sorteos con total_ganadores distinto al conteo real")
+    if excedidos:
+        print(f"\n❌ {excedidos} sorteos superaron cantidad_premio")
+    if excedidos or desviados:
+        sys.exit(1)
+    print("\n✅ Ningún sorteo superó cantidad_premio")
+
+
+if __name__ == "__main__":
+    main()
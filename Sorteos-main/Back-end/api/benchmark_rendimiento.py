@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las rutas críticas de los servicios (sorteo, importación y
+listados) para tamaños de sorteo crecientes.
+
+Por cada tamaño crea sus propios sorteos y participantes (prefijo
+bench_rendimiento, se borran al terminar) y mide cada escenario en serie:
+latencia p50/p95/p99, operaciones por segundo y consultas por operación. Las
+consultas se cuentan con el contador global `Questions` del servidor, así que
+la base debe estar dedicada a la prueba mientras corre.
+
+Con --base compara contra un resultado guardado y retorna 1 si algún
+escenario empeora más que --umbral (p95 o throughput) o hace más consultas
+por operación.
+
+Uso:
+    python benchmark_rendimiento.py --tamanos 1000,10000,100000 --salida resultado.json
+    python benchmark_rendimiento.py --base base.json --umbral 0.2
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from datetime import datetime
+
+import mysql.connector
+from config.database import DB_CONFIG, DatabaseConnection
+from database import bulk
+from models.participante import Participante
+from services.participante_service import ParticipanteService
+from services.sorteo_service import SorteoService
+
+PREFIJO = "bench_rendimiento"
+
+# Margen en consultas por operación antes de considerar que aumentaron
+# (los promedios de escenarios con reintentos o lotes no son enteros)
+MARGEN_CONSULTAS = 0.5
+
+
+class ContadorConsultas:
+    """Sentencias ejecutadas por el servidor, leídas de SHOW GLOBAL STATUS"""
+
+    def __init__(self):
+        self.connection = mysql.connector.connect(**DB_CONFIG)
+        self.cursor = self.connection.cursor()
+
+    def leer(self) -> int:
+        self.cursor.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+        return int(self.cursor.fetchone()[1])
+
+    def cerrar(self):
+        self.cursor.close()
+        self.connection.close()
+
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil por rango más cercano de una lista ordenada"""
+    return valores[max(0, math.ceil(len(valores) * p / 100) - 1)]
+
+
+def medir(contador: ContadorConsultas, operacion, repeticiones: int) -> dict:
+    """Ejecuta la operación `repeticiones` veces en serie y resume sus tiempos"""
+    latencias = []
+    antes = contador.leer()
+    for n in range(repeticiones):
+        inicio = time.perf_counter()
+        operacion(n)
+        latencias.append(time.perf_counter() - inicio)
+    # La lectura del contador también es una sentencia
+    consultas = contador.leer() - antes - 1
+
+    latencias.sort()
+    return {
+        "operaciones": repeticiones,
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+        "operaciones_por_segundo": round(repeticiones / sum(latencias), 2),
+        "consultas_por_operacion": round(consultas / repeticiones, 2),
+    }
+
+
+def participantes_de_prueba(etiqueta: str, cantidad: int) -> list:
+    return [
+        Participante(documento=f"{PREFIJO}_{etiqueta}_{n}", nombre=f"Participante {n}")
+        for n in range(cantidad)
+    ]
+
+
+def crear_sorteo(etiqueta: str, cantidad: int, premios: int) -> int:
+    resultado = SorteoService.crear_sorteo_con_participantes(
+        f"{PREFIJO}_{etiqueta}", participantes_de_prueba(etiqueta, cantidad)
+    )
+    if not resultado.sorteo_id:
+        raise RuntimeError(f"No se pudo crear el sorteo de prueba: {resultado.errores}")
+    SorteoService.actualizar_sorteo(resultado.sorteo_id, cantidad_premio=premios)
+    return resultado.sorteo_id
+
+
+def limpiar():
+    """Elimina los sorteos y participantes creados por el benchmark"""
+    # Prefijo literal y con mayúsculas exactas: "_" no actúa como comodín
+    patron = bulk.patron_prefijo(f"{PREFIJO}_")
+    DatabaseConnection.execute_query("DELETE FROM sorteo WHERE nombre LIKE CAST(%s AS BINARY)", (patron,))
+    DatabaseConnection.execute_query("DELETE FROM participantes WHERE documento LIKE CAST(%s AS BINARY)", (patron,))
+
+
+def ejecutar_escenarios(contador: ContadorConsultas, tamano: int, repeticiones: int, repeticiones_carga: int) -> dict:
+    """Mide todos los escenarios para sorteos de `tamano` participantes"""
+    resultados = {}
+
+    print(f"  crear_sorteo_con_participantes ({repeticiones_carga}x)...")
+    resultados["crear_sorteo_con_participantes"] = medir(
+        contador,
+        lambda n: crear_sorteo(f"{tamano}_importar_{n}", tamano, 1),
+        repeticiones_carga
+    )
+
+    print(f"  registrar_participantes_objetos ({repeticiones_carga}x)...")
+    lotes = [participantes_de_prueba(f"{tamano}_registrar_{n}", tamano) for n in range(repeticiones_carga)]
+    resultados["registrar_participantes_objetos"] = medir(
+        contador,
+        lambda n: ParticipanteService.registrar_participantes_objetos(lotes[n]),
+        repeticiones_carga
+    )
+
+    # Un sorteo con premios suficientes para todas las repeticiones de los escenarios de sorteo
+    sorteo_id = crear_sorteo(f"{tamano}_sorteo", tamano, tamano)
+    repeticiones_sorteo = max(1, min(repeticiones, tamano // 4))
+
+    print(f"  obtener_multiples_participantes_aleatorios ({repeticiones_sorteo}x)...")
+    resultados["obtener_multiples_participantes_aleatorios"] = medir(
+        contador,
+        lambda n: SorteoService.obtener_multiples_participantes_aleatorios(sorteo_id, 3),
+        repeticiones_sorteo
+    )
+
+    print(f"  realizar_sorteo ({repeticiones_sorteo}x)...")
+    resultados["realizar_sorteo"] = medir(
+        contador,
+        lambda n: SorteoService.realizar_sorteo(sorteo_id),
+        repeticiones_sorteo
+    )
+
+    print(f"  obtener_todos_los_sorteos ({repeticiones}x)...")
+    resultados["obtener_todos_los_sorteos"] = medir(
+        contador,
+        lambda n: SorteoService.obtener_todos_los_sorteos(),
+        repeticiones
+    )
+
+    print(f"  obtener_participantes_sorteo ({repeticiones}x)...")
+    resultados["obtener_participantes_sorteo"] = medir(
+        contador,
+        lambda n: SorteoService.obtener_participantes_sorteo(sorteo_id),
+        repeticiones
+    )
+
+    print(f"  obtener_participantes_sorteo paginado ({repeticiones}x)...")
+    resultados["obtener_participantes_sorteo_pagina"] = medir(
+        contador,
+        lambda n: SorteoService.obtener_participantes_sorteo(sorteo_id, despues_de=0, limite=100),
+        repeticiones
+    )
+
+    return resultados
+
+
+def comparar(actual: dict, base: dict, umbral: float) -> list:
+    """Retorna la lista de regresiones de `actual` respecto de `base`"""
+    regresiones = []
+    for tamano, escenarios in actual["resultados"].items():
+        for escenario, medida in escenarios.items():
+            anterior = base["resultados"].get(tamano, {}).get(escenario)
+            if not anterior:
+                continue
+            nombre = f"{escenario} [{tamano}]"
+            if medida["p95_ms"] > anterior["p95_ms"] * (1 + umbral):
+                regresiones.append(f"{nombre}: p95 {anterior['p95_ms']} → {medida['p95_ms']} ms")
+            if medida["operaciones_por_segundo"] < anterior["operaciones_por_segundo"] * (1 - umbral):
+                regresiones.append(
+                    f"{nombre}: {anterior['operaciones_por_segundo']} → {medida['operaciones_por_segundo']} operaciones/s"
+                )
+            if medida["consultas_por_operacion"] > anterior["consultas_por_operacion"] + MARGEN_CONSULTAS:
+                regresiones.append(
+                    f"{nombre}: {anterior['consultas_por_operacion']} → {medida['consultas_por_operacion']} consultas por operación"
+                )
+    return regresiones
+
+
+def imprimir(resultado: dict):
+    print(f"\n{'escenario':45} {'tamaño':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'consultas':>9}")
+    for tamano, escenarios in resultado["resultados"].items():
+        for escenario, m in escenarios.items():
+            print(f"{escenario:45} {tamano:>8} {m['p50_ms']:>9} {m['p95_ms']:>9} {m['p99_ms']:>9} "
+                  f"{m['operaciones_por_segundo']:>9} {m['consultas_por_operacion']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de las rutas críticas de los servicios")
+    parser.add_argument("--tamanos", default="1000,10000,100000", help="Participantes por sorteo, separados por coma")
+    parser.add_argument("--repeticiones", type=int, default=50, help="Operaciones por escenario de lectura o sorteo")
+    parser.add_argument("--repeticiones-carga", type=int, default=3, help="Operaciones por escenario de importación")
+    parser.add_argument("--salida", default="benchmark_rendimiento.json", help="Archivo JSON con los resultados")
+    parser.add_argument("--base", help="Resultado anterior (JSON) contra el que comparar")
+    parser.add_argument("--umbral", type=float, default=0.2, help="Empeoramiento tolerado (0.2 = 20%%)")
+    parser.add_argument("--conservar", action="store_true", help="No borrar los datos al terminar")
+    args = parser.parse_args()
+
+    tamanos = [int(valor) for valor in args.tamanos.split(",")]
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {"repeticiones": args.repeticiones, "repeticiones_carga": args.repeticiones_carga},
+        "resultados": {},
+    }
+
+    limpiar()
+    contador = ContadorConsultas()
+    try:
+        for tamano in tamanos:
+            print(f"Sorteos de {tamano} participantes:")
+            resultado["resultados"][str(tamano)] = ejecutar_escenarios(
+                contador, tamano, args.repeticiones, args.repeticiones_carga
+            )
+    finally:
+        contador.cerrar()
+        if not args.conservar:
+            limpiar()
+
+    imprimir(resultado)
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(resultado, base, args.umbral)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresiones respecto de {args.base} (umbral {args.umbral:.0%}):")
+            for regresion in regresiones:
+                print(f"  {regresion}")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones respecto de {args.base} (umbral {args.umbral:.0%})")
+
+
+if __name__ == "__main__":
+    main()
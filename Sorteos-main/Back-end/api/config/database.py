@@ -1,8 +1,14 @@
 import mysql.connector
 from mysql.connector import Error
 import logging
+import threading
+import time
 from fastapi import HTTPException
 
+from database.pool import ConnectionPool, PoolTimeoutError
+from database.unidad_trabajo import unidad_actual
+from database.instrumentacion import medicion_actual
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
@@ -15,22 +21,107 @@ DB_CONFIG = {
     "database": "junio5"  # Base de datos del usuario
 }
 
+# Configuración del pool de conexiones
+POOL_CONFIG = {
+    "pool_size": 10,           # Máximo de conexiones abiertas por proceso
+    "max_lifetime": 1800,      # Segundos antes de reciclar una conexión
+    "wait_timeout": 5,         # Segundos de espera por una conexión libre (luego 503)
+    "health_check_after": 30   # Segundos de inactividad antes de hacer ping
+}
+
+# Pool de la capa asíncrona (database/async_pool.py). Sin aiomysql instalado
+# las consultas asíncronas usan el pool anterior desde hilos, como mucho
+# pool_size a la vez
+ASYNC_POOL_CONFIG = {
+    "minsize": 1,
+    "maxsize": 20,             # Conexiones abiertas por proceso para las lecturas asíncronas
+    "pool_recycle": 1800,      # Segundos antes de reciclar una conexión
+    "wait_timeout": 5          # Segundos de espera por una conexión libre (luego 503)
+}
+
+# Filas por sentencia en las inserciones masivas de participantes
+BULK_CHUNK_SIZE = 1000
+
+# Caché en memoria de los datos de cada sorteo (ver services/cache_sorteos.py)
+CACHE_SORTEOS_CONFIG = {
+    "habilitada": True,
+    "max_entradas": 1000,           # Sorteos guardados por proceso
+    "intervalo_verificacion": 1.0   # Segundos entre verificaciones de versión (antigüedad máxima entre workers)
+}
+
+# Medición de consultas por petición (database/instrumentacion.py): encabezado
+# Server-Timing, log de sentencias lentas y presupuesto de consultas por ruta
+INSTRUMENTACION_CONFIG = {
+    "habilitada": True,
+    "umbral_lenta_ms": 100,          # Sentencias que se registran en el log (sin parámetros)
+    "maximo_lentas": 5,              # Sentencias lentas registradas por petición
+    "presupuesto_estricto": False    # True en pruebas/CI: superar un presupuesto marca la respuesta y hace fallar verificar_presupuestos()
+}
+
+# Consultas máximas por petición de las rutas que consultan las pantallas
+# ("MÉTODO /ruta" como está declarada en el router). Incluye la verificación
+# de versión de la caché de sorteos, que se hace como mucho una vez por segundo
+PRESUPUESTO_CONSULTAS = {
+    "GET /sorteos": 1,
+    "GET /sorteos/{sorteo_id}": 2,
+    "GET /sorteos/{sorteo_id}/ganador": 3,
+    "GET /sorteos/{sorteo_id}/ganadores": 3,
+    "GET /sorteos/{sorteo_id}/imagen": 2,
+    "GET /sorteos/{sorteo_id}/participantes": 3,
+    "GET /participantes/{documento}": 1,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Retorna el pool de conexiones del proceso, creándolo si no existe"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+    return _pool
+
 
 class DatabaseConnection:
     """Clase para manejar conexiones a la base de datos"""
     
     @staticmethod
-    def get_connection():
-        """Obtiene una conexión a la base de datos MySQL"""
+    def get_connection(compartida: bool = True):
+        """
+        Obtiene una conexión del pool; close() la devuelve al pool.
+        
+        Dentro de una petición con unidad de trabajo (database/unidad_trabajo.py)
+        entrega la conexión de la petición si está libre. compartida=False pide
+        siempre una propia (p.ej. para conexiones que sobreviven al endpoint).
+        """
+        if compartida:
+            unidad = unidad_actual()
+            if unidad is not None:
+                conexion = unidad.prestar()
+                if conexion is not None:
+                    return conexion
+        medicion = medicion_actual()
+        inicio = time.perf_counter()
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
-            return connection
+            return get_pool().acquire()
+        except PoolTimeoutError as err:
+            logger.error(f"Pool de conexiones agotado: {err}")
+            raise HTTPException(
+                status_code=503,
+                detail="Base de datos ocupada, intente nuevamente"
+            )
         except Error as err:
             logger.error(f"Error conectando a la base de datos: {err}")
             raise HTTPException(
                 status_code=500, 
                 detail="Error de conexión a la base de datos"
             )
+        finally:
+            if medicion is not None:
+                medicion.registrar_conexion(time.perf_counter() - inicio)
     
     @staticmethod
     def test_connection():
@@ -43,6 +134,11 @@ class DatabaseConnection:
             logger.error(f"Error en test de conexión: {e}")
             return False
     
+    @staticmethod
+    def pool_stats() -> dict:
+        """Retorna las estadísticas del pool de conexiones"""
+        return get_pool().stats()
+    
     @staticmethod
     def execute_query(query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
         """Ejecuta una consulta SQL y retorna el resultado"""
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
 import logging
 
 from models.participante import (
@@ -8,6 +8,11 @@ from models.participante import (
     ParticipanteResponse
 )
 from services.participante_service import ParticipanteService
+from services.participante_service_async import ParticipanteServiceAsync
+from services.exportacion import respuesta_streaming, ENCABEZADO_SIGUIENTE
+from config.database import BULK_CHUNK_SIZE
+from database.unidad_trabajo import unidad_de_trabajo
+from database.async_pool import en_hilo
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -15,12 +20,17 @@ logger = logging.getLogger(__name__)
 # Crear router
 router = APIRouter(
     prefix="/participantes",
-    tags=["participantes"]
+    tags=["participantes"],
+    # Una conexión del pool por petición, compartida por los servicios que llama
+    dependencies=[Depends(unidad_de_trabajo)]
 )
 
 
 @router.post("/", response_model=RegistroParticipantesResponse)
-async def registrar_participantes(request: RegistroParticipantesRequest):
+async def registrar_participantes(
+    request: RegistroParticipantesRequest,
+    tamano_lote: int = Query(BULK_CHUNK_SIZE, ge=1, le=10000)
+):
     """
     Registra múltiples participantes desde el textarea del frontend.
     
@@ -28,6 +38,7 @@ async def registrar_participantes(request: RegistroParticipantesRequest):
     
     Args:
         request: Objeto con la lista de participantes en formato texto
+        tamano_lote: Cantidad de participantes procesados por sentencia/transacción
     
     Returns:
         RegistroParticipantesResponse: Resultado del registro con estadísticas y errores
@@ -44,13 +55,20 @@ async def registrar_participantes(request: RegistroParticipantesRequest):
                 detail="La lista de participantes no puede estar vacía"
             )
         
-        # Procesar participantes usando el servicio
-        resultado = ParticipanteService.registrar_participantes_objetos(request.participantes)
+        # Procesar participantes usando el servicio (bloqueante: en un hilo, sin
+        # detener el event loop)
+        resultado = await en_hilo(
+            ParticipanteService.registrar_participantes_objetos,
+            request.participantes,
+            tamano_lote=tamano_lote
+        )
         
         logger.info(f"Registro completado: {resultado.participantes_registrados} nuevos, {resultado.participantes_existentes} existentes")
         
         return resultado
         
+    except HTTPException:
+        raise
     except ValueError as ve:
         logger.error(f"Error de validación: {str(ve)}")
         raise HTTPException(
@@ -66,25 +84,52 @@ async def registrar_participantes(request: RegistroParticipantesRequest):
 
 
 @router.get("/", response_model=List[ParticipanteResponse])
-async def obtener_participantes():
+async def obtener_participantes(
+    response: Response,
+    after: Optional[str] = Query(None, max_length=50),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    formato: Optional[str] = Query(None, pattern="^(ndjson|csv)$")
+):
     """
-    Obtiene todos los participantes registrados.
+    Obtiene los participantes registrados.
+    
+    Args:
+        after: Documento del último participante de la página anterior
+        limit: Tamaño de página; si se indica, la respuesta se pagina por documento
+            y el encabezado X-Siguiente-Cursor trae el valor de `after` para la
+            página siguiente (ausente en la última página)
+        formato: `ndjson` o `csv` para recibir el listado en streaming
     
     Returns:
-        List[ParticipanteResponse]: Lista de todos los participantes con su información completa
+        List[ParticipanteResponse]: Participantes con su información completa
     
     Raises:
         HTTPException: Si hay errores al consultar la base de datos
     """
     try:
+        if formato:
+            logger.info(f"Exportando participantes en {formato}")
+            consulta = await en_hilo(ParticipanteService.consultar_participantes_streaming, after, limit)
+            return respuesta_streaming(consulta, formato, ["documento", "nombre", "fecha_registro"], "participantes")
+        
         logger.info("Obteniendo lista de participantes")
         
-        participantes = ParticipanteService.obtener_todos_participantes()
+        if limit is None and after is None:
+            participantes = await ParticipanteServiceAsync.obtener_todos_participantes()
+        else:
+            # Se pide uno de más para saber si hay página siguiente
+            limite = limit or 100
+            participantes = await ParticipanteServiceAsync.obtener_todos_participantes(after, limite + 1)
+            if len(participantes) > limite:
+                participantes = participantes[:limite]
+                response.headers[ENCABEZADO_SIGUIENTE] = participantes[-1].documento
         
         logger.info(f"Se encontraron {len(participantes)} participantes")
         
         return participantes
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error obteniendo participantes: {str(e)}")
         raise HTTPException(
@@ -110,12 +155,14 @@ async def obtener_participante(documento: str):
     try:
         logger.info(f"Buscando participante con documento: {documento}")
         
-        participante = ParticipanteService.obtener_participante_por_documento(documento)
+        participante = await ParticipanteServiceAsync.obtener_participante_por_documento(documento)
         
         logger.info(f"Participante encontrado: {participante.nombre}")
         
         return participante
         
+    except HTTPException:
+        raise
     except ValueError as ve:
         logger.warning(f"Participante no encontrado: {documento}")
         raise HTTPException(
@@ -1,10 +1,25 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request, Query, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
+import json
+from email.utils import formatdate, parsedate_to_datetime
+import mimetypes
+import os
 from typing import List, Optional
-from models.sorteo import SorteoResponse, DetalleSorteoResponse, EstadoParticipacion, SorteoListResponse
+from models.sorteo import SorteoResponse, DetalleSorteoResponse, EstadoParticipacion, SorteoListResponse, PreparacionSorteoResponse, AuditoriaPreparacionResponse, CompactacionProgresoResponse
 from models.participante import RegistroSorteoConParticipantesRequest, RegistroSorteoConParticipantesResponse
 from pydantic import BaseModel
 
 from services.sorteo_service import SorteoService
+from services.sorteo_service_async import SorteoServiceAsync
+from services.preparacion_service import PreparacionService, SemillaNoRevelableError
+from services.compactacion_service import CompactacionService, TAMANO_LOTE, PAUSA_MS
+from services.exportacion import respuesta_streaming, ENCABEZADO_SIGUIENTE
+from services.contadores import ContadoresSorteo
+from services.imagen_variantes import ImagenVariantes
+from services.almacen_imagenes import AlmacenImagenes, ImagenInvalidaError, ImagenDemasiadoGrandeError
+from services.eventos_sorteo import EventosSorteo
+from database.unidad_trabajo import unidad_de_trabajo, transaccion_de_peticion, TransaccionPeticion
+from database.async_pool import en_hilo
 
 class ActualizarEstadoRequest(BaseModel):
     nuevo_estado: EstadoParticipacion
@@ -13,14 +28,22 @@ class SorteoResultResponse(BaseModel):
     ganador: Optional[DetalleSorteoResponse]
     mensaje: str
 
-router = APIRouter()
+class SorteoGanadoresResponse(BaseModel):
+    ok: bool
+    ganadores: List[DetalleSorteoResponse]
+    mensaje: str
+
+# Una conexión del pool por petición, compartida por los servicios que llama
+router = APIRouter(dependencies=[Depends(unidad_de_trabajo)])
 
 @router.get("/sorteos", response_model=List[SorteoListResponse])
-def obtener_todos_los_sorteos():
+async def obtener_todos_los_sorteos():
     """Obtiene todos los sorteos con información básica y cantidad de participantes"""
     try:
-        sorteos = SorteoService.obtener_todos_los_sorteos()
+        sorteos = await SorteoServiceAsync.obtener_todos_los_sorteos()
         return sorteos
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
@@ -78,13 +101,14 @@ def subir_imagen_sorteo(sorteo_id: int, file: UploadFile = File(...)):
         if not sorteo:
             raise HTTPException(status_code=404, detail="Sorteo no encontrado")
         
-        # Validar tipo de archivo
-        if not file.content_type.startswith('image/'):
+        # Guardar la imagen (el tipo se verifica por su contenido, no por content_type)
+        try:
+            imagen_guardada = SorteoService.guardar_imagen_sorteo(sorteo_id, file)
+        except ImagenDemasiadoGrandeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except ImagenInvalidaError as e:
             print(f"Error: Tipo de archivo inválido: {file.content_type}")
-            raise HTTPException(status_code=400, detail="El archivo debe ser una imagen")
-        
-        # Guardar la imagen
-        imagen_guardada = SorteoService.guardar_imagen_sorteo(sorteo_id, file)
+            raise HTTPException(status_code=415, detail=str(e))
         
         if imagen_guardada:
             print(f"Imagen guardada exitosamente en: {imagen_guardada}")
@@ -100,15 +124,15 @@ def subir_imagen_sorteo(sorteo_id: int, file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 @router.get("/sorteos/{sorteo_id}/imagen")
-def obtener_imagen_sorteo(sorteo_id: int):
-    """Obtiene la imagen de un sorteo"""
+def obtener_imagen_sorteo(sorteo_id: int, w: Optional[int] = Query(None, ge=1, le=8192)):
+    """Obtiene la imagen de un sorteo en base64 (usar /imagen/archivo en clientes nuevos)"""
     try:
         # Verificar que el sorteo existe
         sorteo = SorteoService.obtener_sorteo(sorteo_id)
         if not sorteo:
             raise HTTPException(status_code=404, detail="Sorteo no encontrado")
         
-        imagen = SorteoService.obtener_imagen_sorteo(sorteo_id)
+        imagen = SorteoService.obtener_imagen_sorteo(sorteo_id, w)
         
         if imagen:
             return {"imagen": imagen}
@@ -119,6 +143,77 @@ def obtener_imagen_sorteo(sorteo_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
+# Segundos que navegadores y pantallas pueden reutilizar la imagen sin revalidar
+IMAGEN_CACHE_MAX_AGE = 60
+
+def _respuesta_imagen(ruta: str, request: Request, headers_extra: Optional[dict] = None) -> Response:
+    """
+    Responde un archivo de imagen con soporte de caché HTTP.
+    
+    Envía ETag, Last-Modified y Cache-Control, responde 304 si el cliente ya
+    tiene la versión actual, y delega en FileResponse el envío por bloques
+    (sendfile cuando el servidor lo soporta) y las solicitudes Range.
+    """
+    stat = os.stat(ruta)
+    # Las imágenes del almacén tienen un ETag fuerte derivado de su digest
+    etag = AlmacenImagenes.etag(ruta) or f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": f"public, max-age={IMAGEN_CACHE_MAX_AGE}",
+        **(headers_extra or {}),
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags_cliente = [valor.strip().replace("W/", "", 1) for valor in if_none_match.split(",")]
+        if "*" in etags_cliente or etag in etags_cliente:
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                if int(stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp():
+                    return Response(status_code=304, headers=headers)
+            except (TypeError, ValueError):
+                pass
+    
+    media_type = mimetypes.guess_type(ruta)[0] or "application/octet-stream"
+    return FileResponse(ruta, media_type=media_type, headers=headers, stat_result=stat)
+
+@router.api_route("/sorteos/{sorteo_id}/imagen/archivo", methods=["GET", "HEAD"])
+def obtener_imagen_sorteo_archivo(
+    sorteo_id: int,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=8192),
+    formato: Optional[str] = Query(None, pattern="^(original|webp)$")
+):
+    """
+    Obtiene la imagen de un sorteo como archivo binario, con caché HTTP y Range.
+    
+    `w` pide la variante más pequeña con al menos ese ancho; `formato=webp` (o un
+    encabezado Accept con image/webp) pide la variante WebP.
+    """
+    try:
+        ruta = SorteoService.obtener_ruta_imagen_sorteo(sorteo_id)
+        if not ruta:
+            raise HTTPException(status_code=404, detail="Imagen no encontrada")
+        
+        headers_extra = {}
+        if formato is None:
+            webp = "image/webp" in request.headers.get("accept", "")
+            headers_extra["Vary"] = "Accept"
+        else:
+            webp = formato == "webp"
+        
+        ruta = ImagenVariantes.seleccionar(ruta, w, webp)
+        return _respuesta_imagen(ruta, request, headers_extra)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
 @router.delete("/sorteos/{sorteo_id}/imagen")
 def eliminar_imagen_sorteo(sorteo_id: int):
     """Elimina la imagen de un sorteo"""
@@ -151,14 +246,16 @@ def crear_sorteo_con_participantes(request: RegistroSorteoConParticipantesReques
             descripcion_sorteo=request.descripcion_sorteo
         )
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 @router.get("/sorteos/{sorteo_id}", response_model=SorteoResponse)
-def obtener_sorteo(sorteo_id: int):
+async def obtener_sorteo(sorteo_id: int):
     """Obtiene información de un sorteo específico"""
     try:
-        sorteo = SorteoService.obtener_sorteo(sorteo_id)
+        sorteo = await SorteoServiceAsync.obtener_sorteo(sorteo_id)
         if not sorteo:
             raise HTTPException(status_code=404, detail="Sorteo no encontrado")
         return sorteo
@@ -168,15 +265,44 @@ def obtener_sorteo(sorteo_id: int):
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 @router.get("/sorteos/{sorteo_id}/participantes", response_model=List[DetalleSorteoResponse])
-def obtener_participantes_sorteo(sorteo_id: int):
-    """Obtiene todos los participantes de un sorteo"""
+async def obtener_participantes_sorteo(
+    sorteo_id: int,
+    response: Response,
+    after: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    formato: Optional[str] = Query(None, pattern="^(ndjson|csv)$")
+):
+    """
+    Obtiene los participantes de un sorteo.
+    
+    Con `limit` (y opcionalmente `after`, el ID de detalle del último recibido) la
+    respuesta se pagina; el encabezado X-Siguiente-Cursor trae el `after` de la
+    página siguiente. Con `formato=ndjson` o `formato=csv` se envía en streaming.
+    """
     try:
         # Verificar que el sorteo existe
-        sorteo = SorteoService.obtener_sorteo(sorteo_id)
+        sorteo = await SorteoServiceAsync.obtener_sorteo(sorteo_id)
         if not sorteo:
             raise HTTPException(status_code=404, detail="Sorteo no encontrado")
         
-        participantes = SorteoService.obtener_participantes_sorteo(sorteo_id)
+        if formato:
+            # La exportación usa un cursor sin buffer del pool síncrono
+            consulta = await en_hilo(SorteoService.consultar_participantes_sorteo_streaming, sorteo_id, after, limit)
+            return respuesta_streaming(
+                consulta, formato,
+                ["id", "numero", "documento_participante", "nombre_participante", "estado", "fecha_asignacion", "fecha_ganador"],
+                f"sorteo_{sorteo_id}_participantes"
+            )
+        
+        if limit is None and after is None:
+            return await SorteoServiceAsync.obtener_participantes_sorteo(sorteo_id)
+        
+        # Se pide uno de más para saber si hay página siguiente
+        limite = limit or 100
+        participantes = await SorteoServiceAsync.obtener_participantes_sorteo(sorteo_id, after, limite + 1)
+        if len(participantes) > limite:
+            participantes = participantes[:limite]
+            response.headers[ENCABEZADO_SIGUIENTE] = str(participantes[-1].id)
         return participantes
     except HTTPException:
         raise
@@ -203,21 +329,34 @@ def eliminar_participante_sorteo(sorteo_id: int, documento_participante: str):
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 @router.put("/sorteos/{sorteo_id}/participantes/{documento_participante}/estado")
-def actualizar_estado_participante(sorteo_id: int, documento_participante: str, request: ActualizarEstadoRequest):
-    """Actualiza el estado de participación de un participante en un sorteo"""
+def actualizar_estado_participante(
+    sorteo_id: int,
+    documento_participante: str,
+    request: ActualizarEstadoRequest,
+    transaccion: TransaccionPeticion = Depends(transaccion_de_peticion, scope="function")
+):
+    """
+    Actualiza el estado de participación de un participante en un sorteo.
+    
+    La verificación del sorteo y el cambio de estado van en una sola transacción.
+    """
     try:
-        # Verificar que el sorteo existe
-        sorteo = SorteoService.obtener_sorteo(sorteo_id)
+        # Verificar que el sorteo existe (queda bloqueado hasta el commit)
+        sorteo = SorteoService.obtener_sorteo(sorteo_id, transaccion)
         if not sorteo:
             raise HTTPException(status_code=404, detail="Sorteo no encontrado")
         
-        actualizado = SorteoService.actualizar_estado_participante(sorteo_id, documento_participante, request.nuevo_estado)
+        actualizado = SorteoService.actualizar_estado_participante(
+            sorteo_id, documento_participante, request.nuevo_estado, transaccion
+        )
         if not actualizado:
             raise HTTPException(status_code=404, detail="Participante no encontrado en el sorteo")
         
         return {"mensaje": f"Estado del participante {documento_participante} actualizado a {request.nuevo_estado.value}"}
     except HTTPException:
         raise
+    except ValueError as ve:
+        raise HTTPException(status_code=409, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
@@ -232,7 +371,7 @@ def realizar_sorteo(sorteo_id: int):
         
         documento_ganador = SorteoService.realizar_sorteo(sorteo_id)
         if not documento_ganador:
-            raise HTTPException(status_code=400, detail="No se pudo realizar el sorteo. Verifique que esté activo y tenga participantes.")
+            raise HTTPException(status_code=400, detail="No se pudo realizar el sorteo. Verifique que esté activo, tenga participantes y premios disponibles.")
         
         # Obtener información completa del ganador
         ganador = SorteoService.obtener_ganador_sorteo(sorteo_id)
@@ -246,16 +385,44 @@ def realizar_sorteo(sorteo_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
+@router.post("/sorteos/{sorteo_id}/sortear-ganadores", response_model=SorteoGanadoresResponse)
+def sortear_ganadores(sorteo_id: int):
+    """Sortea y marca a la vez los ganadores simultáneos configurados para el sorteo"""
+    try:
+        ganadores = SorteoService.sortear_ganadores(sorteo_id)
+        if ganadores is None:
+            sorteo = SorteoService.obtener_sorteo(sorteo_id)
+            if not sorteo:
+                raise HTTPException(status_code=404, detail="Sorteo no encontrado")
+            raise HTTPException(status_code=400, detail="No se pudo realizar el sorteo. Verifique que esté activo.")
+        
+        if ganadores:
+            return SorteoGanadoresResponse(
+                ok=True,
+                ganadores=ganadores,
+                mensaje=f"Se sortearon {len(ganadores)} ganadores"
+            )
+        else:
+            return SorteoGanadoresResponse(
+                ok=False,
+                ganadores=[],
+                mensaje="No quedan premios o participantes disponibles para el sorteo"
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
 @router.get("/sorteos/{sorteo_id}/ganador", response_model=DetalleSorteoResponse)
-def obtener_ganador_sorteo(sorteo_id: int):
+async def obtener_ganador_sorteo(sorteo_id: int):
     """Obtiene el ganador de un sorteo finalizado"""
     try:
         # Verificar que el sorteo existe
-        sorteo = SorteoService.obtener_sorteo(sorteo_id)
+        sorteo = await SorteoServiceAsync.obtener_sorteo(sorteo_id)
         if not sorteo:
             raise HTTPException(status_code=404, detail="Sorteo no encontrado")
         
-        ganador = SorteoService.obtener_ganador_sorteo(sorteo_id)
+        ganador = await SorteoServiceAsync.obtener_ganador_sorteo(sorteo_id)
         if not ganador:
             raise HTTPException(status_code=404, detail="No hay ganador para este sorteo")
         
@@ -266,21 +433,88 @@ def obtener_ganador_sorteo(sorteo_id: int):
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 @router.get("/sorteos/{sorteo_id}/ganadores", response_model=List[DetalleSorteoResponse])
-def obtener_ganadores_sorteo(sorteo_id: int):
+async def obtener_ganadores_sorteo(sorteo_id: int):
     """Obtiene todos los ganadores de un sorteo"""
     try:
         # Verificar que el sorteo existe
-        sorteo = SorteoService.obtener_sorteo(sorteo_id)
+        sorteo = await SorteoServiceAsync.obtener_sorteo(sorteo_id)
         if not sorteo:
             raise HTTPException(status_code=404, detail="Sorteo no encontrado")
         
-        ganadores = SorteoService.obtener_ganadores_sorteo(sorteo_id)
+        ganadores = await SorteoServiceAsync.obtener_ganadores_sorteo(sorteo_id)
         return ganadores
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
+def _formato_sse(evento: Optional[dict]) -> str:
+    if evento is None:
+        # Latido: mantiene la conexión abierta a través de proxies
+        return ": ping\n\n"
+    lineas = []
+    if evento["id"] is not None:
+        lineas.append(f"id: {evento['id']}")
+    lineas.append(f"event: {evento['tipo']}")
+    lineas.append(f"data: {json.dumps(evento['datos'], ensure_ascii=False)}")
+    return "\n".join(lineas) + "\n\n"
+
+@router.get("/sorteos/{sorteo_id}/eventos")
+async def eventos_sorteo(
+    sorteo_id: int,
+    ultimo_id: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Eventos del sorteo por Server-Sent Events: `ganador`, `estado_participante`
+    y `finalizado`, en cuanto se confirman. Al reconectar, el navegador envía
+    Last-Event-ID (o se puede pasar `ultimo_id`) y se reenvía lo ocurrido
+    desde ese evento. Un evento `desbordado` indica que el cliente no leyó a
+    tiempo: debe reconectarse con su último ID.
+    """
+    try:
+        sorteo = await SorteoServiceAsync.obtener_sorteo(sorteo_id)
+        if not sorteo:
+            raise HTTPException(status_code=404, detail="Sorteo no encontrado")
+        
+        if ultimo_id is None and last_event_id and last_event_id.isdigit():
+            ultimo_id = int(last_event_id)
+        
+        async def contenido():
+            yield "retry: 2000\n\n"
+            async for evento in EventosSorteo.escuchar(sorteo_id, ultimo_id):
+                yield _formato_sse(evento)
+        
+        return StreamingResponse(
+            contenido(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+@router.websocket("/sorteos/{sorteo_id}/eventos/ws")
+async def eventos_sorteo_ws(websocket: WebSocket, sorteo_id: int, ultimo_id: Optional[int] = Query(None, ge=0)):
+    """Los mismos eventos que /sorteos/{id}/eventos, como mensajes JSON {id, tipo, datos}"""
+    sorteo = await SorteoServiceAsync.obtener_sorteo(sorteo_id)
+    if not sorteo:
+        await websocket.close(code=4404, reason="Sorteo no encontrado")
+        return
+    
+    await websocket.accept()
+    try:
+        async for evento in EventosSorteo.escuchar(sorteo_id, ultimo_id):
+            if evento is None:
+                await websocket.send_json({"tipo": "ping"})
+                continue
+            await websocket.send_json({"id": evento["id"], "tipo": evento["tipo"], "datos": evento["datos"]})
+        # Desbordado: cerrar para que el cliente se reconecte con su último ID
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        pass
+
 @router.put("/sorteos/{sorteo_id}/finalizar")
 def finalizar_sorteo(sorteo_id: int):
     """Finaliza un sorteo cambiando su estado a finalizado"""
@@ -304,14 +538,54 @@ def finalizar_sorteo(sorteo_id: int):
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 @router.post("/admin/compact-detalle-ids")
-def compact_detalle_sorteo_ids():
-    """Compacta los IDs de detalle_sorteo para que sean consecutivos desde 1"""
+def compact_detalle_sorteo_ids(
+    tamano_lote: int = Query(TAMANO_LOTE, ge=1, le=10000),
+    pausa_ms: int = Query(PAUSA_MS, ge=0, le=60000)
+):
+    """
+    Compacta los IDs de detalle_sorteo para que sean consecutivos desde 1.
+    
+    Ya no es necesaria para la numeración visible (ver detalle_sorteo.numero); se
+    conserva como herramienta opcional. Mueve solo las filas por encima del primer
+    hueco, en lotes de `tamano_lote` con `pausa_ms` entre lotes, en segundo plano;
+    el avance se consulta en /admin/compact-detalle-ids/progreso.
+    
+    Las filas de sorteos activos quedan en su lugar: sus IDs ya están en los eventos
+    y en los cursores de paginación de los clientes.
+    """
     try:
-        SorteoService._compact_detalle_sorteo_ids()
-        return {"mensaje": "IDs de detalle_sorteo compactados exitosamente"}
+        if not CompactacionService.iniciar(tamano_lote, pausa_ms):
+            raise HTTPException(status_code=409, detail="Ya hay una compactación en curso")
+        return {
+            "mensaje": "Compactación en línea iniciada",
+            "progreso": CompactacionService.obtener_progreso()
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error compactando IDs: {str(e)}")
 
+@router.get("/admin/compact-detalle-ids/progreso", response_model=CompactacionProgresoResponse)
+def progreso_compactacion():
+    """Avance de la compactación en línea de este proceso"""
+    return CompactacionService.obtener_progreso()
+
+@router.post("/admin/compact-detalle-ids/detener")
+def detener_compactacion():
+    """Detiene la compactación en línea al terminar el lote actual (se puede reanudar)"""
+    if not CompactacionService.detener():
+        raise HTTPException(status_code=404, detail="No hay una compactación en curso")
+    return {"mensaje": "La compactación se detendrá al terminar el lote actual"}
+
+@router.post("/admin/recalcular-contadores")
+def recalcular_contadores(sorteo_id: Optional[int] = Query(None, ge=1)):
+    """Reconstruye los contadores de participantes, elegibles y ganadores desde detalle_sorteo"""
+    try:
+        corregidos = ContadoresSorteo.recalcular(sorteo_id)
+        return {"mensaje": "Contadores recalculados", "sorteos_corregidos": corregidos}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error recalculando contadores: {str(e)}")
+
 class ParticipanteAleatorioResponse(BaseModel):
     ok: bool
     participante: Optional[dict]
@@ -322,6 +596,60 @@ class MultiplesParticipantesResponse(BaseModel):
     participantes: List[dict]
     mensaje: str
 
+@router.post("/sorteos/{sorteo_id}/preparar", response_model=PreparacionSorteoResponse)
+def preparar_sorteo(sorteo_id: int):
+    """Precarga el sorteo: congela los participantes elegibles y calcula el orden de revelación"""
+    try:
+        preparacion = PreparacionService.preparar_sorteo(sorteo_id)
+        if not preparacion:
+            raise HTTPException(status_code=404, detail="Sorteo no encontrado o no se pudo preparar")
+        return preparacion
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+@router.get("/sorteos/{sorteo_id}/preparacion", response_model=PreparacionSorteoResponse)
+def obtener_preparacion_sorteo(sorteo_id: int):
+    """Obtiene el estado de la precarga de un sorteo"""
+    try:
+        preparacion = PreparacionService.obtener_preparacion(sorteo_id)
+        if not preparacion:
+            raise HTTPException(status_code=404, detail="El sorteo no está preparado")
+        return preparacion
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+@router.get("/admin/sorteos/{sorteo_id}/preparacion/auditoria", response_model=AuditoriaPreparacionResponse)
+def auditoria_preparacion_sorteo(sorteo_id: int):
+    """Semilla de la precarga para reproducir el orden de revelación (solo con el sorteo finalizado)"""
+    try:
+        auditoria = PreparacionService.obtener_auditoria(sorteo_id)
+        if not auditoria:
+            raise HTTPException(status_code=404, detail="El sorteo no está preparado")
+        return auditoria
+    except SemillaNoRevelableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+@router.delete("/sorteos/{sorteo_id}/preparacion")
+def eliminar_preparacion_sorteo(sorteo_id: int):
+    """Descarta la precarga de un sorteo"""
+    try:
+        eliminada = PreparacionService.eliminar_preparacion(sorteo_id)
+        if not eliminada:
+            raise HTTPException(status_code=404, detail="El sorteo no está preparado")
+        return {"mensaje": f"Preparación del sorteo {sorteo_id} eliminada"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
 @router.get("/obtener-participante-aleatorio/{sorteo_id}", response_model=ParticipanteAleatorioResponse)
 def obtener_participante_aleatorio(sorteo_id: int):
     """Obtiene un participante aleatorio de un sorteo que no haya ganado"""
@@ -400,6 +728,8 @@ def marcar_participante_ganador(sorteo_id: int, documento_participante: str):
             raise HTTPException(status_code=404, detail="Participante no encontrado en el sorteo")
     except HTTPException:
         raise
+    except ValueError as ve:
+        raise HTTPException(status_code=409, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Script para crear el asignador de IDs de sorteo: la secuencia, la lista de IDs
+libres y el trigger que agrega a esa lista los IDs de los sorteos borrados.
+Carga además los huecos que ya existen en la tabla sorteo.
+"""
+
+import mysql.connector
+from config.database import DB_CONFIG
+from database import bulk
+from database.secuencias import SECUENCIA_SORTEO
+
+def crear_asignador_ids_sorteo():
+    """Crea las tablas y el trigger del asignador y los inicializa"""
+    connection = None
+    cursor = None
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sorteo_id_secuencia (
+            nombre VARCHAR(50) NOT NULL,
+            siguiente INT NOT NULL,
+            PRIMARY KEY (nombre)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+        """)
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sorteo_id_libre (
+            id INT NOT NULL,
+            PRIMARY KEY (id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+        """)
+
+        cursor.execute("DROP TRIGGER IF EXISTS trg_sorteo_liberar_id")
+        cursor.execute("""
+        CREATE TRIGGER trg_sorteo_liberar_id
+        AFTER DELETE ON sorteo
+        FOR EACH ROW
+            INSERT IGNORE INTO sorteo_id_libre (id) VALUES (OLD.id)
+        """)
+        print("✅ Tablas 'sorteo_id_secuencia', 'sorteo_id_libre' y trigger 'trg_sorteo_liberar_id' listos")
+
+        # Bloquear la tabla sorteo mientras se calculan los huecos actuales
+        cursor.execute("SELECT id FROM sorteo ORDER BY id FOR UPDATE")
+        ids = [fila[0] for fila in cursor.fetchall()]
+        maximo = ids[-1] if ids else 0
+
+        ocupados = set(ids)
+        libres = [(sorteo_id,) for sorteo_id in range(1, maximo) if sorteo_id not in ocupados]
+        for lote in bulk.chunked(libres, 1000):
+            bulk.insertar_filas(cursor, "INSERT IGNORE INTO sorteo_id_libre (id) VALUES", lote)
+
+        cursor.execute("""
+        INSERT INTO sorteo_id_secuencia (nombre, siguiente) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE siguiente = GREATEST(siguiente, VALUES(siguiente))
+        """, (SECUENCIA_SORTEO, maximo + 1))
+
+        connection.commit()
+        print(f"✅ {len(libres)} IDs libres cargados, siguiente ID nuevo: {maximo + 1}")
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        if connection:
+            connection.rollback()
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Creando asignador de IDs de sorteo...")
+    crear_asignador_ids_sorteo()
+    print("Proceso completado.")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Script para crear la tabla sorteo_evento, donde la API registra los eventos
+(ganadores, cambios de estado, finalización) que se envían a las pantallas
+por /sorteos/{id}/eventos.
+"""
+
+import mysql.connector
+from config.database import DB_CONFIG
+
+def crear_eventos_sorteo():
+    """Crea la tabla sorteo_evento si no existe"""
+    connection = None
+    cursor = None
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sorteo_evento (
+            id BIGINT NOT NULL AUTO_INCREMENT,
+            id_sorteo INT NOT NULL,
+            tipo VARCHAR(30) NOT NULL,
+            datos TEXT NOT NULL,
+            fecha TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id),
+            KEY idx_sorteo_evento_sorteo (id_sorteo, id),
+            CONSTRAINT fk_sorteo_evento_sorteo FOREIGN KEY (id_sorteo) REFERENCES sorteo (id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+        """)
+        connection.commit()
+        print("✅ Tabla 'sorteo_evento' lista")
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Creando tabla de eventos de sorteo...")
+    crear_eventos_sorteo()
+    print("Proceso completado.")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script para crear la tabla sorteo_preparacion (orden de revelación precargado)
+"""
+
+import mysql.connector
+from config.database import DB_CONFIG
+
+def crear_tabla_sorteo_preparacion():
+    """Crea la tabla sorteo_preparacion si no existe"""
+    connection = None
+    cursor = None
+    
+    try:
+        # Conectar a la base de datos
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+        
+        # `orden` guarda los IDs de detalle_sorteo permutados, 4 bytes por ID
+        create_query = """
+        CREATE TABLE IF NOT EXISTS sorteo_preparacion (
+            id_sorteo INT NOT NULL,
+            semilla BIGINT UNSIGNED NOT NULL,
+            total INT NOT NULL,
+            posicion INT NOT NULL DEFAULT 0,
+            orden LONGBLOB NOT NULL,
+            fecha_preparacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id_sorteo),
+            CONSTRAINT fk_sorteo_preparacion_sorteo FOREIGN KEY (id_sorteo)
+                REFERENCES sorteo (id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+        """
+        
+        cursor.execute(create_query)
+        connection.commit()
+        
+        print("✅ Tabla 'sorteo_preparacion' lista")
+        
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        if connection:
+            connection.rollback()
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Creando tabla sorteo_preparacion...")
+    crear_tabla_sorteo_preparacion()
+    print("Proceso completado.")
@@ -0,0 +1,148 @@
+"""
+Acceso asíncrono a MySQL para los endpoints `async def`.
+
+Con aiomysql instalado (`pip install aiomysql`) las consultas usan un pool
+asyncio propio y no ocupan hilos: miles de pantallas consultando a la vez son
+solo corrutinas esperando. Sin aiomysql, AsyncDatabaseConnection.execute_query
+ejecuta DatabaseConnection.execute_query en un hilo, con como mucho
+POOL_CONFIG["pool_size"] hilos a la vez, así las esperas se acumulan como
+corrutinas en lugar de agotar el threadpool de Starlette o el pool de
+conexiones.
+
+en_hilo() es el mismo puente para llamar desde código asíncrono a los
+servicios síncronos, que siguen siendo los que usan los scripts.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from typing import Optional
+
+import anyio
+from fastapi import HTTPException
+
+from config.database import DB_CONFIG, POOL_CONFIG, ASYNC_POOL_CONFIG, DatabaseConnection
+from database.instrumentacion import medicion_actual
+
+try:
+    import aiomysql
+except ImportError:  # aiomysql es opcional: sin él se usa el pool síncrono desde hilos
+    aiomysql = None
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock: Optional[asyncio.Lock] = None
+_limitador: Optional[anyio.CapacityLimiter] = None
+
+
+async def en_hilo(func, *args, **kwargs):
+    """Ejecuta una función bloqueante en un hilo, con a lo sumo pool_size a la vez"""
+    global _limitador
+    if _limitador is None:
+        _limitador = anyio.CapacityLimiter(POOL_CONFIG["pool_size"])
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_limitador)
+
+
+class AsyncDatabaseConnection:
+    """Equivalente asíncrono de DatabaseConnection"""
+
+    disponible = aiomysql is not None
+
+    @staticmethod
+    async def _obtener_pool():
+        global _pool, _pool_lock
+        if _pool is not None:
+            return _pool
+        if _pool_lock is None:
+            _pool_lock = asyncio.Lock()
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    host=DB_CONFIG["host"],
+                    port=DB_CONFIG["port"],
+                    user=DB_CONFIG["user"],
+                    password=DB_CONFIG["password"],
+                    db=DB_CONFIG["database"],
+                    minsize=ASYNC_POOL_CONFIG["minsize"],
+                    maxsize=ASYNC_POOL_CONFIG["maxsize"],
+                    pool_recycle=ASYNC_POOL_CONFIG["pool_recycle"],
+                    # Cada lectura ve lo último confirmado, sin arrastrar una
+                    # instantánea de una petición anterior en la conexión reutilizada
+                    autocommit=True
+                )
+        return _pool
+
+    @staticmethod
+    async def execute_query(query: str, params: tuple = None, fetch_one: bool = False, fetch_all: bool = False):
+        """Ejecuta una consulta SQL y retorna el resultado (filas como diccionarios)"""
+        if not AsyncDatabaseConnection.disponible:
+            return await en_hilo(DatabaseConnection.execute_query, query, params, fetch_one, fetch_all)
+
+        medicion = medicion_actual()
+        inicio = time.perf_counter()
+        try:
+            pool = await AsyncDatabaseConnection._obtener_pool()
+            connection = await asyncio.wait_for(pool.acquire(), timeout=ASYNC_POOL_CONFIG["wait_timeout"])
+        except asyncio.TimeoutError:
+            logger.error("Pool de conexiones asíncrono agotado")
+            raise HTTPException(
+                status_code=503,
+                detail="Base de datos ocupada, intente nuevamente"
+            )
+        except aiomysql.Error as err:
+            logger.error(f"Error conectando a la base de datos: {err}")
+            raise HTTPException(
+                status_code=500,
+                detail="Error de conexión a la base de datos"
+            )
+        finally:
+            if medicion is not None:
+                medicion.registrar_conexion(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        try:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                if fetch_one:
+                    resultado = await cursor.fetchone()
+                    filas = 1 if resultado is not None else 0
+                elif fetch_all:
+                    resultado = await cursor.fetchall()
+                    filas = len(resultado)
+                else:
+                    resultado = cursor.rowcount
+                    filas = 0
+            if medicion is not None:
+                # La lectura de las filas ya está incluida en el tiempo de la sentencia
+                medicion.registrar_sentencia(query, params, time.perf_counter() - inicio)
+                medicion.registrar_filas(filas, 0.0)
+            return resultado
+        except aiomysql.Error as err:
+            logger.error(f"Error ejecutando consulta: {err}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error en la base de datos: {str(err)}"
+            )
+        finally:
+            pool.release(connection)
+
+    @staticmethod
+    async def cerrar():
+        """Cierra el pool asíncrono (al apagar la aplicación)"""
+        global _pool
+        if _pool is None:
+            return
+        pool, _pool = _pool, None
+        pool.close()
+        await pool.wait_closed()
+
+    @staticmethod
+    def pool_stats() -> dict:
+        if not AsyncDatabaseConnection.disponible:
+            return {"driver": "hilos", "max_hilos": POOL_CONFIG["pool_size"]}
+        if _pool is None:
+            return {"driver": "aiomysql", "abiertas": 0}
+        return {"driver": "aiomysql", "abiertas": _pool.size, "libres": _pool.freesize, "maximo": _pool.maxsize}
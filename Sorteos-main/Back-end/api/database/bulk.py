@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Iterable, List, Sequence, Set
+
+from models.participante import Participante
+
+
+def chunked(items: Sequence, size: int) -> Iterable[Sequence]:
+    """Divide una secuencia en lotes de tamaño máximo `size`"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def patron_prefijo(prefijo: str) -> str:
+    """
+    Patrón LIKE que solo coincide con textos que empiezan con `prefijo`
+    literal: escapa los comodines % y _ (y la barra invertida) del prefijo.
+    Con `LIKE CAST(%s AS BINARY)` además se distinguen mayúsculas.
+    """
+    escapado = prefijo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escapado + "%"
+
+
+def deduplicar_participantes(participantes: List[Participante]):
+    """
+    Elimina documentos repetidos conservando la primera aparición.
+    Retorna (participantes_unicos, documentos_duplicados).
+    """
+    unicos = {}
+    duplicados = []
+    for participante in participantes:
+        if participante.documento in unicos:
+            duplicados.append(participante.documento)
+        else:
+            unicos[participante.documento] = participante
+    return list(unicos.values()), duplicados
+
+
+def insertar_filas(cursor, sentencia: str, filas: List[tuple]) -> int:
+    """
+    Ejecuta un INSERT de varias filas en una sola sentencia.
+
+    `sentencia` es el prefijo hasta VALUES, p.ej.
+    "INSERT IGNORE INTO participantes (documento, nombre) VALUES".
+    Retorna el número de filas afectadas.
+    """
+    if not filas:
+        return 0
+    placeholder = "(" + ", ".join(["%s"] * len(filas[0])) + ")"
+    query = f"{sentencia} " + ", ".join([placeholder] * len(filas))
+    params = [valor for fila in filas for valor in fila]
+    cursor.execute(query, params)
+    return cursor.rowcount
+
+
+def documentos_existentes(cursor, documentos: List[str]) -> Set[str]:
+    """Retorna el subconjunto de documentos que ya están en la tabla participantes"""
+    if not documentos:
+        return set()
+    placeholders = ", ".join(["%s"] * len(documentos))
+    cursor.execute(
+        f"SELECT documento FROM participantes WHERE documento IN ({placeholders})",
+        list(documentos)
+    )
+    return {fila[0] if isinstance(fila, tuple) else fila["documento"] for fila in cursor.fetchall()}
+
+
+def insertar_participantes(cursor, participantes: List[Participante], fecha: datetime = None) -> int:
+    """
+    Inserta participantes nuevos con un único INSERT IGNORE de varias filas.
+    Los documentos que ya existan se ignoran; retorna cuántos se insertaron.
+    """
+    fecha = fecha or datetime.now()
+    filas = [(p.documento, p.nombre, fecha) for p in participantes]
+    return insertar_filas(
+        cursor,
+        "INSERT IGNORE INTO participantes (documento, nombre, fecha_registro) VALUES",
+        filas
+    )
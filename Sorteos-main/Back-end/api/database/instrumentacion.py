@@ -0,0 +1,197 @@
+"""
+Medición de las consultas SQL de cada petición.
+
+Mientras una petición está en curso (ver el middleware de main.py), los
+cursores que entregan las conexiones del pool se envuelven en CursorMedido:
+cada sentencia suma al contador de la petición su tiempo y las filas que
+devuelve. Se mide también cuánto se esperó por conexiones del pool. Con eso
+la respuesta lleva un encabezado Server-Timing, las sentencias lentas se
+registran en el log (sin sus parámetros) y cada ruta puede tener un
+presupuesto de consultas que detecta regresiones N+1. Los presupuestos
+excedidos en modo estricto se acumulan aquí para que las pruebas fallen con
+verificar_presupuestos(); la respuesta ya confirmada nunca se convierte en
+un error.
+
+Fuera de una petición (scripts, tareas de fondo) no hay medición y los
+cursores se entregan sin envolver.
+"""
+
+import contextvars
+import heapq
+import logging
+import re
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+_medicion_actual: contextvars.ContextVar = contextvars.ContextVar("medicion_consultas", default=None)
+
+_presupuestos_excedidos: List[str] = []
+_presupuestos_lock = threading.Lock()
+
+_LITERAL_TEXTO = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_LITERAL_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_ESPACIOS = re.compile(r"\s+")
+# Caracteres de SQL que se conservan en el log
+LARGO_MAXIMO_SQL = 300
+
+
+class PresupuestoConsultasExcedido(Exception):
+    """Alguna petición ejecutó más consultas que el presupuesto de su ruta (ver verificar_presupuestos)"""
+    pass
+
+
+def registrar_presupuesto_excedido(mensaje: str):
+    with _presupuestos_lock:
+        _presupuestos_excedidos.append(mensaje)
+
+
+def verificar_presupuestos():
+    """
+    Lanza PresupuestoConsultasExcedido si alguna petición superó su
+    presupuesto desde la última verificación (para pruebas y CI con
+    presupuesto_estricto) y vacía el registro.
+    """
+    with _presupuestos_lock:
+        excedidos = list(_presupuestos_excedidos)
+        _presupuestos_excedidos.clear()
+    if excedidos:
+        raise PresupuestoConsultasExcedido("; ".join(excedidos))
+
+
+def redactar_sql(sql) -> str:
+    """La sentencia sin literales (los parámetros nunca se incluyen), en una línea y recortada"""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", errors="replace")
+    sql = _LITERAL_TEXTO.sub("?", sql)
+    sql = _LITERAL_NUMERO.sub("?", sql)
+    sql = _ESPACIOS.sub(" ", sql).strip()
+    if len(sql) > LARGO_MAXIMO_SQL:
+        sql = sql[:LARGO_MAXIMO_SQL] + "..."
+    return sql
+
+
+class MedicionSolicitud:
+    """Consultas, filas y tiempos de base de datos de una petición"""
+
+    def __init__(self, maximo_lentas: int = 5):
+        # Los servicios síncronos y las lecturas asíncronas de una misma
+        # petición pueden registrar desde hilos distintos
+        self._lock = threading.Lock()
+        self._maximo_lentas = maximo_lentas
+        self.consultas = 0
+        self.filas = 0
+        self.conexiones = 0
+        self.tiempo_db = 0.0
+        self.tiempo_conexion = 0.0
+        self._lentas: List[Tuple[float, int, str, int]] = []
+
+    def registrar_sentencia(self, sql, parametros, duracion: float):
+        with self._lock:
+            self.consultas += 1
+            self.tiempo_db += duracion
+            # Las más lentas, en un heap acotado (duración, orden, sql, cantidad de parámetros)
+            entrada = (duracion, self.consultas, sql, len(parametros) if parametros else 0)
+            if len(self._lentas) < self._maximo_lentas:
+                heapq.heappush(self._lentas, entrada)
+            elif duracion > self._lentas[0][0]:
+                heapq.heapreplace(self._lentas, entrada)
+
+    def registrar_filas(self, cantidad: int, duracion: float):
+        with self._lock:
+            self.filas += cantidad
+            self.tiempo_db += duracion
+
+    def registrar_conexion(self, duracion: float):
+        with self._lock:
+            self.conexiones += 1
+            self.tiempo_conexion += duracion
+
+    def lentas(self, umbral: float) -> List[Tuple[float, str, int]]:
+        """(duración, sql redactado, cantidad de parámetros) de las sentencias de al menos `umbral` segundos, la más lenta primero"""
+        with self._lock:
+            entradas = sorted(self._lentas, reverse=True)
+        return [(duracion, redactar_sql(sql), parametros) for duracion, _, sql, parametros in entradas if duracion >= umbral]
+
+    def server_timing(self, total: float) -> str:
+        """Valor del encabezado Server-Timing (duraciones en milisegundos)"""
+        return (
+            f'db;dur={self.tiempo_db * 1000:.1f};desc="{self.consultas} consultas, {self.filas} filas", '
+            f'conexion;dur={self.tiempo_conexion * 1000:.1f};desc="{self.conexiones} conexiones", '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+
+def medicion_actual() -> Optional[MedicionSolicitud]:
+    """Medición de la petición en curso, si la hay"""
+    return _medicion_actual.get()
+
+
+def iniciar_medicion(maximo_lentas: int = 5):
+    """Abre la medición de una petición; retorna (medición, token para terminar_medicion)"""
+    medicion = MedicionSolicitud(maximo_lentas)
+    return medicion, _medicion_actual.set(medicion)
+
+
+def terminar_medicion(token):
+    try:
+        _medicion_actual.reset(token)
+    except ValueError:
+        # Se terminó en otro contexto
+        pass
+
+
+class CursorMedido:
+    """Cursor de mysql.connector que registra sus sentencias y filas en la medición de la petición"""
+
+    def __init__(self, cursor, medicion: MedicionSolicitud):
+        self._cursor = cursor
+        self._medicion = medicion
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        # Iterar el cursor es leer fila por fila: pasar por fetchone para contarlas
+        return iter(self.fetchone, None)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._medicion.registrar_sentencia(operation, params, time.perf_counter() - inicio)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._medicion.registrar_sentencia(operation, None, time.perf_counter() - inicio)
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        fila = self._cursor.fetchone()
+        self._medicion.registrar_filas(1 if fila is not None else 0, time.perf_counter() - inicio)
+        return fila
+
+    def fetchmany(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        filas = self._cursor.fetchmany(*args, **kwargs)
+        self._medicion.registrar_filas(len(filas), time.perf_counter() - inicio)
+        return filas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        filas = self._cursor.fetchall()
+        self._medicion.registrar_filas(len(filas), time.perf_counter() - inicio)
+        return filas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
@@ -0,0 +1,260 @@
+import threading
+import time
+import logging
+from collections import deque
+
+import mysql.connector
+from mysql.connector import Error
+
+from database.instrumentacion import CursorMedido, medicion_actual
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no hay conexiones libres dentro del tiempo de espera"""
+    pass
+
+
+class PooledConnection:
+    """
+    Envoltorio de una conexión MySQL prestada por el pool.
+
+    Se comporta como la conexión original, pero close() la devuelve al pool
+    en lugar de cerrarla, de modo que el código existente
+    (``connection.close()`` en los bloques finally) sigue funcionando igual.
+    """
+
+    def __init__(self, pool, raw_connection, created_at):
+        self._pool = pool
+        self._raw = raw_connection
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        """Cursor de la conexión; dentro de una petición medida registra sus consultas"""
+        cursor = self._raw.cursor(*args, **kwargs)
+        medicion = medicion_actual()
+        if medicion is None:
+            return cursor
+        return CursorMedido(cursor, medicion)
+
+    def is_connected(self) -> bool:
+        """Una conexión devuelta al pool se considera cerrada para quien la pidió"""
+        if self._released:
+            return False
+        return self._raw.is_connected()
+
+    def close(self):
+        """Devuelve la conexión al pool (es seguro llamarlo más de una vez)"""
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+
+    def descartar(self):
+        """
+        Cierra la conexión en lugar de devolverla al pool. Útil cuando quedan
+        muchas filas sin leer (p.ej. un streaming abandonado por el cliente) y
+        consumirlas costaría más que abrir una conexión nueva.
+        """
+        if self._released:
+            return
+        self._released = True
+        self._pool._drop(self._raw, recycled=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones MySQL.
+
+    - pool_size: número máximo de conexiones abiertas (en uso + libres).
+    - max_lifetime: segundos tras los cuales una conexión se recicla.
+    - wait_timeout: segundos que se espera por una conexión libre antes de
+      lanzar PoolTimeoutError.
+    - health_check_after: segundos de inactividad tras los cuales se hace
+      ping a la conexión antes de entregarla.
+    """
+
+    def __init__(self, db_config: dict, pool_size: int = 10, max_lifetime: float = 1800,
+                 wait_timeout: float = 5, health_check_after: float = 30):
+        self._db_config = db_config
+        self.pool_size = pool_size
+        self.max_lifetime = max_lifetime
+        self.wait_timeout = wait_timeout
+        self.health_check_after = health_check_after
+
+        self._condition = threading.Condition()
+        # Conexiones libres: (conexión, creada_en, último_uso)
+        self._idle = deque()
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+
+        # Estadísticas acumuladas
+        self._checkouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+
+    def _connect(self):
+        return mysql.connector.connect(**self._db_config)
+
+    def _close_quietly(self, raw_connection):
+        try:
+            raw_connection.close()
+        except Error:
+            pass
+
+    def _is_healthy(self, raw_connection) -> bool:
+        try:
+            raw_connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def acquire(self) -> PooledConnection:
+        """Obtiene una conexión sana del pool, esperando si está agotado"""
+        start = time.monotonic()
+        deadline = start + self.wait_timeout
+
+        while True:
+            candidate = None
+            must_create = False
+
+            with self._condition:
+                while not self._idle and self._open >= self.pool_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No hay conexiones disponibles tras {self.wait_timeout}s "
+                            f"(pool_size={self.pool_size})"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._condition.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+                if self._idle:
+                    candidate = self._idle.pop()
+                else:
+                    must_create = True
+                # Reservar el cupo antes de soltar el lock
+                if must_create:
+                    self._open += 1
+                self._in_use += 1
+
+            if must_create:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._condition:
+                        self._open -= 1
+                        self._in_use -= 1
+                        self._condition.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._condition:
+                    self._created += 1
+                    self._checkouts += 1
+                    self._wait_time_total += created_at - start
+                return PooledConnection(self, raw, created_at)
+
+            raw, created_at, last_used = candidate
+            now = time.monotonic()
+
+            if now - created_at >= self.max_lifetime:
+                self._drop(raw, recycled=True)
+                continue
+
+            if now - last_used >= self.health_check_after and not self._is_healthy(raw):
+                self._drop(raw, recycled=False)
+                continue
+
+            with self._condition:
+                self._checkouts += 1
+                self._wait_time_total += now - start
+            return PooledConnection(self, raw, created_at)
+
+    def _drop(self, raw_connection, recycled: bool):
+        """Cierra una conexión que sale del pool y libera su cupo"""
+        self._close_quietly(raw_connection)
+        with self._condition:
+            self._open -= 1
+            self._in_use -= 1
+            if recycled:
+                self._recycled += 1
+            else:
+                self._discarded += 1
+            self._condition.notify()
+
+    def _release(self, raw_connection, created_at):
+        """Recibe una conexión devuelta por PooledConnection.close()"""
+        reusable = True
+        try:
+            if not raw_connection.is_connected():
+                reusable = False
+            else:
+                if raw_connection.unread_result:
+                    raw_connection.consume_results()
+                if raw_connection.in_transaction:
+                    # Nunca dejar una transacción abierta a quien reciba la conexión
+                    raw_connection.rollback()
+        except Error as err:
+            logger.warning(f"Descartando conexión al devolverla al pool: {err}")
+            reusable = False
+
+        if reusable and time.monotonic() - created_at >= self.max_lifetime:
+            self._drop(raw_connection, recycled=True)
+            return
+
+        if not reusable:
+            self._drop(raw_connection, recycled=False)
+            return
+
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append((raw_connection, created_at, time.monotonic()))
+            self._condition.notify()
+
+    def close_all(self):
+        """Cierra las conexiones libres (las prestadas se cierran al devolverse)"""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for raw, _, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self) -> dict:
+        """Estadísticas del pool para monitoreo"""
+        with self._condition:
+            return {
+                "pool_size": self.pool_size,
+                "abiertas": self._open,
+                "en_uso": self._in_use,
+                "libres": len(self._idle),
+                "esperando": self._waiting,
+                "prestamos": self._checkouts,
+                "creadas": self._created,
+                "recicladas": self._recycled,
+                "descartadas": self._discarded,
+                "timeouts": self._timeouts,
+                "espera_promedio_ms": round(
+                    (self._wait_time_total / self._checkouts) * 1000, 3
+                ) if self._checkouts else 0.0,
+            }
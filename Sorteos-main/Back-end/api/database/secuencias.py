@@ -0,0 +1,63 @@
+"""
+Asignación de IDs de sorteo en tiempo constante.
+
+Los IDs liberados (sorteos borrados) se guardan en `sorteo_id_libre` mediante
+un trigger AFTER DELETE, y se reutilizan empezando por el menor, como hacía la
+búsqueda del primer hueco. Si no hay ninguno libre se toma el siguiente valor
+de `sorteo_id_secuencia`. Ambas operaciones son lecturas por clave primaria
+con bloqueo de fila dentro de la transacción de quien llama: dos creaciones
+concurrentes nunca obtienen el mismo ID, y si la transacción se revierte el
+ID vuelve a quedar disponible.
+"""
+
+import mysql.connector
+
+SECUENCIA_SORTEO = "sorteo"
+
+# Reintentos si un ID asignado ya estaba ocupado (p.ej. un INSERT manual con ID explícito)
+REINTENTOS_ID_OCUPADO = 3
+_ERROR_DUPLICADO = 1062
+
+
+def asignar_id_sorteo(cursor) -> int:
+    """Toma un ID libre para un sorteo nuevo (sin commit)"""
+    # El menor ID liberado; si otra transacción lo tiene bloqueado, InnoDB
+    # espera a que termine y continúa con el siguiente
+    cursor.execute("""
+        SELECT id FROM sorteo_id_libre
+        ORDER BY id
+        LIMIT 1
+        FOR UPDATE
+    """)
+    fila = cursor.fetchone()
+    if fila:
+        cursor.execute("DELETE FROM sorteo_id_libre WHERE id = %s", (fila[0],))
+        return fila[0]
+
+    cursor.execute("""
+        UPDATE sorteo_id_secuencia
+        SET siguiente = LAST_INSERT_ID(siguiente + 1)
+        WHERE nombre = %s
+    """, (SECUENCIA_SORTEO,))
+    if cursor.rowcount == 0:
+        raise mysql.connector.ProgrammingError(
+            msg="Falta la secuencia de sorteos: ejecute crear_asignador_ids_sorteo.py"
+        )
+    cursor.execute("SELECT LAST_INSERT_ID()")
+    return cursor.fetchone()[0] - 1
+
+
+def insertar_con_id_asignado(cursor, query: str, params: tuple) -> int:
+    """
+    Ejecuta un INSERT en sorteo cuyo primer parámetro es el ID, asignándolo con
+    asignar_id_sorteo. Retorna el ID usado.
+    """
+    for intento in range(REINTENTOS_ID_OCUPADO):
+        sorteo_id = asignar_id_sorteo(cursor)
+        try:
+            cursor.execute(query, (sorteo_id, *params))
+            return sorteo_id
+        except mysql.connector.IntegrityError as e:
+            if e.errno != _ERROR_DUPLICADO or intento == REINTENTOS_ID_OCUPADO - 1:
+                raise
+            print(f"ID de sorteo {sorteo_id} ya ocupado, asignando otro")
@@ -0,0 +1,63 @@
+import logging
+from typing import Iterator
+
+from mysql.connector import Error
+
+from config.database import DatabaseConnection
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Filas que se piden al servidor por cada lectura del cursor
+FILAS_POR_LECTURA = 500
+
+
+class ConsultaStreaming:
+    """
+    Consulta cuyas filas se leen del servidor a medida que se consumen.
+
+    Usa un cursor sin buffer (el predeterminado de mysql-connector), así que
+    la memoria no depende del número de filas. La consulta se ejecuta al
+    crear el objeto, de modo que los errores de conexión (503) o SQL ocurren
+    antes de empezar a enviar la respuesta. La conexión queda tomada del pool
+    hasta terminar de iterar o hasta llamar a cerrar().
+    """
+
+    def __init__(self, query: str, params: tuple = ()):
+        # Conexión propia: se sigue leyendo después de que el endpoint retorna
+        self._connection = DatabaseConnection.get_connection(compartida=False)
+        self._cursor = None
+        self._terminada = False
+        try:
+            self._cursor = self._connection.cursor(dictionary=True)
+            self._cursor.execute(query, params)
+        except Error:
+            self.cerrar()
+            raise
+
+    def __iter__(self) -> Iterator[dict]:
+        try:
+            while True:
+                filas = self._cursor.fetchmany(FILAS_POR_LECTURA)
+                if not filas:
+                    self._terminada = True
+                    break
+                yield from filas
+        except Error as err:
+            # La respuesta ya empezó: solo se puede registrar y cortar
+            logger.error(f"Error leyendo consulta en streaming: {err}")
+        finally:
+            self.cerrar()
+
+    def cerrar(self):
+        """Libera la conexión (es seguro llamarlo más de una vez)"""
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        if self._terminada:
+            if self._cursor:
+                self._cursor.close()
+            connection.close()
+        else:
+            # Quedaron filas sin leer: cerrar la conexión es más barato que consumirlas
+            connection.descartar()
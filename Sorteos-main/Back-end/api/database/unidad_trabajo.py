@@ -0,0 +1,222 @@
+"""
+Una conexión del pool compartida por los servicios de una petición.
+
+La unidad de trabajo solo comparte la conexión: cada servicio sigue abriendo
+y confirmando (o revirtiendo) su propia transacción, así que si un endpoint
+llama a dos servicios y el segundo falla, lo que confirmó el primero queda
+confirmado. Los endpoints que necesitan que todo lo que hacen sea atómico
+declaran además la dependencia `transaccion_de_peticion` y pasan la
+TransaccionPeticion a los servicios que la aceptan: esos servicios trabajan
+sobre su conexión sin confirmar, y la dependencia confirma al terminar el
+endpoint o revierte si lanzó una excepción (incluida una HTTPException).
+"""
+
+import contextvars
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from fastapi import Depends
+from mysql.connector import Error
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+_unidad_actual: contextvars.ContextVar = contextvars.ContextVar("unidad_trabajo", default=None)
+
+
+def unidad_actual() -> Optional["UnidadTrabajo"]:
+    """Unidad de trabajo de la petición en curso, si la hay"""
+    return _unidad_actual.get()
+
+
+class ConexionPrestada:
+    """
+    La conexión de la petición, prestada a un servicio.
+
+    Se comporta como una conexión del pool: close() la devuelve a la unidad
+    de trabajo (no al pool), descartando antes resultados sin leer y
+    revirtiendo lo que no se haya confirmado, igual que hace el pool. Así
+    cada servicio conserva sus propios límites de transacción.
+    """
+
+    def __init__(self, unidad: "UnidadTrabajo", connection):
+        self._unidad = unidad
+        self._connection = connection
+        self._devuelta = False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def is_connected(self) -> bool:
+        if self._devuelta:
+            return False
+        return self._connection.is_connected()
+
+    def close(self):
+        """Devuelve la conexión a la unidad de trabajo (es seguro llamarlo más de una vez)"""
+        if self._devuelta:
+            return
+        self._devuelta = True
+        self._unidad._devolver(self._connection)
+
+    def descartar(self):
+        """Cierra la conexión de la petición; el siguiente préstamo toma otra del pool"""
+        if self._devuelta:
+            return
+        self._devuelta = True
+        self._unidad._descartar(self._connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class UnidadTrabajo:
+    """
+    Una conexión del pool por petición.
+
+    La conexión se toma del pool la primera vez que un servicio la pide (las
+    peticiones que se resuelven con la caché no toman ninguna) y se presta a
+    los servicios de a uno: DatabaseConnection.get_connection() la entrega
+    mientras esté libre. Si un servicio la pide mientras otro la tiene (una
+    llamada anidada), recibe una conexión aparte del pool, como antes, para
+    no mezclar sus transacciones. Al terminar la petición vuelve al pool.
+
+    No confirma ni revierte nada por su cuenta más allá de revertir lo que un
+    servicio dejó sin confirmar al devolver la conexión.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self._prestada = False
+        self.prestamos = 0
+
+    @staticmethod
+    def _adquirir():
+        # Importación local: config.database importa este módulo
+        from config.database import DatabaseConnection
+        return DatabaseConnection.get_connection(compartida=False)
+
+    def prestar(self) -> Optional[ConexionPrestada]:
+        """La conexión de la petición, o None si ya está prestada"""
+        with self._lock:
+            if self._prestada:
+                return None
+            self._prestada = True
+        try:
+            if self._connection is None:
+                self._connection = UnidadTrabajo._adquirir()
+        except Exception:
+            with self._lock:
+                self._prestada = False
+            raise
+        self.prestamos += 1
+        return ConexionPrestada(self, self._connection)
+
+    def _devolver(self, connection):
+        try:
+            if connection.unread_result:
+                connection.consume_results()
+            if connection.in_transaction:
+                connection.rollback()
+        except Error as err:
+            logger.warning(f"Descartando la conexión de la petición: {err}")
+            self._descartar(connection)
+            return
+        with self._lock:
+            self._prestada = False
+
+    def _descartar(self, connection):
+        connection.descartar()
+        with self._lock:
+            if self._connection is connection:
+                self._connection = None
+            self._prestada = False
+
+    def cerrar(self):
+        """Devuelve la conexión al pool (el pool revierte lo no confirmado)"""
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+
+
+async def unidad_de_trabajo():
+    """
+    Dependencia de FastAPI: abre una unidad de trabajo para la petición.
+
+    Es asíncrona a propósito: así la variable de contexto queda fijada en la
+    tarea de la petición y los endpoints síncronos (que corren en el
+    threadpool con una copia de ese contexto) la ven.
+    """
+    unidad = UnidadTrabajo()
+    token = _unidad_actual.set(unidad)
+    try:
+        yield unidad
+    finally:
+        try:
+            _unidad_actual.reset(token)
+        except ValueError:
+            # La salida de la dependencia corrió en otro contexto
+            pass
+        unidad.cerrar()
+
+
+class TransaccionPeticion:
+    """
+    Una transacción que abarca todo el endpoint, sobre la conexión de la
+    unidad de trabajo.
+
+    Los servicios que la reciben no confirman ni revierten: dejan lo que
+    deba ocurrir después del commit (p.ej. avisar a los repartidores de
+    eventos) en al_confirmar().
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._al_confirmar: List[Callable[[], None]] = []
+
+    def al_confirmar(self, accion: Callable[[], None]):
+        """Ejecuta `accion` después del commit (no se ejecuta si se revierte)"""
+        self._al_confirmar.append(accion)
+
+    def confirmar(self):
+        self.connection.commit()
+        acciones, self._al_confirmar = self._al_confirmar, []
+        for accion in acciones:
+            accion()
+
+    def revertir(self):
+        self._al_confirmar = []
+        try:
+            self.connection.rollback()
+        except Error as err:
+            logger.warning(f"Error revirtiendo la transacción de la petición: {err}")
+
+
+def transaccion_de_peticion(unidad: UnidadTrabajo = Depends(unidad_de_trabajo)):
+    """
+    Dependencia de FastAPI: la transacción de la petición.
+
+    Toma la conexión de la unidad de trabajo durante todo el endpoint (los
+    servicios que no reciben la transacción usan otra del pool). Se declara
+    con scope="function" para que confirme antes de enviar la respuesta: una
+    respuesta exitosa implica que los cambios ya están confirmados.
+    """
+    connection = unidad.prestar()
+    if connection is None:
+        connection = UnidadTrabajo._adquirir()
+    transaccion = TransaccionPeticion(connection)
+    try:
+        yield transaccion
+    except Exception:
+        transaccion.revertir()
+        raise
+    else:
+        transaccion.confirmar()
+    finally:
+        connection.close()
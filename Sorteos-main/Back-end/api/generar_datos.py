@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Genera datos sintéticos en participantes, sorteo y detalle_sorteo para
+reproducir los problemas de escala (10 mil a 10 millones de participantes).
+
+- Participantes con documento `<prefijo>_<número de 9 dígitos>` y nombres aleatorios.
+- Solapamiento realista: una fracción de participantes "habituales" se
+  inscribe en muchos sorteos y el resto aparece en pocos.
+- Estados mezclados: sorteos finalizados (ganadores y perdedores), en curso
+  (algunos ganadores ya sorteados) y nuevos, con algunos eliminados y
+  descalificados. Los contadores y ultimo_numero de cada sorteo quedan
+  consistentes con sus filas.
+
+Las filas se cargan con INSERT de varias filas (--lote por sentencia) o, con
+--load-data, con LOAD DATA LOCAL INFILE (requiere local_infile=ON en el
+servidor), que es lo más rápido para decenas de millones de filas. Los IDs de
+sorteo se toman del asignador (crear_asignador_ids_sorteo.py).
+
+Los IDs de los sorteos creados y la cantidad de participantes se guardan en
+generar_datos_<prefijo>.json; --limpiar borra exactamente esas filas (nunca
+por patrón) y elimina el archivo.
+
+Uso:
+    python generar_datos.py --participantes 100000 --sorteos 20 --por-sorteo 20000
+    python generar_datos.py --participantes 10000000 --sorteos 100 --por-sorteo 500000 --load-data
+    python generar_datos.py --limpiar
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+import mysql.connector
+from config.database import DB_CONFIG
+from database import bulk
+from database.secuencias import asignar_id_sorteo
+from models.sorteo import EstadoParticipacion, EstadoSorteo
+from services.seleccion_aleatoria import ESTADOS_ELEGIBLES
+
+PREFIJO = "gen"
+
+NOMBRES = [
+    "Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Andrés", "Camila", "Jorge", "Valentina",
+    "Diego", "Daniela", "Santiago", "Sofía", "Felipe", "Paula", "Alejandro", "Natalia", "Miguel", "Carolina",
+]
+APELLIDOS = [
+    "Gómez", "Rodríguez", "Martínez", "García", "López", "Hernández", "González", "Pérez", "Sánchez", "Ramírez",
+    "Torres", "Díaz", "Vargas", "Moreno", "Rojas", "Jiménez", "Castro", "Ortiz", "Hoyos", "Muñoz",
+]
+PREMIOS = [1, 1, 3, 5, 10, 50]
+
+# Filas escritas por archivo temporal con --load-data
+FILAS_POR_ARCHIVO = 1_000_000
+# Filas borradas por sentencia al limpiar
+LOTE_BORRADO = 50_000
+# Documentos por DELETE ... IN al limpiar participantes
+LOTE_BORRADO_DOCUMENTOS = 5_000
+
+
+class Cargador:
+    """Inserta filas por lotes, con INSERT de varias filas o LOAD DATA LOCAL INFILE"""
+
+    def __init__(self, connection, lote: int, load_data: bool):
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.lote = lote
+        self.load_data = load_data
+
+    def cargar(self, tabla: str, columnas: tuple, filas) -> int:
+        """Carga las filas (un iterable de tuplas) y confirma cada lote; retorna cuántas se cargaron"""
+        filas = iter(filas)
+        total = 0
+        tamano = FILAS_POR_ARCHIVO if self.load_data else self.lote
+        while True:
+            bloque = list(islice(filas, tamano))
+            if not bloque:
+                return total
+            if self.load_data:
+                self._load_data(tabla, columnas, bloque)
+            else:
+                bulk.insertar_filas(self.cursor, f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES", bloque)
+            # Confirmar por lote para no acumular un undo log de millones de filas
+            self.connection.commit()
+            total += len(bloque)
+
+    def _load_data(self, tabla: str, columnas: tuple, filas: list):
+        descriptor, ruta = tempfile.mkstemp(suffix=".tsv")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+                for fila in filas:
+                    archivo.write("\t".join("\\N" if valor is None else str(valor) for valor in fila))
+                    archivo.write("\n")
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {tabla} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columnas)})",
+                (ruta,)
+            )
+        finally:
+            os.remove(ruta)
+
+    def cerrar(self):
+        self.cursor.close()
+
+
+def documento(prefijo: str, indice: int) -> str:
+    return f"{prefijo}_{indice:09d}"
+
+
+def ruta_manifiesto(prefijo: str) -> str:
+    """Archivo con lo generado para un prefijo (lo que --limpiar borra)"""
+    return f"generar_datos_{prefijo}.json"
+
+
+def guardar_manifiesto(prefijo: str, participantes: int, sorteos: list):
+    with open(ruta_manifiesto(prefijo), "w", encoding="utf-8") as archivo:
+        json.dump({"prefijo": prefijo, "participantes": participantes, "sorteos": sorteos}, archivo)
+
+
+def generar_participantes(prefijo: str, cantidad: int, ahora: datetime):
+    """Filas (documento, nombre, fecha_registro) en el último año"""
+    for indice in range(cantidad):
+        nombre = f"{random.choice(NOMBRES)} {random.choice(APELLIDOS)} {random.choice(APELLIDOS)}"
+        fecha = ahora - timedelta(seconds=random.randrange(365 * 24 * 3600))
+        yield (documento(prefijo, indice), nombre, fecha.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def elegir_participantes(total: int, habituales: int, cantidad: int, solapamiento: float) -> list:
+    """
+    Índices de los participantes de un sorteo: una parte `solapamiento` entre
+    los habituales (los mismos en muchos sorteos) y el resto entre todos los demás.
+    Retorna siempre `cantidad` índices distintos (como mucho `total`)
+    """
+    cantidad = min(cantidad, total)
+    de_habituales = min(int(cantidad * solapamiento), habituales)
+    resto = min(cantidad - de_habituales, total - habituales)
+    # Si no alcanzan los no habituales, completar con habituales
+    de_habituales = cantidad - resto
+    indices = random.sample(range(habituales), de_habituales) + random.sample(range(habituales, total), resto)
+    random.shuffle(indices)
+    return indices
+
+
+def planear_estados(cantidad: int, tipo: str, premio: int) -> list:
+    """Estado de cada participante del sorteo, en orden de inscripción"""
+    bajas = int(cantidad * 0.01)
+    if tipo == "finalizado":
+        ganadores = min(premio, cantidad - bajas)
+        restante = EstadoParticipacion.PERDEDOR.value
+    elif tipo == "en_curso":
+        ganadores = min(random.randint(1, premio), cantidad - bajas)
+        restante = EstadoParticipacion.PARTICIPANDO.value
+    else:
+        ganadores = 0
+        restante = EstadoParticipacion.PARTICIPANDO.value
+
+    estados = (
+        [EstadoParticipacion.GANADOR.value] * ganadores
+        + [random.choice((EstadoParticipacion.ELIMINADO.value, EstadoParticipacion.DESCALIFICADO.value)) for _ in range(bajas)]
+        + [restante] * (cantidad - ganadores - bajas)
+    )
+    random.shuffle(estados)
+    return estados
+
+
+def generar_detalles(sorteo_id: int, prefijo: str, indices: list, estados: list, creacion: datetime, fin: datetime):
+    """Filas de detalle_sorteo con número consecutivo y fechas dentro de la vida del sorteo"""
+    duracion = max(1, int((fin - creacion).total_seconds()))
+    for numero, (indice, estado) in enumerate(zip(indices, estados), start=1):
+        asignacion = creacion + timedelta(seconds=duracion * (numero - 1) // len(indices))
+        fecha_ganador = None
+        if estado == EstadoParticipacion.GANADOR.value:
+            fecha_ganador = fin.strftime("%Y-%m-%d %H:%M:%S")
+        yield (
+            sorteo_id, numero, documento(prefijo, indice), estado,
+            asignacion.strftime("%Y-%m-%d %H:%M:%S"), fecha_ganador
+        )
+
+
+def generar_datos(args) -> bool:
+    """Carga participantes, sorteos y detalle_sorteo; retorna True si terminó bien"""
+    connection = None
+    cursor = None
+    cargador = None
+    inicio = time.monotonic()
+    ahora = datetime.now().replace(microsecond=0)
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG, allow_local_infile=args.load_data)
+        cursor = connection.cursor()
+
+        if os.path.exists(ruta_manifiesto(args.prefijo)):
+            print(f"❌ Ya hay datos generados con el prefijo '{args.prefijo}'. Ejecute con --limpiar o use otro --prefijo")
+            return False
+        # Ningún documento existente puede tener la forma de los generados:
+        # así --limpiar solo borra filas creadas aquí
+        cursor.execute(
+            "SELECT 1 FROM participantes WHERE documento LIKE %s LIMIT 1",
+            (bulk.patron_prefijo(f"{args.prefijo}_"),)
+        )
+        if cursor.fetchone():
+            print(f"❌ Ya hay participantes con documentos '{args.prefijo}_...'. Use otro --prefijo")
+            return False
+        sorteos_creados = []
+        guardar_manifiesto(args.prefijo, args.participantes, sorteos_creados)
+
+        # Los datos se generan consistentes: no hace falta que MySQL lo verifique fila por fila
+        cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        cargador = Cargador(connection, args.lote, args.load_data)
+
+        print(f"Generando {args.participantes} participantes...")
+        cargados = cargador.cargar(
+            "participantes", ("documento", "nombre", "fecha_registro"),
+            generar_participantes(args.prefijo, args.participantes, ahora)
+        )
+        print(f"✅ {cargados} participantes en {time.monotonic() - inicio:.1f}s")
+
+        habituales = max(1, int(args.participantes * args.habituales))
+        total_detalles = 0
+        for numero_sorteo in range(1, args.sorteos + 1):
+            cantidad = int(random.gauss(args.por_sorteo, args.por_sorteo * 0.3))
+            cantidad = max(1, min(cantidad, args.participantes))
+            sorteo_aleatorio = random.random()
+            if sorteo_aleatorio < args.finalizados:
+                tipo = "finalizado"
+            elif sorteo_aleatorio < args.finalizados + args.en_curso:
+                tipo = "en_curso"
+            else:
+                tipo = "nuevo"
+            premio = random.choice(PREMIOS)
+            indices = elegir_participantes(args.participantes, habituales, cantidad, args.solapamiento)
+            # Los contadores del sorteo se calculan con las filas que realmente se insertan
+            cantidad = len(indices)
+            estados = planear_estados(cantidad, tipo, premio)
+
+            creacion = ahora - timedelta(days=random.randint(1, 180))
+            fin = min(ahora, creacion + timedelta(days=random.randint(1, 30)))
+            finalizado = tipo == "finalizado"
+
+            sorteo_id = asignar_id_sorteo(cursor)
+            cursor.execute("""
+                INSERT INTO sorteo (id, nombre, descripcion, estado, fecha_creacion, fecha_finalizacion,
+                                    cantidad_premio, ganadores_simultaneos, ultimo_numero,
+                                    total_participantes, total_elegibles, total_ganadores)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                sorteo_id, f"{args.prefijo}_sorteo_{numero_sorteo}", f"Sorteo sintético ({tipo})",
+                EstadoSorteo.FINALIZADO.value if finalizado else EstadoSorteo.ACTIVO.value,
+                creacion, fin if finalizado else None, premio, min(premio, 5), cantidad, cantidad,
+                sum(1 for estado in estados if estado in ESTADOS_ELEGIBLES),
+                estados.count(EstadoParticipacion.GANADOR.value)
+            ))
+            connection.commit()
+            sorteos_creados.append(sorteo_id)
+            guardar_manifiesto(args.prefijo, args.participantes, sorteos_creados)
+
+            total_detalles += cargador.cargar(
+                "detalle_sorteo",
+                ("id_sorteo", "numero", "documento_participante", "estado", "fecha_asignacion", "fecha_ganador"),
+                generar_detalles(sorteo_id, args.prefijo, indices, estados, creacion, fin)
+            )
+            print(f"✅ Sorteo {sorteo_id} ({tipo}): {cantidad} participantes, {total_detalles} filas en total")
+
+        duracion = time.monotonic() - inicio
+        filas = args.participantes + args.sorteos + total_detalles
+        print(f"\n✅ {filas} filas en {duracion:.1f}s ({filas / duracion:.0f} filas/s)")
+        return True
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        if args.load_data:
+            print("   LOAD DATA LOCAL requiere local_infile=ON en el servidor; sin --load-data se usan INSERT de varias filas")
+        return False
+    finally:
+        if cargador:
+            cargador.cerrar()
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+
+def limpiar(prefijo: str) -> bool:
+    """Borra por ID y documento exactos los sorteos y participantes registrados en el manifiesto del prefijo"""
+    connection = None
+    cursor = None
+
+    if not os.path.exists(ruta_manifiesto(prefijo)):
+        print(f"❌ No hay registro de datos generados con el prefijo '{prefijo}' ({ruta_manifiesto(prefijo)})")
+        return False
+    with open(ruta_manifiesto(prefijo), encoding="utf-8") as archivo:
+        manifiesto = json.load(archivo)
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        sorteos = manifiesto["sorteos"]
+        for sorteo_id in sorteos:
+            # Borrar el detalle por lotes en lugar de una cascada de millones de filas en una transacción
+            while True:
+                cursor.execute("DELETE FROM detalle_sorteo WHERE id_sorteo = %s LIMIT %s", (sorteo_id, LOTE_BORRADO))
+                connection.commit()
+                if cursor.rowcount < LOTE_BORRADO:
+                    break
+            cursor.execute("DELETE FROM sorteo WHERE id = %s", (sorteo_id,))
+            connection.commit()
+        print(f"✅ {len(sorteos)} sorteos eliminados")
+
+        eliminados = 0
+        for indices in bulk.chunked(range(manifiesto["participantes"]), LOTE_BORRADO_DOCUMENTOS):
+            documentos = [documento(prefijo, indice) for indice in indices]
+            cursor.execute(
+                f"DELETE FROM participantes WHERE documento IN ({', '.join(['%s'] * len(documentos))})",
+                documentos
+            )
+            connection.commit()
+            eliminados += cursor.rowcount
+        print(f"✅ {eliminados} participantes eliminados")
+
+        os.remove(ruta_manifiesto(prefijo))
+        return True
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        return False
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos para pruebas de carga")
+    parser.add_argument("--participantes", type=int, default=10_000)
+    parser.add_argument("--sorteos", type=int, default=20)
+    parser.add_argument("--por-sorteo", type=int, default=2_000, help="participantes promedio por sorteo")
+    parser.add_argument("--habituales", type=float, default=0.1,
+                        help="fracción de participantes que se inscribe en muchos sorteos")
+    parser.add_argument("--solapamiento", type=float, default=0.5,
+                        help="fracción de cada sorteo tomada de los habituales")
+    parser.add_argument("--finalizados", type=float, default=0.3, help="fracción de sorteos finalizados")
+    parser.add_argument("--en-curso", type=float, default=0.3,
+                        help="fracción de sorteos activos con ganadores ya sorteados")
+    parser.add_argument("--lote", type=int, default=5_000, help="filas por INSERT")
+    parser.add_argument("--load-data", action="store_true", help="cargar con LOAD DATA LOCAL INFILE")
+    parser.add_argument("--prefijo", default=PREFIJO, help="prefijo de los documentos y nombres de sorteo generados")
+    parser.add_argument("--semilla", type=int, help="semilla para obtener siempre los mismos datos")
+    parser.add_argument("--limpiar", action="store_true", help="borrar los datos registrados en generar_datos_<prefijo>.json")
+    args = parser.parse_args()
+
+    if not re.fullmatch(r"[A-Za-z0-9]+", args.prefijo):
+        print("❌ El prefijo solo puede tener letras y números")
+        sys.exit(1)
+
+    if args.semilla is not None:
+        random.seed(args.semilla)
+
+    if args.limpiar:
+        ok = limpiar(args.prefijo)
+    else:
+        ok = generar_datos(args)
+    sys.exit(0 if ok else 1)
@@ -1,21 +1,39 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import logging
+import time
+from contextlib import asynccontextmanager
 import uvicorn
 
 from controllers.participante_controller import router as participante_router
 from controllers.sorteo_controller import router as sorteo_router
-from config.database import DatabaseConnection
+from config.database import DatabaseConnection, INSTRUMENTACION_CONFIG, PRESUPUESTO_CONSULTAS
+from services.almacen_imagenes import TAMANO_MAXIMO_IMAGEN
+from services.cache_sorteos import CacheSorteos
+from database.async_pool import AsyncDatabaseConnection
+from database.instrumentacion import iniciar_medicion, terminar_medicion, registrar_presupuesto_excedido
+from services.eventos_sorteo import EventosSorteo
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not AsyncDatabaseConnection.disponible:
+        logger.info("aiomysql no está instalado: las lecturas asíncronas usan el pool síncrono desde hilos")
+    EventosSorteo.iniciar()
+    yield
+    await EventosSorteo.detener()
+    await AsyncDatabaseConnection.cerrar()
+
 # Crear la aplicación FastAPI
 app = FastAPI(
     title="API Sorteos",
     description="API para gestión de participantes en sorteos",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -31,8 +49,87 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Siguiente-Cursor", "X-Presupuesto-Consultas-Excedido"],
 )
 
+# Margen para los encabezados multipart que acompañan al archivo
+MARGEN_MULTIPART = 64 * 1024
+
+@app.middleware("http")
+async def limitar_subida_imagenes(request: Request, call_next):
+    """
+    Rechaza con 413 las subidas de imágenes que declaran un Content-Length
+    mayor al permitido, antes de leer el cuerpo. Las subidas sin
+    Content-Length se cortan mientras se copian a disco.
+    """
+    if request.method == "POST" and request.url.path.endswith("/imagen"):
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > TAMANO_MAXIMO_IMAGEN + MARGEN_MULTIPART:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"La imagen supera el tamaño máximo de {TAMANO_MAXIMO_IMAGEN // (1024 * 1024)} MB"}
+            )
+    return await call_next(request)
+
+def revisar_consultas(ruta: str, medicion):
+    """Registra en el log las sentencias lentas de una petición ya terminada"""
+    for duracion, sql, parametros in medicion.lentas(INSTRUMENTACION_CONFIG["umbral_lenta_ms"] / 1000):
+        logger.warning(f"Consulta lenta ({duracion * 1000:.1f} ms) en {ruta}: {sql} [{parametros} parámetros]")
+
+@app.middleware("http")
+async def medir_consultas(request: Request, call_next):
+    """
+    Mide las consultas SQL de la petición (database/instrumentacion.py): agrega
+    el encabezado Server-Timing, registra las sentencias lentas sin sus
+    parámetros y compara la cantidad de consultas con PRESUPUESTO_CONSULTAS.
+
+    Las exportaciones en streaming (ndjson/csv) siguen leyendo filas mientras
+    se envía el cuerpo: el Server-Timing y el presupuesto solo cubren lo hecho
+    hasta enviar los encabezados, y el log de lentas se escribe al terminar
+    el cuerpo, con todo lo leído.
+    """
+    if not INSTRUMENTACION_CONFIG["habilitada"]:
+        return await call_next(request)
+
+    medicion, token = iniciar_medicion(INSTRUMENTACION_CONFIG["maximo_lentas"])
+    inicio = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        terminar_medicion(token)
+    total = time.perf_counter() - inicio
+
+    response.headers["Server-Timing"] = medicion.server_timing(total)
+
+    route = request.scope.get("route")
+    ruta = f"{request.method} {route.path if route else request.url.path}"
+
+    presupuesto = PRESUPUESTO_CONSULTAS.get(ruta)
+    if presupuesto is not None and medicion.consultas > presupuesto:
+        mensaje = f"{ruta} ejecutó {medicion.consultas} consultas (presupuesto: {presupuesto})"
+        if INSTRUMENTACION_CONFIG["presupuesto_estricto"]:
+            # Las escrituras de la petición ya se confirmaron: se marca la
+            # respuesta y se registra para que la prueba falle, sin devolver un 500
+            response.headers["X-Presupuesto-Consultas-Excedido"] = f"{medicion.consultas}/{presupuesto}"
+            registrar_presupuesto_excedido(mensaje)
+            logger.error(mensaje)
+        else:
+            logger.warning(mensaje)
+
+    # El cuerpo lo produce la tarea del endpoint, que conserva la medición:
+    # las lecturas hechas durante el envío también se registran
+    cuerpo = response.body_iterator
+
+    async def cuerpo_medido():
+        try:
+            async for fragmento in cuerpo:
+                yield fragmento
+        finally:
+            revisar_consultas(ruta, medicion)
+
+    response.body_iterator = cuerpo_medido()
+    return response
+
 # Incluir routers
 app.include_router(participante_router)
 app.include_router(sorteo_router)
@@ -44,8 +141,12 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
-    """Endpoint para verificar el estado de la API y la base de datos"""
+def health_check():
+    """
+    Endpoint para verificar el estado de la API y la base de datos.
+    Es síncrono a propósito: la prueba de conexión bloquea y así corre en el
+    threadpool en lugar de detener el event loop.
+    """
     try:
         # Probar conexión a la base de datos
         db_status = DatabaseConnection.test_connection()
@@ -54,12 +155,20 @@ async def health_check():
             return {
                 "status": "healthy",
                 "database": "connected",
+                "pool": DatabaseConnection.pool_stats(),
+                "pool_async": AsyncDatabaseConnection.pool_stats(),
+                "eventos": EventosSorteo.estadisticas(),
+                "cache_sorteos": CacheSorteos.estadisticas(),
                 "timestamp": "2024-01-01T00:00:00"
             }
         else:
             return {
                 "status": "unhealthy",
                 "database": "disconnected",
+                "pool": DatabaseConnection.pool_stats(),
+                "pool_async": AsyncDatabaseConnection.pool_stats(),
+                "eventos": EventosSorteo.estadisticas(),
+                "cache_sorteos": CacheSorteos.estadisticas(),
                 "timestamp": "2024-01-01T00:00:00"
             }
     except Exception as e:
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Script para mover las imágenes existentes (images/sorteos/sorteo_{id}.ext) al
+almacén direccionado por contenido. Los sorteos con imágenes idénticas quedan
+apuntando al mismo blob y los archivos antiguos sin referencias se borran.
+"""
+
+import os
+
+import mysql.connector
+from config.database import DB_CONFIG
+from services.almacen_imagenes import AlmacenImagenes
+from services.imagen_variantes import ImagenVariantes
+
+def migrar_imagenes_almacen():
+    """Mueve las imágenes de los sorteos al almacén de blobs"""
+    connection = None
+    cursor = None
+
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+
+        cursor.execute("SELECT id, imagen FROM sorteo WHERE imagen IS NOT NULL")
+        sorteos = cursor.fetchall()
+
+        antiguas = set()
+        migrados = 0
+        for sorteo_id, ruta in sorteos:
+            if AlmacenImagenes.es_blob(ruta) or ruta in antiguas:
+                continue
+            if not os.path.exists(ruta):
+                print(f"⚠️  Sorteo {sorteo_id}: el archivo {ruta} no existe, se omite")
+                continue
+
+            try:
+                with open(ruta, "rb") as archivo:
+                    recibida = AlmacenImagenes.recibir(archivo, tamano_maximo=os.path.getsize(ruta))
+            except ValueError as e:
+                print(f"⚠️  Sorteo {sorteo_id}: {ruta} no es una imagen válida ({e}), se omite")
+                continue
+            try:
+                nueva_ruta = recibida.publicar()
+            finally:
+                recibida.descartar()
+
+            # Todos los sorteos que compartían el archivo pasan al mismo blob
+            cursor.execute("UPDATE sorteo SET imagen = %s, version = version + 1 WHERE imagen = %s", (nueva_ruta, ruta))
+            antiguas.add(ruta)
+            migrados += cursor.rowcount
+            print(f"Sorteo {sorteo_id}: {ruta} -> {nueva_ruta}")
+
+        connection.commit()
+
+        liberados = 0
+        bytes_liberados = 0
+        for ruta in antiguas:
+            tamano = os.path.getsize(ruta)
+            if AlmacenImagenes.liberar(cursor, ruta):
+                liberados += 1
+                bytes_liberados += tamano
+
+        # Generar las variantes de los blobs nuevos
+        cursor.execute("SELECT DISTINCT imagen FROM sorteo WHERE imagen IS NOT NULL")
+        for (ruta,) in cursor.fetchall():
+            if AlmacenImagenes.es_blob(ruta):
+                ImagenVariantes.generar(ruta)
+
+        print(f"✅ {migrados} sorteos migrados, {liberados} archivos antiguos eliminados "
+              f"({bytes_liberados / (1024 * 1024):.1f} MB)")
+
+    except mysql.connector.Error as err:
+        print(f"❌ Error: {err}")
+        if connection:
+            connection.rollback()
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Migrando imágenes de sorteos al almacén por contenido...")
+    migrar_imagenes_almacen()
+    print("Proceso completado.")
@@ -44,10 +44,12 @@ class DetalleSorteo(BaseModel):
     estado: EstadoParticipacion = EstadoParticipacion.PARTICIPANDO
     fecha_asignacion: Optional[datetime] = None
     fecha_ganador: Optional[datetime] = None
+    numero: Optional[int] = None
 
 class DetalleSorteoResponse(BaseModel):
     id: int
     id_sorteo: int
+    numero: Optional[int] = None  # Número de participante dentro del sorteo (estable)
     documento_participante: str
     estado: EstadoParticipacion
     fecha_asignacion: datetime
@@ -66,6 +68,30 @@ class CrearSorteoResponse(BaseModel):
     errores: list[str]
     mensaje: str
 
+class PreparacionSorteoResponse(BaseModel):
+    # Sin la semilla: con ella y la lista de participantes se deduce el orden
+    id_sorteo: int
+    total: int
+    posicion: int
+    restantes: int
+    fecha_preparacion: datetime
+
+class AuditoriaPreparacionResponse(BaseModel):
+    id_sorteo: int
+    semilla: int
+    total: int
+    fecha_preparacion: datetime
+
+class CompactacionProgresoResponse(BaseModel):
+    estado: str
+    movidas: int = 0
+    pendientes: int = 0
+    lotes: int = 0
+    siguiente_id: Optional[int] = None
+    iniciada: Optional[datetime] = None
+    finalizada: Optional[datetime] = None
+    mensaje: Optional[str] = None
+
 class SorteoListResponse(BaseModel):
     id: int
     nombre: str
@@ -73,5 +99,7 @@ class SorteoListResponse(BaseModel):
     estado: EstadoSorteo
     fecha_creacion: datetime
     cantidad_participantes: int
+    cantidad_elegibles: Optional[int] = None
+    cantidad_ganadores: Optional[int] = None
     cantidad_premio: Optional[int] = None
     ganadores_simultaneos: Optional[int] = 1
\ No newline at end of file
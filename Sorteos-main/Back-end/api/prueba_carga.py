@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga HTTP de punta a punta con tráfico de transmisión.
+
+Simula durante --duracion segundos:
+- muchas pantallas que consultan /sorteos/{id}/ganadores y /sorteos/{id}/imagen,
+- unos pocos operadores que piden candidatos, marcan ganadores y realizan sorteos,
+- importaciones ocasionales de sorteos con muchos participantes (POST /sorteos).
+
+Por defecto maneja main.app en el mismo proceso a través de un transporte
+ASGI (con su lifespan); con --url apunta a un uvicorn ya levantado, p.ej.
+`uvicorn main:app --workers 4 --port 8001`, para dimensionar la cantidad de
+workers. Reporta un histograma de latencias y la tasa de errores por ruta, y
+la saturación: retraso del event loop (en proceso es el loop de la
+aplicación), uso y espera del pool de conexiones leídos de /health y
+respuestas 503. Con varios workers /health refleja al worker que responde.
+
+Requiere httpx (`pip install httpx`). Los sorteos y participantes creados
+(prefijo carga_) se borran al terminar.
+
+Uso:
+    python prueba_carga.py --pantallas 300 --operadores 3 --duracion 60
+    python prueba_carga.py --url http://127.0.0.1:8001 --pantallas 1000 --salida carga.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from config.database import DatabaseConnection
+from database import bulk
+
+PREFIJO = "carga"
+
+# Límites superiores de los intervalos del histograma, en milisegundos
+INTERVALOS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Respuestas que forman parte del flujo normal y no cuentan como error
+ESPERADOS = {
+    "GET /sorteos/{id}/ganadores": {200},
+    "GET /sorteos/{id}/imagen": {200, 404},  # 404 si no se pudo subir imagen
+    "GET /obtener-participantes-aleatorios/{id}/{n}": {200},
+    "POST /sorteos/{id}/marcar-ganador/{documento}": {200, 409},  # 409: cupo agotado
+    "POST /sorteos/{id}/realizar": {200, 400},  # 400: sin premios disponibles
+    "POST /sorteos": {200},
+}
+
+# Segundos entre muestras de /health y del retraso del event loop
+INTERVALO_MUESTREO = 1.0
+INTERVALO_LOOP = 0.1
+
+
+class Metricas:
+    """Latencias y códigos de respuesta por ruta"""
+
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.codigos = defaultdict(lambda: defaultdict(int))
+        self.errores = defaultdict(int)
+        self.presupuesto_excedido = defaultdict(int)
+
+    async def solicitud(self, cliente: httpx.AsyncClient, ruta: str, metodo: str, url: str, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            respuesta = await cliente.request(metodo, url, **kwargs)
+            codigo = respuesta.status_code
+        except httpx.HTTPError as e:
+            respuesta = None
+            codigo = type(e).__name__
+        self.latencias[ruta].append((time.perf_counter() - inicio) * 1000)
+        self.codigos[ruta][codigo] += 1
+        if codigo not in ESPERADOS.get(ruta, {200}):
+            self.errores[ruta] += 1
+        # Solo con INSTRUMENTACION_CONFIG["presupuesto_estricto"] en el servidor
+        if respuesta is not None and "X-Presupuesto-Consultas-Excedido" in respuesta.headers:
+            self.presupuesto_excedido[ruta] += 1
+        return respuesta
+
+    def resumen(self, duracion: float) -> dict:
+        rutas = {}
+        for ruta, latencias in sorted(self.latencias.items()):
+            latencias.sort()
+            histograma = {}
+            anterior = 0
+            for limite in INTERVALOS_MS + [float("inf")]:
+                etiqueta = f"<{limite}" if limite != float("inf") else f">={INTERVALOS_MS[-1]}"
+                histograma[etiqueta] = sum(1 for latencia in latencias if anterior <= latencia < limite)
+                anterior = limite
+            rutas[ruta] = {
+                "solicitudes": len(latencias),
+                "por_segundo": round(len(latencias) / duracion, 2),
+                "errores": self.errores[ruta],
+                "tasa_error": round(self.errores[ruta] / len(latencias), 4),
+                "codigos": {str(codigo): total for codigo, total in self.codigos[ruta].items()},
+                "presupuesto_excedido": self.presupuesto_excedido[ruta],
+                "p50_ms": round(percentil(latencias, 50), 2),
+                "p95_ms": round(percentil(latencias, 95), 2),
+                "p99_ms": round(percentil(latencias, 99), 2),
+                "max_ms": round(latencias[-1], 2),
+                "histograma_ms": histograma,
+            }
+        return rutas
+
+
+class Saturacion:
+    """Muestras del retraso del event loop y del pool de conexiones del servidor"""
+
+    def __init__(self):
+        self.retrasos_loop = []
+        self.uso_pool = []
+        self.esperando = []
+        self.timeouts_inicio = None
+        self.timeouts_fin = None
+
+    async def medir_loop(self):
+        """Cuánto tarda en despertar un sleep corto: lo que una tarea espera por un loop ocupado"""
+        while True:
+            inicio = time.perf_counter()
+            await asyncio.sleep(INTERVALO_LOOP)
+            self.retrasos_loop.append((time.perf_counter() - inicio - INTERVALO_LOOP) * 1000)
+
+    async def medir_pool(self, cliente: httpx.AsyncClient):
+        while True:
+            try:
+                respuesta = await cliente.get("/health")
+                pool = respuesta.json().get("pool") or {}
+                if pool:
+                    self.uso_pool.append(pool["en_uso"] / pool["pool_size"])
+                    self.esperando.append(pool["esperando"])
+                    if self.timeouts_inicio is None:
+                        self.timeouts_inicio = pool["timeouts"]
+                    self.timeouts_fin = pool["timeouts"]
+            except (httpx.HTTPError, ValueError, KeyError):
+                pass
+            await asyncio.sleep(INTERVALO_MUESTREO)
+
+    def resumen(self, respuestas_503: int) -> dict:
+        retrasos = sorted(self.retrasos_loop) or [0.0]
+        uso = self.uso_pool or [0.0]
+        return {
+            "retraso_loop_p95_ms": round(percentil(retrasos, 95), 2),
+            "retraso_loop_max_ms": round(retrasos[-1], 2),
+            "pool_uso_promedio": round(sum(uso) / len(uso), 3),
+            "pool_uso_max": round(max(uso), 3),
+            "pool_esperando_max": max(self.esperando or [0]),
+            "pool_timeouts": (self.timeouts_fin or 0) - (self.timeouts_inicio or 0),
+            "respuestas_503": respuestas_503,
+        }
+
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil por rango más cercano de una lista ordenada"""
+    if not valores:
+        return 0.0
+    return valores[max(0, math.ceil(len(valores) * p / 100) - 1)]
+
+
+def participantes(etiqueta: str, cantidad: int) -> list:
+    return [
+        {"documento": f"{PREFIJO}_{etiqueta}_{n}", "nombre": f"Participante {n}"}
+        for n in range(cantidad)
+    ]
+
+
+def imagen_de_prueba() -> bytes:
+    """Un JPEG 1920x1080 como el fondo de una transmisión, o None sin Pillow"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    salida = io.BytesIO()
+    Image.new("RGB", (1920, 1080), (20, 40, 120)).save(salida, "JPEG", quality=85)
+    return salida.getvalue()
+
+
+async def preparar(cliente: httpx.AsyncClient, sorteos: int, tamano: int) -> list:
+    """Crea los sorteos de la prueba con premios de sobra y, si se puede, una imagen"""
+    ids = []
+    imagen = imagen_de_prueba()
+    for n in range(sorteos):
+        respuesta = await cliente.post("/sorteos", json={
+            "nombre_sorteo": f"{PREFIJO}_{n}",
+            "participantes": participantes(f"sorteo{n}", tamano)
+        })
+        sorteo_id = respuesta.json().get("sorteo_id")
+        if not sorteo_id:
+            raise RuntimeError(f"No se pudo crear el sorteo de prueba: {respuesta.text}")
+        await cliente.put(f"/sorteos/{sorteo_id}", json={"cantidad_premio": tamano})
+        if imagen:
+            await cliente.post(f"/sorteos/{sorteo_id}/imagen", files={"file": ("fondo.jpg", imagen, "image/jpeg")})
+        ids.append(sorteo_id)
+    return ids
+
+
+def limpiar():
+    """Elimina los sorteos y participantes creados por la prueba"""
+    # Prefijo literal y con mayúsculas exactas: "_" no actúa como comodín
+    patron = bulk.patron_prefijo(f"{PREFIJO}_")
+    DatabaseConnection.execute_query("DELETE FROM sorteo WHERE nombre LIKE CAST(%s AS BINARY)", (patron,))
+    DatabaseConnection.execute_query("DELETE FROM participantes WHERE documento LIKE CAST(%s AS BINARY)", (patron,))
+
+
+async def pantalla(cliente, metricas: Metricas, sorteo_id: int, intervalo: float, fin: float):
+    # Las pantallas no arrancan todas a la vez
+    await asyncio.sleep(random.uniform(0, intervalo))
+    while time.monotonic() < fin:
+        await metricas.solicitud(cliente, "GET /sorteos/{id}/ganadores", "GET", f"/sorteos/{sorteo_id}/ganadores")
+        await metricas.solicitud(cliente, "GET /sorteos/{id}/imagen", "GET", f"/sorteos/{sorteo_id}/imagen", params={"w": 1280})
+        await asyncio.sleep(intervalo * random.uniform(0.8, 1.2))
+
+
+async def operador(cliente, metricas: Metricas, sorteo_id: int, intervalo: float, fin: float):
+    await asyncio.sleep(random.uniform(0, intervalo))
+    while time.monotonic() < fin:
+        if random.random() < 0.5:
+            # Flujo de dos pasos del frontend: candidatos y luego marcarlos
+            respuesta = await metricas.solicitud(
+                cliente, "GET /obtener-participantes-aleatorios/{id}/{n}", "GET",
+                f"/obtener-participantes-aleatorios/{sorteo_id}/3"
+            )
+            candidatos = respuesta.json().get("participantes", []) if respuesta is not None and respuesta.status_code == 200 else []
+            for candidato in candidatos:
+                await metricas.solicitud(
+                    cliente, "POST /sorteos/{id}/marcar-ganador/{documento}", "POST",
+                    f"/sorteos/{sorteo_id}/marcar-ganador/{candidato['documento']}"
+                )
+        else:
+            await metricas.solicitud(cliente, "POST /sorteos/{id}/realizar", "POST", f"/sorteos/{sorteo_id}/realizar")
+        await asyncio.sleep(intervalo * random.uniform(0.8, 1.2))
+
+
+async def importador(cliente, metricas: Metricas, intervalo: float, tamano: int, fin: float):
+    n = 0
+    await asyncio.sleep(random.uniform(0, intervalo))
+    while time.monotonic() < fin:
+        await metricas.solicitud(cliente, "POST /sorteos", "POST", "/sorteos", json={
+            "nombre_sorteo": f"{PREFIJO}_importacion_{n}",
+            "participantes": participantes(f"importacion{n}", tamano)
+        })
+        n += 1
+        await asyncio.sleep(intervalo * random.uniform(0.8, 1.2))
+
+
+async def ejecutar(cliente: httpx.AsyncClient, args) -> dict:
+    print(f"Creando {args.sorteos} sorteos de {args.participantes} participantes...")
+    sorteos = await preparar(cliente, args.sorteos, args.participantes)
+
+    metricas = Metricas()
+    saturacion = Saturacion()
+    fin = time.monotonic() + args.duracion
+    tareas = [pantalla(cliente, metricas, sorteos[n % len(sorteos)], args.intervalo_pantalla, fin)
+              for n in range(args.pantallas)]
+    tareas += [operador(cliente, metricas, sorteos[n % len(sorteos)], args.intervalo_operador, fin)
+               for n in range(args.operadores)]
+    if args.intervalo_importacion > 0:
+        tareas.append(importador(cliente, metricas, args.intervalo_importacion, args.tamano_importacion, fin))
+
+    print(f"Lanzando {args.pantallas} pantallas y {args.operadores} operadores durante {args.duracion}s...")
+    muestreo = [asyncio.create_task(saturacion.medir_loop()), asyncio.create_task(saturacion.medir_pool(cliente))]
+    inicio = time.monotonic()
+    try:
+        await asyncio.gather(*tareas)
+    finally:
+        for tarea in muestreo:
+            tarea.cancel()
+    duracion = time.monotonic() - inicio
+
+    respuestas_503 = sum(codigos.get(503, 0) for codigos in metricas.codigos.values())
+    return {
+        "parametros": vars(args),
+        "duracion_s": round(duracion, 2),
+        "rutas": metricas.resumen(duracion),
+        "saturacion": saturacion.resumen(respuestas_503),
+    }
+
+
+async def principal(args) -> dict:
+    limites = httpx.Limits(max_connections=args.pantallas + args.operadores + 10)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=args.timeout) as cliente:
+            return await ejecutar(cliente, args)
+
+    import main
+    # ASGITransport no ejecuta el lifespan: iniciarlo aquí (tarea de eventos, pools)
+    async with main.app.router.lifespan_context(main.app):
+        transporte = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://prueba", timeout=args.timeout) as cliente:
+            return await ejecutar(cliente, args)
+
+
+def imprimir(resultado: dict):
+    for ruta, datos in resultado["rutas"].items():
+        print(f"\n{ruta}: {datos['solicitudes']} solicitudes ({datos['por_segundo']}/s), "
+              f"errores {datos['errores']} ({datos['tasa_error']:.2%}), códigos {datos['codigos']}")
+        if datos["presupuesto_excedido"]:
+            print(f"  ⚠️  {datos['presupuesto_excedido']} respuestas superaron el presupuesto de consultas")
+        print(f"  p50 {datos['p50_ms']} ms, p95 {datos['p95_ms']} ms, p99 {datos['p99_ms']} ms, máx {datos['max_ms']} ms")
+        mayor = max(datos["histograma_ms"].values()) or 1
+        for etiqueta, total in datos["histograma_ms"].items():
+            print(f"  {etiqueta:>7} ms {total:>7} {'#' * round(40 * total / mayor)}")
+
+    saturacion = resultado["saturacion"]
+    print(f"\nRetraso del event loop: p95 {saturacion['retraso_loop_p95_ms']} ms, máx {saturacion['retraso_loop_max_ms']} ms")
+    print(f"Pool: uso promedio {saturacion['pool_uso_promedio']:.0%}, máximo {saturacion['pool_uso_max']:.0%}, "
+          f"hasta {saturacion['pool_esperando_max']} esperando, {saturacion['pool_timeouts']} timeouts")
+    print(f"Respuestas 503: {saturacion['respuestas_503']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga HTTP con tráfico de transmisión")
+    parser.add_argument("--url", help="URL de un servidor uvicorn; sin ella se usa main.app en el proceso")
+    parser.add_argument("--duracion", type=float, default=60, help="Segundos de carga")
+    parser.add_argument("--sorteos", type=int, default=2, help="Sorteos transmitidos a la vez")
+    parser.add_argument("--participantes", type=int, default=5000, help="Participantes por sorteo")
+    parser.add_argument("--pantallas", type=int, default=200, help="Pantallas consultando")
+    parser.add_argument("--intervalo-pantalla", type=float, default=1.0, help="Segundos entre consultas de cada pantalla")
+    parser.add_argument("--operadores", type=int, default=3, help="Operadores sorteando")
+    parser.add_argument("--intervalo-operador", type=float, default=2.0, help="Segundos entre acciones de cada operador")
+    parser.add_argument("--intervalo-importacion", type=float, default=30.0,
+                        help="Segundos entre importaciones masivas (0 para desactivarlas)")
+    parser.add_argument("--tamano-importacion", type=int, default=5000, help="Participantes por importación")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout de cada solicitud en segundos")
+    parser.add_argument("--salida", help="Archivo JSON con los resultados")
+    parser.add_argument("--conservar", action="store_true", help="No borrar los datos al terminar")
+    args = parser.parse_args()
+
+    limpiar()
+    try:
+        resultado = asyncio.run(principal(args))
+    finally:
+        if not args.conservar:
+            limpiar()
+
+    imprimir(resultado)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+
+    errores = sum(datos["errores"] for datos in resultado["rutas"].values())
+    if errores:
+        print(f"\n❌ {errores} respuestas con error")
+        sys.exit(1)
+    print("\n✅ Sin errores")
+
+
+if __name__ == "__main__":
+    main()
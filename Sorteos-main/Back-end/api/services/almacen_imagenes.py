@@ -0,0 +1,245 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Optional
+
+from services.imagen_variantes import ImagenVariantes, DIRECTORIO_VARIANTES
+
+# Las imágenes se guardan una sola vez bajo su SHA-256: blobs/ab/abcdef....jpg
+DIRECTORIO_BLOBS = "images/sorteos/blobs"
+
+# Límite de las subidas y tamaño de los bloques con que se copian a disco
+TAMANO_MAXIMO_IMAGEN = 10 * 1024 * 1024
+TAMANO_BLOQUE = 64 * 1024
+
+# Segundos que se espera el bloqueo de un blob (GET_LOCK) antes de fallar
+ESPERA_BLOQUEO_BLOB = 10
+
+_PATRON_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+# Firmas (magic bytes) de los formatos aceptados
+_FIRMAS = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+
+class ImagenInvalidaError(ValueError):
+    """El contenido subido no es una imagen de un formato aceptado"""
+
+
+class ImagenDemasiadoGrandeError(ValueError):
+    """La subida supera TAMANO_MAXIMO_IMAGEN"""
+
+
+class BloqueoImagenError(RuntimeError):
+    """No se obtuvo a tiempo el bloqueo de un blob"""
+
+
+def detectar_extension(cabecera: bytes) -> Optional[str]:
+    """Detecta el formato de una imagen por sus primeros bytes, sin confiar en content_type"""
+    for firma, extension in _FIRMAS:
+        if cabecera.startswith(firma):
+            return extension
+    if cabecera[:4] == b"RIFF" and cabecera[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _fsync_directorio(directorio: str):
+    """Asegura que un rename dentro del directorio sobreviva a un corte (solo POSIX)"""
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _digest_de_nombre(nombre: str) -> Optional[str]:
+    digest = os.path.splitext(nombre)[0]
+    return digest if _PATRON_DIGEST.match(digest) else None
+
+
+class ImagenRecibida:
+    """Subida ya copiada a un temporal (con fsync) y lista para publicarse en el almacén"""
+
+    def __init__(self, temporal: str, digest: str, extension: str, tamano: int):
+        self.temporal = temporal
+        self.digest = digest
+        self.extension = extension
+        self.tamano = tamano
+        self.ruta = AlmacenImagenes.ruta_blob(digest, extension)
+
+    def publicar(self) -> str:
+        """
+        Publica el blob con un enlace atómico al temporal. Si el blob ya existe
+        (misma imagen subida antes) no se toca. En el servicio se llama con el
+        blob bloqueado (AlmacenImagenes.bloquear) hasta confirmar la referencia,
+        para que nadie lo libere en el medio.
+        """
+        if not os.path.exists(self.ruta):
+            directorio = os.path.dirname(self.ruta)
+            os.makedirs(directorio, exist_ok=True)
+            try:
+                os.link(self.temporal, self.ruta)
+            except FileExistsError:
+                pass
+            except OSError:
+                # Sistemas de archivos sin enlaces duros: copiar y renombrar
+                copia = f"{self.temporal}.copia"
+                shutil.copyfile(self.temporal, copia)
+                os.replace(copia, self.ruta)
+            _fsync_directorio(directorio)
+        return self.ruta
+
+    def descartar(self):
+        """Elimina el temporal (el blob publicado queda intacto)"""
+        try:
+            os.remove(self.temporal)
+        except FileNotFoundError:
+            pass
+
+
+class AlmacenImagenes:
+    """
+    Almacén de imágenes direccionado por contenido.
+
+    Varios sorteos que usan la misma imagen comparten un único archivo (y sus
+    variantes). `sorteo.imagen` guarda la ruta del blob; las referencias se
+    cuentan sobre esa columna, así que un blob se borra cuando ningún sorteo
+    lo usa.
+    """
+
+    @staticmethod
+    def ruta_blob(digest: str, extension: str) -> str:
+        return os.path.join(DIRECTORIO_BLOBS, digest[:2], f"{digest}.{extension}")
+
+    @staticmethod
+    def es_blob(ruta: str) -> bool:
+        return (
+            os.path.dirname(os.path.dirname(os.path.normpath(ruta))) == os.path.normpath(DIRECTORIO_BLOBS)
+            and _digest_de_nombre(os.path.basename(ruta)) is not None
+        )
+
+    @staticmethod
+    def recibir(origen: BinaryIO, tamano_maximo: int = TAMANO_MAXIMO_IMAGEN) -> "ImagenRecibida":
+        """
+        Copia una subida a un archivo temporal por bloques, calculando su digest
+        y verificando el tipo por sus primeros bytes. Nunca tiene el archivo
+        completo en memoria y aborta en cuanto supera `tamano_maximo`.
+        """
+        directorio_temporal = os.path.join(DIRECTORIO_BLOBS, "tmp")
+        os.makedirs(directorio_temporal, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=directorio_temporal, suffix=".subida")
+
+        try:
+            digest = hashlib.sha256()
+            tamano = 0
+            extension = None
+            with os.fdopen(descriptor, "wb") as destino:
+                while True:
+                    bloque = origen.read(TAMANO_BLOQUE)
+                    if not bloque:
+                        break
+                    if extension is None:
+                        extension = detectar_extension(bloque)
+                        if extension is None:
+                            raise ImagenInvalidaError("El archivo debe ser una imagen JPEG, PNG, GIF o WebP")
+                    tamano += len(bloque)
+                    if tamano > tamano_maximo:
+                        raise ImagenDemasiadoGrandeError(
+                            f"La imagen supera el tamaño máximo de {tamano_maximo // (1024 * 1024)} MB"
+                        )
+                    digest.update(bloque)
+                    destino.write(bloque)
+
+                if extension is None:
+                    raise ImagenInvalidaError("El archivo está vacío")
+
+                destino.flush()
+                os.fsync(destino.fileno())
+        except BaseException:
+            os.remove(temporal)
+            raise
+
+        return ImagenRecibida(temporal, digest.hexdigest(), extension, tamano)
+
+    @staticmethod
+    def nombre_bloqueo(ruta: str) -> str:
+        """Nombre del GET_LOCK de un blob (MySQL admite hasta 64 caracteres)"""
+        digest = _digest_de_nombre(os.path.basename(ruta)) if AlmacenImagenes.es_blob(ruta) else None
+        if digest is None:
+            # Imágenes anteriores a la migración: bloquear por su ruta
+            digest = hashlib.sha256(os.path.normpath(ruta).encode("utf-8")).hexdigest()
+        return f"blob:{digest[:40]}"
+
+    @staticmethod
+    @contextmanager
+    def bloquear(cursor, ruta: str):
+        """
+        Serializa entre procesos lo que se hace con un blob: publicar y guardar
+        la referencia en una subida, o contar referencias y borrar al liberar.
+        Usa GET_LOCK, que es de la sesión y no depende de la transacción.
+        """
+        nombre = AlmacenImagenes.nombre_bloqueo(ruta)
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (nombre, ESPERA_BLOQUEO_BLOB))
+        if cursor.fetchone()[0] != 1:
+            raise BloqueoImagenError(f"No se pudo bloquear la imagen {ruta}")
+        try:
+            yield
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (nombre,))
+            cursor.fetchone()
+
+    @staticmethod
+    def contar_referencias(cursor, ruta: str) -> int:
+        """Cuenta los sorteos que usan la imagen (requiere un cursor sin dictionary=True)"""
+        cursor.execute("SELECT COUNT(*) FROM sorteo WHERE imagen = %s", (ruta,))
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def liberar(cursor, ruta: str) -> bool:
+        """
+        Borra la imagen y sus variantes si ya ningún sorteo la referencia.
+        Debe llamarse después de confirmar el cambio que quitó la referencia.
+        El conteo y el borrado se hacen con el blob bloqueado, así una subida
+        concurrente de la misma imagen no queda apuntando a un archivo borrado.
+        """
+        if not ruta:
+            return False
+
+        with AlmacenImagenes.bloquear(cursor, ruta):
+            if AlmacenImagenes.contar_referencias(cursor, ruta) > 0:
+                return False
+
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            ImagenVariantes.eliminar(ruta)
+            return True
+
+    @staticmethod
+    def etag(ruta: str) -> Optional[str]:
+        """
+        ETag fuerte derivado del digest para blobs y sus variantes, o None si
+        la ruta no pertenece al almacén (imágenes anteriores a la migración).
+        """
+        if AlmacenImagenes.es_blob(ruta):
+            return f'"{_digest_de_nombre(os.path.basename(ruta))}"'
+
+        directorio = os.path.dirname(os.path.normpath(ruta))
+        if os.path.dirname(directorio) == os.path.normpath(DIRECTORIO_VARIANTES):
+            digest = _digest_de_nombre(os.path.basename(directorio))
+            if digest:
+                return f'"{digest}-{os.path.basename(ruta)}"'
+
+        return None
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import mysql.connector
+
+from config.database import DatabaseConnection, CACHE_SORTEOS_CONFIG
+from models.sorteo import SorteoResponse
+
+# (version, fecha_creacion): fecha_creacion distingue un sorteo nuevo que
+# reutilizó el ID de uno borrado (ambos empiezan en la versión 0)
+Firma = Tuple[int, object]
+
+
+class CacheSorteos:
+    """
+    Caché en memoria (por proceso) de SorteoResponse por ID.
+
+    Cada escritura que cambia los datos del sorteo incrementa la columna
+    `version` e invalida la entrada local. Los otros workers se enteran con
+    una verificación barata, como mucho una vez por intervalo: un único
+    SELECT id, version por clave primaria para todos los IDs en caché, que
+    descarta las entradas cuya versión cambió o cuyo sorteo ya no existe.
+    Entre verificaciones un worker puede servir datos con hasta un intervalo
+    de antigüedad; los contadores (total_*) y ultimo_numero no son parte de
+    SorteoResponse y no incrementan la versión.
+
+    Las instancias devueltas se comparten entre peticiones: no modificarlas.
+    """
+
+    _entradas: "OrderedDict[int, Tuple[Firma, SorteoResponse]]" = OrderedDict()
+    _lock = threading.Lock()
+    _ultima_verificacion = 0.0
+    _estadisticas = {"aciertos": 0, "fallos": 0, "descartadas": 0, "verificaciones": 0}
+
+    @staticmethod
+    def firma(fila: dict) -> Firma:
+        return (fila.get("version", 0), fila.get("fecha_creacion"))
+
+    @staticmethod
+    def obtener(sorteo_id: int, cargar: Callable[[int], Optional[Tuple[Firma, SorteoResponse]]]) -> Optional[SorteoResponse]:
+        """Retorna el sorteo desde la caché o lo carga con `cargar` (que no se cachea si retorna None)"""
+        if not CACHE_SORTEOS_CONFIG["habilitada"]:
+            cargado = cargar(sorteo_id)
+            return cargado[1] if cargado else None
+
+        CacheSorteos._verificar_versiones()
+
+        sorteo = CacheSorteos.consultar(sorteo_id)
+        if sorteo:
+            return sorteo
+
+        cargado = cargar(sorteo_id)
+        if not cargado:
+            return None
+        CacheSorteos.guardar(sorteo_id, cargado)
+        return cargado[1]
+
+    # Los pasos sin E/S que siguen los usa también la capa asíncrona
+    # (services/sorteo_service_async.py), que hace sus propias consultas
+
+    @staticmethod
+    def consultar(sorteo_id: int) -> Optional[SorteoResponse]:
+        """El sorteo en caché, o None"""
+        with CacheSorteos._lock:
+            entrada = CacheSorteos._entradas.get(sorteo_id)
+            if entrada:
+                CacheSorteos._entradas.move_to_end(sorteo_id)
+                CacheSorteos._estadisticas["aciertos"] += 1
+                return entrada[1]
+            CacheSorteos._estadisticas["fallos"] += 1
+            return None
+
+    @staticmethod
+    def guardar(sorteo_id: int, cargado: Tuple[Firma, SorteoResponse]):
+        with CacheSorteos._lock:
+            CacheSorteos._entradas[sorteo_id] = cargado
+            CacheSorteos._entradas.move_to_end(sorteo_id)
+            while len(CacheSorteos._entradas) > CACHE_SORTEOS_CONFIG["max_entradas"]:
+                CacheSorteos._entradas.popitem(last=False)
+
+    @staticmethod
+    def invalidar(sorteo_id: int):
+        """Descarta la entrada local de un sorteo (llamar después del commit)"""
+        with CacheSorteos._lock:
+            CacheSorteos._entradas.pop(sorteo_id, None)
+
+    @staticmethod
+    def limpiar():
+        with CacheSorteos._lock:
+            CacheSorteos._entradas.clear()
+
+    @staticmethod
+    def reclamar_verificacion() -> Optional[Dict[int, Firma]]:
+        """
+        Si venció el intervalo, retorna las firmas a verificar y marca la
+        verificación como hecha, para que solo una petición por intervalo la haga.
+        """
+        ahora = time.monotonic()
+        with CacheSorteos._lock:
+            if ahora - CacheSorteos._ultima_verificacion < CACHE_SORTEOS_CONFIG["intervalo_verificacion"]:
+                return None
+            CacheSorteos._ultima_verificacion = ahora
+            firmas = {sorteo_id: entrada[0] for sorteo_id, entrada in CacheSorteos._entradas.items()}
+        return firmas or None
+
+    @staticmethod
+    def consulta_versiones(firmas: Dict[int, Firma]) -> Tuple[str, tuple]:
+        """La consulta (por clave primaria) que trae las firmas actuales"""
+        placeholders = ", ".join(["%s"] * len(firmas))
+        return (
+            f"SELECT id, version, fecha_creacion FROM sorteo WHERE id IN ({placeholders})",
+            tuple(firmas)
+        )
+
+    @staticmethod
+    def descartar_cambiados(firmas: Dict[int, Firma], actuales: Dict[int, Firma]):
+        """Descarta las entradas cuya firma ya no coincide con la de la base de datos"""
+        with CacheSorteos._lock:
+            CacheSorteos._estadisticas["verificaciones"] += 1
+            for sorteo_id, firma in firmas.items():
+                entrada = CacheSorteos._entradas.get(sorteo_id)
+                # Si la entrada se recargó durante la verificación, la firma nueva manda
+                if entrada and entrada[0] == firma and actuales.get(sorteo_id) != firma:
+                    del CacheSorteos._entradas[sorteo_id]
+                    CacheSorteos._estadisticas["descartadas"] += 1
+
+    @staticmethod
+    def _verificar_versiones():
+        """Descarta las entradas que cambiaron en otro proceso, como mucho una vez por intervalo"""
+        firmas = CacheSorteos.reclamar_verificacion()
+        if not firmas:
+            return
+
+        connection = None
+        cursor = None
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor()
+            cursor.execute(*CacheSorteos.consulta_versiones(firmas))
+            actuales = {fila[0]: (fila[1], fila[2]) for fila in cursor.fetchall()}
+        except mysql.connector.Error as e:
+            # Sin poder verificar, no se puede garantizar que algo siga vigente
+            print(f"Error verificando versiones de sorteos en caché: {e}")
+            actuales = {}
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+        CacheSorteos.descartar_cambiados(firmas, actuales)
+
+    @staticmethod
+    def estadisticas() -> dict:
+        with CacheSorteos._lock:
+            return {**CacheSorteos._estadisticas, "entradas": len(CacheSorteos._entradas)}
@@ -0,0 +1,262 @@
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Set, Tuple
+
+import mysql.connector
+
+from config.database import DatabaseConnection
+from models.sorteo import CompactacionProgresoResponse, EstadoSorteo
+from services.eventos_sorteo import EventosSorteo
+from services.preparacion_service import PreparacionService
+
+# Lote y pausa por defecto de la compactación en línea
+TAMANO_LOTE = 500
+PAUSA_MS = 50
+
+# Reintentos de un lote ante deadlock o espera de bloqueo agotada
+REINTENTOS_LOTE = 3
+_ERRORES_REINTENTABLES = (1205, 1213)
+
+# Bloqueo con nombre de MySQL: una sola compactación a la vez entre todos los workers
+_NOMBRE_BLOQUEO = "sorteos_compactacion_detalle"
+
+_progreso = {"estado": "inactiva"}
+_progreso_lock = threading.Lock()
+_detener = threading.Event()
+_hilo = None
+
+
+def _actualizar_progreso(**valores):
+    with _progreso_lock:
+        _progreso.update(valores)
+
+
+class CompactacionService:
+    """
+    Compactación en línea de los IDs de detalle_sorteo.
+
+    En lugar de reescribir la tabla completa, busca el primer hueco y mueve
+    solo las filas que están por encima, en lotes pequeños y ordenados: cada
+    fila pasa al siguiente ID libre, así que el prefijo compactado crece con
+    cada lote. Cada lote es una transacción corta seguida de una pausa, de
+    modo que los sorteos en curso solo esperan por las filas del lote.
+
+    Es reanudable sin estado guardado: si se detiene, la siguiente ejecución
+    vuelve a encontrar el primer hueco justo donde quedó la anterior.
+
+    Las filas de sorteos activos no se mueven: sus IDs ya aparecen en los
+    eventos que reciben las pantallas y en los cursores de paginación
+    (`after`) de los clientes. Quedan en su lugar y los demás IDs las saltan,
+    así que sus huecos se cierran en una ejecución posterior, cuando el
+    sorteo haya terminado. De las filas movidas se actualizan en la misma
+    transacción los órdenes precalculados y los eventos registrados; los
+    cursores que tengan los clientes de sorteos ya terminados siguen con los
+    IDs anteriores.
+    """
+
+    @staticmethod
+    def _primer_hueco(cursor) -> Optional[int]:
+        """Retorna el menor ID libre, o None si la tabla está vacía"""
+        cursor.execute("SELECT MIN(id) FROM detalle_sorteo")
+        minimo = cursor.fetchone()[0]
+        if minimo is None:
+            return None
+        if minimo > 1:
+            return 1
+
+        cursor.execute("""
+            SELECT a.id + 1
+            FROM detalle_sorteo a
+            LEFT JOIN detalle_sorteo b ON b.id = a.id + 1
+            WHERE b.id IS NULL
+            ORDER BY a.id
+            LIMIT 1
+        """)
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def _sorteos_activos(cursor, sorteos: Set[int]) -> Set[int]:
+        """De los sorteos dados, los que están activos"""
+        if not sorteos:
+            return set()
+        placeholders = ", ".join(["%s"] * len(sorteos))
+        cursor.execute(
+            f"SELECT id FROM sorteo WHERE id IN ({placeholders}) AND estado = %s",
+            (*sorteos, EstadoSorteo.ACTIVO.value)
+        )
+        return {fila[0] for fila in cursor.fetchall()}
+
+    @staticmethod
+    def _mover_lote(connection, cursor, siguiente: int, desde: int, fijas: Set[int],
+                    tamano_lote: int) -> Tuple[int, Optional[int], int]:
+        """
+        Recorre hasta `tamano_lote` filas con ID mayor que `desde` y mueve cada
+        una al menor ID libre desde `siguiente`. Las de sorteos activos quedan
+        en su lugar: su ID se agrega a `fijas` para no usarlo como destino.
+
+        Retorna (siguiente ID libre, último ID recorrido, filas movidas); el
+        último ID recorrido es None si ya no quedaban filas.
+        """
+        cursor.execute("""
+            SELECT id, id_sorteo FROM detalle_sorteo
+            WHERE id > %s
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE
+        """, (desde, tamano_lote))
+        filas = cursor.fetchall()
+        if not filas:
+            return siguiente, None, 0
+
+        # Un sorteo no vuelve a estar activo: leerlo sin bloquear basta
+        activos = CompactacionService._sorteos_activos(cursor, {id_sorteo for _, id_sorteo in filas})
+
+        mapeo = {}
+        sorteos = set()
+        for id_actual, id_sorteo in filas:
+            if id_sorteo in activos:
+                fijas.add(id_actual)
+            else:
+                cursor.execute("UPDATE detalle_sorteo SET id = %s WHERE id = %s", (siguiente, id_actual))
+                mapeo[id_actual] = siguiente
+                sorteos.add(id_sorteo)
+                siguiente += 1
+            while siguiente in fijas:
+                fijas.discard(siguiente)
+                siguiente += 1
+
+        # Los órdenes precalculados y los eventos guardan IDs: actualizarlos en la misma transacción
+        PreparacionService.remapear_ids(cursor, sorteos, mapeo)
+        EventosSorteo.remapear_ids(cursor, sorteos, mapeo)
+        connection.commit()
+        return siguiente, filas[-1][0], len(mapeo)
+
+    @staticmethod
+    def compactar_en_linea(tamano_lote: int = TAMANO_LOTE, pausa_ms: int = PAUSA_MS) -> CompactacionProgresoResponse:
+        """Ejecuta la compactación en línea en el hilo actual y retorna el progreso final"""
+        _detener.clear()
+        _actualizar_progreso(
+            estado="en_curso", movidas=0, pendientes=0, lotes=0, siguiente_id=None,
+            iniciada=datetime.now(), finalizada=None, mensaje=None
+        )
+
+        connection = None
+        cursor = None
+        bloqueado = False
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor()
+
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (_NOMBRE_BLOQUEO,))
+            bloqueado = cursor.fetchone()[0] == 1
+            if not bloqueado:
+                _actualizar_progreso(estado="ocupada", finalizada=datetime.now(),
+                                     mensaje="Otra compactación está en curso")
+                return CompactacionService.obtener_progreso()
+
+            siguiente = CompactacionService._primer_hueco(cursor)
+            pendientes = 0
+            if siguiente is not None:
+                cursor.execute("""
+                    SELECT COUNT(*) FROM detalle_sorteo ds
+                    JOIN sorteo s ON s.id = ds.id_sorteo
+                    WHERE ds.id > %s AND s.estado <> %s
+                """, (siguiente, EstadoSorteo.ACTIVO.value))
+                pendientes = cursor.fetchone()[0]
+            # Terminar la lectura para que cada lote vea los datos actuales
+            connection.commit()
+            _actualizar_progreso(pendientes=pendientes, siguiente_id=siguiente)
+
+            movidas = 0
+            lotes = 0
+            reintentos = 0
+            desde = siguiente
+            # IDs de filas de sorteos activos por encima de `siguiente`
+            fijas = set()
+            while desde is not None and not _detener.is_set():
+                # Sobre una copia: si el lote se revierte, se reintenta desde el estado anterior
+                fijas_lote = set(fijas)
+                try:
+                    siguiente_lote, desde_lote, cantidad = CompactacionService._mover_lote(
+                        connection, cursor, siguiente, desde, fijas_lote, tamano_lote
+                    )
+                except mysql.connector.Error as e:
+                    connection.rollback()
+                    if e.errno in _ERRORES_REINTENTABLES and reintentos < REINTENTOS_LOTE:
+                        reintentos += 1
+                        time.sleep(pausa_ms / 1000 * (reintentos + 1))
+                        continue
+                    raise
+                reintentos = 0
+
+                if desde_lote is None:
+                    break
+
+                siguiente, desde, fijas = siguiente_lote, desde_lote, fijas_lote
+                movidas += cantidad
+                lotes += 1
+                _actualizar_progreso(
+                    movidas=movidas, lotes=lotes, siguiente_id=siguiente,
+                    pendientes=max(pendientes - movidas, 0)
+                )
+                time.sleep(pausa_ms / 1000)
+
+            if _detener.is_set():
+                _actualizar_progreso(estado="detenida", finalizada=datetime.now())
+            else:
+                if siguiente is not None:
+                    # Cambio solo de metadatos: las filas no se copian. Si quedaron filas
+                    # fijas por encima, MySQL lo sube al mayor ID + 1
+                    cursor.execute(f"ALTER TABLE detalle_sorteo AUTO_INCREMENT = {int(siguiente)}")
+                _actualizar_progreso(estado="completada", pendientes=0, finalizada=datetime.now())
+
+            print(f"Compactación en línea: {movidas} filas movidas en {lotes} lotes")
+
+        except mysql.connector.Error as e:
+            print(f"Error en la compactación en línea: {e}")
+            if connection:
+                connection.rollback()
+            _actualizar_progreso(estado="error", finalizada=datetime.now(), mensaje=str(e))
+        finally:
+            if cursor:
+                if bloqueado:
+                    try:
+                        cursor.execute("SELECT RELEASE_LOCK(%s)", (_NOMBRE_BLOQUEO,))
+                        cursor.fetchone()
+                    except mysql.connector.Error:
+                        pass
+                cursor.close()
+            if connection:
+                connection.close()
+
+        return CompactacionService.obtener_progreso()
+
+    @staticmethod
+    def iniciar(tamano_lote: int = TAMANO_LOTE, pausa_ms: int = PAUSA_MS) -> bool:
+        """Inicia la compactación en línea en segundo plano; False si ya hay una en curso"""
+        global _hilo
+        with _progreso_lock:
+            if _hilo is not None and _hilo.is_alive():
+                return False
+            _hilo = threading.Thread(
+                target=CompactacionService.compactar_en_linea,
+                args=(tamano_lote, pausa_ms),
+                name="compactacion-detalle-sorteo",
+                daemon=True
+            )
+            _hilo.start()
+        return True
+
+    @staticmethod
+    def detener() -> bool:
+        """Pide detener la compactación en curso al terminar el lote actual"""
+        if _hilo is None or not _hilo.is_alive():
+            return False
+        _detener.set()
+        return True
+
+    @staticmethod
+    def obtener_progreso() -> CompactacionProgresoResponse:
+        with _progreso_lock:
+            return CompactacionProgresoResponse(**_progreso)
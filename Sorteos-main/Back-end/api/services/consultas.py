@@ -0,0 +1,115 @@
+"""
+Consultas de lectura compartidas por los servicios síncronos y asíncronos.
+
+SorteoService/ParticipanteService (mysql.connector) y sus versiones
+asíncronas (SorteoServiceAsync/ParticipanteServiceAsync) ejecutan el mismo
+SQL con conexiones distintas. Cada función retorna (query, params) y las
+funciones de mapeo convierten las filas (diccionarios) en los modelos de
+respuesta, así una corrección a una consulta llega a los dos caminos.
+"""
+
+from typing import List, Optional, Tuple
+
+from models.participante import ParticipanteResponse
+from models.sorteo import DetalleSorteoResponse, EstadoParticipacion, SorteoListResponse, EstadoSorteo
+
+# Un detalle_sorteo con el nombre del participante
+_SELECT_DETALLE = """
+    SELECT ds.*, p.nombre as nombre_participante
+    FROM detalle_sorteo ds
+    JOIN participantes p ON ds.documento_participante = p.documento
+"""
+
+_SELECT_PARTICIPANTE = "SELECT documento, nombre, fecha_registro FROM participantes"
+
+
+# --- Sorteos ---
+
+def sorteo(sorteo_id: int) -> Tuple[str, tuple]:
+    return "SELECT * FROM sorteo WHERE id = %s", (sorteo_id,)
+
+
+def sorteos_activos() -> Tuple[str, tuple]:
+    """Sorteos activos con sus contadores, del más reciente al más antiguo"""
+    return """
+        SELECT s.id, s.nombre, s.descripcion, s.estado, s.fecha_creacion, s.cantidad_premio, s.ganadores_simultaneos,
+               s.total_participantes as cantidad_participantes,
+               s.total_elegibles as cantidad_elegibles,
+               s.total_ganadores as cantidad_ganadores
+        FROM sorteo s
+        WHERE s.estado = %s
+        ORDER BY s.fecha_creacion DESC
+    """, (EstadoSorteo.ACTIVO.value,)
+
+
+def participantes_sorteo(sorteo_id: int, despues_de: Optional[int] = None,
+                         limite: Optional[int] = None) -> Tuple[str, tuple]:
+    """
+    Sin `limite`, todos los participantes del sorteo por fecha de asignación.
+    Con `limite`, una página ordenada por ID de detalle_sorteo después de
+    `despues_de` (paginación por clave sobre el índice (id_sorteo, id)).
+    """
+    if limite is None:
+        return _SELECT_DETALLE + """
+            WHERE ds.id_sorteo = %s
+            ORDER BY ds.fecha_asignacion
+        """, (sorteo_id,)
+    return _SELECT_DETALLE + """
+        WHERE ds.id_sorteo = %s AND ds.id > %s
+        ORDER BY ds.id
+        LIMIT %s
+    """, (sorteo_id, despues_de or 0, limite)
+
+
+def ganador_sorteo(sorteo_id: int) -> Tuple[str, tuple]:
+    """El ganador más reciente del sorteo"""
+    return _SELECT_DETALLE + """
+        WHERE ds.id_sorteo = %s AND ds.estado = %s
+        ORDER BY ds.fecha_ganador DESC
+        LIMIT 1
+    """, (sorteo_id, EstadoParticipacion.GANADOR.value)
+
+
+def ganadores_sorteo(sorteo_id: int) -> Tuple[str, tuple]:
+    """Todos los ganadores del sorteo, del más reciente al más antiguo"""
+    return _SELECT_DETALLE + """
+        WHERE ds.id_sorteo = %s AND ds.estado = %s
+        ORDER BY ds.fecha_ganador DESC
+    """, (sorteo_id, EstadoParticipacion.GANADOR.value)
+
+
+def detalle(fila: Optional[dict]) -> Optional[DetalleSorteoResponse]:
+    return DetalleSorteoResponse(**fila) if fila else None
+
+
+def detalles(filas: List[dict]) -> List[DetalleSorteoResponse]:
+    return [DetalleSorteoResponse(**fila) for fila in filas]
+
+
+def sorteos_lista(filas: List[dict]) -> List[SorteoListResponse]:
+    return [SorteoListResponse(**fila) for fila in filas]
+
+
+# --- Participantes ---
+
+def participante(documento: str) -> Tuple[str, tuple]:
+    return _SELECT_PARTICIPANTE + " WHERE documento = %s", (documento,)
+
+
+def participantes(despues_de: Optional[str] = None, limite: Optional[int] = None) -> Tuple[str, tuple]:
+    """
+    Sin `limite`, todos los participantes del más reciente al más antiguo.
+    Con `limite`, una página ordenada por documento (clave primaria) después
+    de `despues_de`.
+    """
+    if limite is None:
+        return _SELECT_PARTICIPANTE + " ORDER BY fecha_registro DESC", ()
+    return _SELECT_PARTICIPANTE + """
+        WHERE documento > %s
+        ORDER BY documento
+        LIMIT %s
+    """, (despues_de or "", limite)
+
+
+def participantes_lista(filas: List[dict]) -> List[ParticipanteResponse]:
+    return [ParticipanteResponse(**fila) for fila in filas]
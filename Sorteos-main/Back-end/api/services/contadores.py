@@ -0,0 +1,131 @@
+from typing import Optional
+
+import mysql.connector
+
+from config.database import DatabaseConnection
+from models.sorteo import EstadoParticipacion
+from services.seleccion_aleatoria import ESTADOS_ELEGIBLES
+
+
+def _aportes(estado: str):
+    """Retorna (elegible, ganador) con lo que aporta un participante en ese estado"""
+    return (
+        1 if estado in ESTADOS_ELEGIBLES else 0,
+        1 if estado == EstadoParticipacion.GANADOR.value else 0,
+    )
+
+
+class ContadoresSorteo:
+    """
+    Contadores materializados en la fila del sorteo: total_participantes,
+    total_elegibles (participando o perdedor) y total_ganadores.
+
+    Cada operación que inserta, borra o cambia el estado de filas de
+    detalle_sorteo los ajusta en su misma transacción, con la fila del sorteo
+    bloqueada antes de tocar detalle_sorteo (el mismo orden que _bloquear_cupo),
+    así el listado de sorteos y las verificaciones de cupo los leen sin contar
+    filas. recalcular() los reconstruye desde detalle_sorteo si se desvían
+    (p.ej. por cambios hechos a mano o borrados en cascada de participantes).
+    """
+
+    @staticmethod
+    def bloquear(cursor, sorteo_id: int) -> bool:
+        """Bloquea la fila del sorteo hasta el commit; False si no existe"""
+        cursor.execute("SELECT id FROM sorteo WHERE id = %s FOR UPDATE", (sorteo_id,))
+        return cursor.fetchone() is not None
+
+    @staticmethod
+    def ajustar(cursor, sorteo_id: int, participantes: int = 0, elegibles: int = 0, ganadores: int = 0):
+        """Suma los deltas a los contadores del sorteo (sin commit)"""
+        if not (participantes or elegibles or ganadores):
+            return
+        cursor.execute("""
+            UPDATE sorteo
+            SET total_participantes = total_participantes + %s,
+                total_elegibles = total_elegibles + %s,
+                total_ganadores = total_ganadores + %s
+            WHERE id = %s
+        """, (participantes, elegibles, ganadores, sorteo_id))
+
+    @staticmethod
+    def ajustar_cambio_estado(cursor, sorteo_id: int, anterior: str, nuevo: str, cantidad: int = 1):
+        """Ajusta los contadores cuando `cantidad` participantes pasan de `anterior` a `nuevo`"""
+        elegible_antes, ganador_antes = _aportes(anterior)
+        elegible_despues, ganador_despues = _aportes(nuevo)
+        ContadoresSorteo.ajustar(
+            cursor, sorteo_id,
+            elegibles=(elegible_despues - elegible_antes) * cantidad,
+            ganadores=(ganador_despues - ganador_antes) * cantidad
+        )
+
+    @staticmethod
+    def ajustar_baja(cursor, sorteo_id: int, estado: str):
+        """Ajusta los contadores cuando se elimina un participante en `estado`"""
+        elegible, ganador = _aportes(estado)
+        ContadoresSorteo.ajustar(cursor, sorteo_id, participantes=-1, elegibles=-elegible, ganadores=-ganador)
+
+    @staticmethod
+    def recalcular(sorteo_id: Optional[int] = None) -> int:
+        """
+        Reconstruye los contadores contando detalle_sorteo, un sorteo por
+        transacción. Retorna cuántos sorteos tenían contadores desviados.
+        """
+        connection = None
+        cursor = None
+        corregidos = 0
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor()
+
+            if sorteo_id is None:
+                cursor.execute("SELECT id FROM sorteo ORDER BY id")
+                sorteos = [fila[0] for fila in cursor.fetchall()]
+                connection.commit()
+            else:
+                sorteos = [sorteo_id]
+
+            estados_placeholders = ", ".join(["%s"] * len(ESTADOS_ELEGIBLES))
+            for id_sorteo in sorteos:
+                cursor.execute("""
+                    SELECT total_participantes, total_elegibles, total_ganadores
+                    FROM sorteo WHERE id = %s
+                    FOR UPDATE
+                """, (id_sorteo,))
+                actuales = cursor.fetchone()
+                if not actuales:
+                    connection.commit()
+                    continue
+
+                # Lectura con bloqueo: ve lo último confirmado y espera a las escrituras en curso
+                cursor.execute(f"""
+                    SELECT COUNT(*),
+                           COALESCE(SUM(estado IN ({estados_placeholders})), 0),
+                           COALESCE(SUM(estado = %s), 0)
+                    FROM detalle_sorteo
+                    WHERE id_sorteo = %s
+                    LOCK IN SHARE MODE
+                """, (*ESTADOS_ELEGIBLES, EstadoParticipacion.GANADOR.value, id_sorteo))
+                reales = tuple(int(valor) for valor in cursor.fetchone())
+
+                if tuple(actuales) != reales:
+                    print(f"Sorteo {id_sorteo}: contadores {tuple(actuales)} corregidos a {reales}")
+                    cursor.execute("""
+                        UPDATE sorteo
+                        SET total_participantes = %s, total_elegibles = %s, total_ganadores = %s
+                        WHERE id = %s
+                    """, (*reales, id_sorteo))
+                    corregidos += 1
+                connection.commit()
+
+            return corregidos
+
+        except mysql.connector.Error as e:
+            print(f"Error recalculando contadores: {e}")
+            if connection:
+                connection.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
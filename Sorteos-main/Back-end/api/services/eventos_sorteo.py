@@ -0,0 +1,310 @@
+"""
+Eventos de sorteo (ganadores, cambios de estado, finalización) para las
+pantallas, por SSE o WebSocket.
+
+Los servicios registran cada evento en la tabla `sorteo_evento` dentro de la
+misma transacción que lo produce, así un evento existe si y solo si su cambio
+se confirmó, y su ID (autoincremental) sirve para reanudar (Last-Event-ID)
+desde cualquier worker. En cada proceso una sola tarea lee los eventos nuevos
+(una consulta por clave primaria cada INTERVALO_LECTURA segundos, o en cuanto
+un servicio de ese proceso confirma uno) y los reparte a las colas de los
+suscriptores del sorteo: cientos de pantallas cuestan una consulta por
+worker en lugar de cientos de consultas.
+
+Un ID faltante (una transacción más lenta que aún no confirmó, o una
+revertida) no frena el reparto: los eventos posteriores se entregan de
+inmediato y el faltante se sigue buscando durante ESPERA_HUECO segundos para
+entregarlo en cuanto se confirme, así que puede llegar después de uno con ID
+mayor. Los clientes deben ordenar o descartar duplicados por ID.
+
+Cada suscriptor tiene una cola acotada. Si no consume a tiempo se lo
+desconecta con un evento `desbordado` en lugar de acumular memoria o frenar
+a los demás; al reconectar con su último ID recupera lo perdido desde la tabla.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from database import bulk
+from database.async_pool import AsyncDatabaseConnection
+from services.seleccion_aleatoria import SelectorAleatorio
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Segundos entre lecturas de eventos nuevos (antes si un servicio local avisa)
+INTERVALO_LECTURA = 0.5
+# Eventos leídos por consulta
+LOTE_LECTURA = 500
+# Eventos pendientes por suscriptor antes de desconectarlo
+TAMANO_COLA = 256
+# Eventos que se reenvían como máximo al reanudar
+MAXIMO_HISTORIAL = 1000
+# Segundos durante los que se busca un ID faltante para entregarlo tarde
+# (una transacción lenta puede confirmar un ID menor después de uno mayor;
+# uno revertido nunca llega). Los posteriores no lo esperan.
+ESPERA_HUECO = 5.0
+# IDs faltantes que se siguen buscando a la vez
+MAXIMO_HUECOS = 500
+# Segundos sin eventos tras los que se envía un latido
+INTERVALO_LATIDO = 15.0
+
+TIPO_GANADOR = "ganador"
+TIPO_ESTADO_PARTICIPANTE = "estado_participante"
+TIPO_FINALIZADO = "finalizado"
+TIPO_DESBORDADO = "desbordado"
+
+
+def _json(valor):
+    return json.dumps(valor, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v), ensure_ascii=False)
+
+
+class Suscripcion:
+    """Cola de eventos de un cliente conectado a un sorteo"""
+
+    def __init__(self, sorteo_id: int):
+        self.sorteo_id = sorteo_id
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=TAMANO_COLA)
+        self.desbordada = False
+
+    def entregar(self, evento: dict):
+        if self.desbordada:
+            return
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Vaciar y dejar solo el aviso: el cliente se reconecta y reanuda
+            self.desbordada = True
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait(None)
+
+
+class EventosSorteo:
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _despertar: Optional[asyncio.Event] = None
+    _tarea: Optional[asyncio.Task] = None
+    _suscriptores: Dict[int, Set[Suscripcion]] = {}
+    _estadisticas = {"entregados": 0, "desbordados": 0, "tardios": 0}
+
+    # --- Registro (lado síncrono, dentro de la transacción del servicio) ---
+
+    @staticmethod
+    def registrar(cursor, sorteo_id: int, tipo: str, datos: dict):
+        """Agrega un evento a la transacción en curso (sin commit)"""
+        cursor.execute(
+            "INSERT INTO sorteo_evento (id_sorteo, tipo, datos) VALUES (%s, %s, %s)",
+            (sorteo_id, tipo, _json(datos))
+        )
+
+    @staticmethod
+    def registrar_ganadores(connection, cursor, sorteo_id: int, ids: List[int], fecha_ganador: datetime):
+        """Agrega un evento `ganador` por cada detalle_sorteo, en el orden recibido (sin commit)"""
+        detalles = SelectorAleatorio.obtener_detalles(connection, ids)
+        filas = [
+            (sorteo_id, TIPO_GANADOR, _json({
+                "id": detalle["detalle_id"],
+                "numero": detalle["numero"],
+                "documento_participante": detalle["documento"],
+                "nombre_participante": detalle["nombre"],
+                "fecha_ganador": fecha_ganador
+            }))
+            for detalle in detalles
+        ]
+        bulk.insertar_filas(cursor, "INSERT INTO sorteo_evento (id_sorteo, tipo, datos) VALUES", filas)
+
+    @staticmethod
+    def remapear_ids(cursor, sorteos: Iterable[int], mapeo: Dict[int, int]):
+        """
+        Actualiza el ID de detalle_sorteo de los eventos ya registrados cuando
+        la compactación en línea lo cambia. Se ejecuta dentro de la transacción
+        que movió las filas; quien llama hace el commit.
+        """
+        sorteos = list(sorteos)
+        if not sorteos or not mapeo:
+            return
+
+        placeholders = ", ".join(["%s"] * len(sorteos))
+        cursor.execute(f"""
+            SELECT id, datos FROM sorteo_evento
+            WHERE id_sorteo IN ({placeholders}) AND tipo IN (%s, %s)
+            FOR UPDATE
+        """, (*sorteos, TIPO_GANADOR, TIPO_ESTADO_PARTICIPANTE))
+
+        for evento_id, datos in cursor.fetchall():
+            datos = json.loads(datos)
+            if datos.get("id") in mapeo:
+                datos["id"] = mapeo[datos["id"]]
+                cursor.execute("UPDATE sorteo_evento SET datos = %s WHERE id = %s", (_json(datos), evento_id))
+
+    @staticmethod
+    def notificar():
+        """Avisa a la tarea de reparto de este proceso que hay eventos confirmados (llamar tras el commit)"""
+        loop, despertar = EventosSorteo._loop, EventosSorteo._despertar
+        if loop is None or despertar is None:
+            return
+        try:
+            loop.call_soon_threadsafe(despertar.set)
+        except RuntimeError:
+            # El loop ya se cerró (apagado)
+            pass
+
+    # --- Reparto (lado asíncrono) ---
+
+    @staticmethod
+    def iniciar():
+        """Arranca la tarea de reparto en el loop actual (al iniciar la aplicación)"""
+        EventosSorteo._loop = asyncio.get_running_loop()
+        EventosSorteo._despertar = asyncio.Event()
+        EventosSorteo._tarea = asyncio.create_task(EventosSorteo._repartir())
+
+    @staticmethod
+    async def detener():
+        tarea, EventosSorteo._tarea = EventosSorteo._tarea, None
+        EventosSorteo._loop = None
+        if tarea:
+            tarea.cancel()
+            try:
+                await tarea
+            except asyncio.CancelledError:
+                pass
+
+    @staticmethod
+    async def _ultimo_id() -> int:
+        fila = await AsyncDatabaseConnection.execute_query(
+            "SELECT COALESCE(MAX(id), 0) AS ultimo FROM sorteo_evento", fetch_one=True
+        )
+        return int(fila["ultimo"])
+
+    @staticmethod
+    async def _repartir():
+        ultimo = None
+        # ID faltante -> momento en que se lo vio faltar
+        huecos: Dict[int, float] = {}
+        while True:
+            try:
+                if ultimo is None:
+                    ultimo = await EventosSorteo._ultimo_id()
+
+                ahora = time.monotonic()
+                if huecos:
+                    # Faltantes que se confirmaron después que los posteriores
+                    tardios = await AsyncDatabaseConnection.execute_query(
+                        f"SELECT id, id_sorteo, tipo, datos FROM sorteo_evento "
+                        f"WHERE id IN ({', '.join(['%s'] * len(huecos))}) ORDER BY id",
+                        tuple(huecos), fetch_all=True
+                    )
+                    for fila in tardios:
+                        del huecos[fila["id"]]
+                        EventosSorteo._estadisticas["tardios"] += 1
+                        EventosSorteo._entregar(EventosSorteo._evento(fila))
+                    huecos = {id_: desde for id_, desde in huecos.items() if ahora - desde < ESPERA_HUECO}
+
+                filas = await AsyncDatabaseConnection.execute_query(
+                    "SELECT id, id_sorteo, tipo, datos FROM sorteo_evento WHERE id > %s ORDER BY id LIMIT %s",
+                    (ultimo, LOTE_LECTURA), fetch_all=True
+                )
+                for fila in filas:
+                    # IDs salteados: puede ser una transacción que aún no confirmó
+                    for faltante in range(max(ultimo + 1, fila["id"] - MAXIMO_HUECOS), fila["id"]):
+                        huecos[faltante] = ahora
+                    ultimo = fila["id"]
+                    EventosSorteo._entregar(EventosSorteo._evento(fila))
+                if len(huecos) > MAXIMO_HUECOS:
+                    huecos = dict(sorted(huecos.items())[-MAXIMO_HUECOS:])
+
+                if len(filas) == LOTE_LECTURA:
+                    continue
+                espera = INTERVALO_LECTURA
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error leyendo eventos de sorteo: {e}")
+                espera = INTERVALO_LECTURA * 10
+
+            try:
+                await asyncio.wait_for(EventosSorteo._despertar.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+            EventosSorteo._despertar.clear()
+
+    @staticmethod
+    def _evento(fila: dict) -> dict:
+        datos = fila["datos"]
+        return {
+            "id": fila["id"],
+            "sorteo_id": fila["id_sorteo"],
+            "tipo": fila["tipo"],
+            "datos": json.loads(datos) if isinstance(datos, (str, bytes)) else datos
+        }
+
+    @staticmethod
+    def _entregar(evento: dict):
+        for suscripcion in list(EventosSorteo._suscriptores.get(evento["sorteo_id"], ())):
+            suscripcion.entregar(evento)
+            if suscripcion.desbordada:
+                EventosSorteo._estadisticas["desbordados"] += 1
+                EventosSorteo._cancelar(suscripcion)
+            else:
+                EventosSorteo._estadisticas["entregados"] += 1
+
+    @staticmethod
+    def _cancelar(suscripcion: Suscripcion):
+        suscriptores = EventosSorteo._suscriptores.get(suscripcion.sorteo_id)
+        if suscriptores:
+            suscriptores.discard(suscripcion)
+            if not suscriptores:
+                del EventosSorteo._suscriptores[suscripcion.sorteo_id]
+
+    @staticmethod
+    async def escuchar(sorteo_id: int, ultimo_id: Optional[int] = None) -> AsyncIterator[Optional[dict]]:
+        """
+        Eventos del sorteo a medida que ocurren. Con `ultimo_id` empieza
+        reenviando los posteriores a ese ID. Produce None cada INTERVALO_LATIDO
+        segundos sin eventos, y termina tras un evento `desbordado`.
+        """
+        suscripcion = Suscripcion(sorteo_id)
+        # Suscribirse antes de leer el historial: lo que llegue mientras tanto queda en la cola
+        EventosSorteo._suscriptores.setdefault(sorteo_id, set()).add(suscripcion)
+        try:
+            enviados = set()
+            if ultimo_id is not None:
+                filas = await AsyncDatabaseConnection.execute_query(
+                    """
+                    SELECT id, id_sorteo, tipo, datos FROM sorteo_evento
+                    WHERE id_sorteo = %s AND id > %s
+                    ORDER BY id
+                    LIMIT %s
+                    """,
+                    (sorteo_id, ultimo_id, MAXIMO_HISTORIAL), fetch_all=True
+                )
+                for fila in filas:
+                    enviados.add(fila["id"])
+                    yield EventosSorteo._evento(fila)
+
+            while True:
+                try:
+                    evento = await asyncio.wait_for(suscripcion.cola.get(), timeout=INTERVALO_LATIDO)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if evento is None:
+                    yield {"id": None, "sorteo_id": sorteo_id, "tipo": TIPO_DESBORDADO, "datos": {}}
+                    return
+                if evento["id"] in enviados:
+                    continue
+                yield evento
+        finally:
+            EventosSorteo._cancelar(suscripcion)
+
+    @staticmethod
+    def estadisticas() -> dict:
+        return {
+            **EventosSorteo._estadisticas,
+            "suscriptores": sum(len(s) for s in EventosSorteo._suscriptores.values()),
+            "activo": EventosSorteo._tarea is not None and not EventosSorteo._tarea.done()
+        }
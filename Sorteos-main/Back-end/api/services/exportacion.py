@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, List
+
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from database.streaming import ConsultaStreaming
+
+# Filas que se agrupan en cada bloque enviado al cliente
+FILAS_POR_BLOQUE = 500
+
+FORMATOS_STREAMING = ("ndjson", "csv")
+
+# Encabezado con el cursor de la página siguiente en los listados paginados
+ENCABEZADO_SIGUIENTE = "X-Siguiente-Cursor"
+
+
+def _valor_json(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.value
+    return str(valor)
+
+
+def _bloques_ndjson(filas: Iterable[dict], columnas: List[str]):
+    lineas = []
+    for fila in filas:
+        lineas.append(json.dumps({c: fila.get(c) for c in columnas}, default=_valor_json, ensure_ascii=False))
+        if len(lineas) >= FILAS_POR_BLOQUE:
+            yield "\n".join(lineas) + "\n"
+            lineas = []
+    if lineas:
+        yield "\n".join(lineas) + "\n"
+
+
+def _bloques_csv(filas: Iterable[dict], columnas: List[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columnas)
+    pendientes = 0
+    for fila in filas:
+        writer.writerow([
+            fila.get(c).isoformat() if isinstance(fila.get(c), (datetime, date)) else fila.get(c)
+            for c in columnas
+        ])
+        pendientes += 1
+        if pendientes >= FILAS_POR_BLOQUE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pendientes = 0
+    yield buffer.getvalue()
+
+
+def respuesta_streaming(consulta: ConsultaStreaming, formato: str, columnas: List[str], nombre_archivo: str) -> StreamingResponse:
+    """
+    Envía las filas de una consulta como NDJSON o CSV a medida que se leen de
+    la base de datos, sin construir la lista completa en memoria.
+    """
+    if formato == "csv":
+        contenido = _bloques_csv(consulta, columnas)
+        media_type = "text/csv; charset=utf-8"
+        extension = "csv"
+    else:
+        contenido = _bloques_ndjson(consulta, columnas)
+        media_type = "application/x-ndjson"
+        extension = "ndjson"
+
+    return StreamingResponse(
+        contenido,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nombre_archivo}.{extension}"'},
+        # Libera la conexión aunque el cliente se desconecte antes de terminar
+        background=BackgroundTask(consulta.cerrar)
+    )
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow es opcional: sin él se sirve siempre el original
+    Image = None
+    ImageOps = None
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Variantes generadas para cada imagen: nombre -> ancho en píxeles
+VARIANTES = {
+    "thumb": 320,
+    "720p": 1280,
+    "1080p": 1920,
+}
+
+DIRECTORIO_VARIANTES = "images/sorteos/variantes"
+MANIFIESTO = "manifiesto.json"
+
+CALIDAD_JPEG = 82
+CALIDAD_WEBP = 80
+
+# Las variantes se generan fuera del hilo de la solicitud
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="imagen-variantes")
+_en_proceso = set()
+_lock = threading.Lock()
+
+
+def _clave_origen(ruta_origen: str) -> str:
+    """Identifica la versión del archivo original (cambia si se reemplaza)"""
+    stat = os.stat(ruta_origen)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _directorio(ruta_origen: str) -> str:
+    nombre = os.path.splitext(os.path.basename(ruta_origen))[0]
+    return os.path.join(DIRECTORIO_VARIANTES, nombre)
+
+
+class ImagenVariantes:
+    """
+    Variantes redimensionadas (y en WebP) de las imágenes de fondo.
+
+    Cada imagen tiene un directorio con sus variantes y un manifiesto que
+    registra de qué versión del original salieron; si el original cambia, las
+    variantes se consideran vencidas y se vuelven a generar en segundo plano.
+    """
+
+    @staticmethod
+    def disponible() -> bool:
+        return Image is not None
+
+    @staticmethod
+    def _leer_manifiesto(ruta_origen: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(_directorio(ruta_origen), MANIFIESTO)) as archivo:
+                manifiesto = json.load(archivo)
+        except (OSError, ValueError):
+            return None
+        try:
+            # Los manifiestos sin el WebP de tamaño completo se regeneran
+            if manifiesto.get("origen") != _clave_origen(ruta_origen) or "webp" not in manifiesto:
+                return None
+        except OSError:
+            return None
+        return manifiesto
+
+    @staticmethod
+    def programar(ruta_origen: str):
+        """Encola la generación de variantes de una imagen (si Pillow está instalado)"""
+        if not ImagenVariantes.disponible():
+            return
+        with _lock:
+            if ruta_origen in _en_proceso:
+                return
+            _en_proceso.add(ruta_origen)
+        _executor.submit(ImagenVariantes._generar_en_segundo_plano, ruta_origen)
+
+    @staticmethod
+    def _generar_en_segundo_plano(ruta_origen: str):
+        try:
+            ImagenVariantes.generar(ruta_origen)
+        except Exception as e:
+            logger.error(f"Error generando variantes de {ruta_origen}: {e}")
+        finally:
+            with _lock:
+                _en_proceso.discard(ruta_origen)
+
+    @staticmethod
+    def generar(ruta_origen: str) -> Optional[dict]:
+        """Genera las variantes de una imagen si faltan o están vencidas y retorna el manifiesto"""
+        if not ImagenVariantes.disponible() or not os.path.exists(ruta_origen):
+            return None
+
+        manifiesto = ImagenVariantes._leer_manifiesto(ruta_origen)
+        if manifiesto:
+            return manifiesto
+
+        clave = _clave_origen(ruta_origen)
+        directorio = _directorio(ruta_origen)
+        os.makedirs(directorio, exist_ok=True)
+
+        with Image.open(ruta_origen) as original:
+            imagen = ImageOps.exif_transpose(original)
+            ancho_original, alto_original = imagen.size
+            formato = "PNG" if original.format == "PNG" else "JPEG"
+            extension = "png" if formato == "PNG" else "jpg"
+
+            generadas = {}
+            for nombre, ancho in VARIANTES.items():
+                # Nunca agrandar: si el original es más angosto la variante no aplica
+                if ancho >= ancho_original:
+                    continue
+                alto = max(1, round(alto_original * ancho / ancho_original))
+                redimensionada = imagen.resize((ancho, alto), Image.LANCZOS)
+
+                archivos = {}
+                for formato_salida, ext in ((formato, extension), ("WEBP", "webp")):
+                    destino = os.path.join(directorio, f"{nombre}.{ext}")
+                    temporal = f"{destino}.tmp"
+                    salida = redimensionada
+                    if formato_salida == "JPEG" and salida.mode not in ("RGB", "L"):
+                        salida = salida.convert("RGB")
+                    opciones = {"optimize": True}
+                    if formato_salida == "JPEG":
+                        opciones.update(quality=CALIDAD_JPEG, progressive=True)
+                    elif formato_salida == "WEBP":
+                        opciones = {"quality": CALIDAD_WEBP, "method": 4}
+                    salida.save(temporal, format=formato_salida, **opciones)
+                    os.replace(temporal, destino)
+                    archivos["webp" if formato_salida == "WEBP" else "original"] = destino
+
+                generadas[nombre] = {"ancho": ancho, "alto": alto, "archivos": archivos}
+
+            # El original en WebP, del mismo tamaño: lo que se sirve a quien acepta
+            # WebP sin pedir un ancho (los GIF animados se dejan como están)
+            webp_original = None
+            if not getattr(original, "is_animated", False):
+                webp_original = os.path.join(directorio, "original.webp")
+                temporal = f"{webp_original}.tmp"
+                imagen.save(temporal, format="WEBP", quality=CALIDAD_WEBP, method=4)
+                os.replace(temporal, webp_original)
+
+        manifiesto = {
+            "origen": clave,
+            "ancho": ancho_original,
+            "alto": alto_original,
+            "variantes": generadas,
+            "webp": webp_original,
+        }
+        temporal = os.path.join(directorio, f"{MANIFIESTO}.tmp")
+        with open(temporal, "w") as archivo:
+            json.dump(manifiesto, archivo)
+        os.replace(temporal, os.path.join(directorio, MANIFIESTO))
+
+        logger.info(f"Variantes generadas para {ruta_origen}: {', '.join(generadas) or 'ninguna'}")
+        return manifiesto
+
+    @staticmethod
+    def seleccionar(ruta_origen: str, ancho: Optional[int] = None, webp: bool = False) -> str:
+        """
+        Retorna la ruta a servir para un ancho solicitado: la variante más pequeña
+        que alcance ese ancho, o el original si ninguna alcanza. Sin ancho nunca
+        se reduce la imagen: se sirve el original (en WebP, del mismo tamaño, si
+        se pide WebP). Si las variantes faltan o están vencidas se sirve el
+        original y se programa su generación.
+        """
+        if ancho is None and not webp:
+            return ruta_origen
+
+        manifiesto = ImagenVariantes._leer_manifiesto(ruta_origen)
+        if manifiesto is None:
+            ImagenVariantes.programar(ruta_origen)
+            return ruta_origen
+
+        candidatas = []
+        if ancho is not None:
+            candidatas = sorted(manifiesto["variantes"].values(), key=lambda v: v["ancho"])
+            candidatas = [v for v in candidatas if v["ancho"] >= ancho]
+        if candidatas:
+            archivo = candidatas[0]["archivos"]["webp" if webp else "original"]
+        elif webp and manifiesto.get("webp"):
+            archivo = manifiesto["webp"]
+        else:
+            return ruta_origen
+
+        if not os.path.exists(archivo):
+            ImagenVariantes.programar(ruta_origen)
+            return ruta_origen
+        return archivo
+
+    @staticmethod
+    def eliminar(ruta_origen: str):
+        """Elimina las variantes de una imagen"""
+        shutil.rmtree(_directorio(ruta_origen), ignore_errors=True)
@@ -1,11 +1,14 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 import logging
 import mysql.connector
 
 from models.participante import Participante, ParticipanteResponse, RegistroParticipantesResponse, RegistroSorteoConParticipantesResponse
 # Importación removida para evitar dependencia circular
-from config.database import DatabaseConnection
+from config.database import DatabaseConnection, BULK_CHUNK_SIZE
+from database import bulk
+from database.streaming import ConsultaStreaming
+from services import consultas
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -79,8 +82,15 @@ class ParticipanteService:
         return ParticipanteService.registrar_participantes_objetos(participantes, errores_parsing)
     
     @staticmethod
-    def registrar_participantes_objetos(participantes: List[Participante], errores_previos: List[str] = None) -> RegistroParticipantesResponse:
-        """Registra múltiples participantes desde objetos Participante"""
+    def registrar_participantes_objetos(participantes: List[Participante], errores_previos: List[str] = None, tamano_lote: int = BULK_CHUNK_SIZE) -> RegistroParticipantesResponse:
+        """
+        Registra múltiples participantes desde objetos Participante.
+        
+        Los participantes se procesan por lotes de `tamano_lote`: una consulta IN
+        detecta los existentes y un INSERT IGNORE de varias filas crea los nuevos.
+        Cada lote es una transacción; si falla se reporta un error por lote y se
+        continúa con el siguiente.
+        """
         if errores_previos is None:
             errores_previos = []
             
@@ -88,25 +98,40 @@ class ParticipanteService:
         participantes_existentes = 0
         errores_db = []
         
-        for participante in participantes:
-            try:
-                # Verificar si el participante ya existe
-                if ParticipanteService.participante_existe(participante.documento):
-                    participantes_existentes += 1
-                    logger.info(f"Participante ya existe: {participante.documento}")
-                else:
-                    # Crear nuevo participante
-                    if ParticipanteService.crear_participante(participante):
-                        participantes_registrados += 1
-                        
-            except mysql.connector.Error as err:
-                error_msg = f"Error registrando {participante.documento}: {str(err)}"
-                errores_db.append(error_msg)
-                logger.error(error_msg)
-            except Exception as e:
-                error_msg = f"Error inesperado registrando {participante.documento}: {str(e)}"
-                errores_db.append(error_msg)
-                logger.error(error_msg)
+        # Los documentos repetidos en la misma solicitud cuentan como existentes
+        unicos, duplicados = bulk.deduplicar_participantes(participantes)
+        participantes_existentes += len(duplicados)
+        
+        connection = None
+        cursor = None
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor()
+            
+            for numero_lote, lote in enumerate(bulk.chunked(unicos, tamano_lote), start=1):
+                try:
+                    existentes = bulk.documentos_existentes(cursor, [p.documento for p in lote])
+                    nuevos = [p for p in lote if p.documento not in existentes]
+                    insertados = bulk.insertar_participantes(cursor, nuevos)
+                    connection.commit()
+                    
+                    participantes_registrados += insertados
+                    participantes_existentes += len(lote) - insertados
+                    logger.info(f"Lote {numero_lote}: {insertados} registrados, {len(lote) - insertados} ya existían")
+                    
+                except mysql.connector.Error as err:
+                    connection.rollback()
+                    error_msg = (
+                        f"Error registrando lote {numero_lote} "
+                        f"({lote[0].documento} … {lote[-1].documento}, {len(lote)} participantes): {str(err)}"
+                    )
+                    errores_db.append(error_msg)
+                    logger.error(error_msg)
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
         
         # Preparar respuesta
         mensaje = f"Proceso completado. Registrados: {participantes_registrados}, Ya existían: {participantes_existentes}"
@@ -119,18 +144,36 @@ class ParticipanteService:
         )
     
     @staticmethod
-    def obtener_todos_participantes() -> List[ParticipanteResponse]:
-        """Obtiene todos los participantes registrados"""
-        query = "SELECT documento, nombre, fecha_registro FROM participantes ORDER BY fecha_registro DESC"
-        participantes_data = DatabaseConnection.execute_query(query, fetch_all=True)
+    def obtener_todos_participantes(despues_de: Optional[str] = None, limite: Optional[int] = None) -> List[ParticipanteResponse]:
+        """
+        Obtiene los participantes registrados.
         
-        return [ParticipanteResponse(**participante) for participante in participantes_data]
+        Sin `limite` retorna todos, del más reciente al más antiguo. Con `limite`
+        retorna una página ordenada por documento (clave primaria), empezando
+        después de `despues_de`.
+        """
+        query, params = consultas.participantes(despues_de, limite)
+        return consultas.participantes_lista(DatabaseConnection.execute_query(query, params, fetch_all=True))
+    
+    @staticmethod
+    def consultar_participantes_streaming(despues_de: Optional[str] = None, limite: Optional[int] = None) -> ConsultaStreaming:
+        """Abre una consulta en streaming de los participantes, ordenados por documento"""
+        query = """
+            SELECT documento, nombre, fecha_registro FROM participantes
+            WHERE documento > %s
+            ORDER BY documento
+        """
+        params = (despues_de or "",)
+        if limite is not None:
+            query += " LIMIT %s"
+            params += (limite,)
+        return ConsultaStreaming(query, params)
     
     @staticmethod
     def obtener_participante_por_documento(documento: str) -> ParticipanteResponse:
         """Obtiene un participante específico por su documento"""
-        query = "SELECT documento, nombre, fecha_registro FROM participantes WHERE documento = %s"
-        participante_data = DatabaseConnection.execute_query(query, (documento,), fetch_one=True)
+        query, params = consultas.participante(documento)
+        participante_data = DatabaseConnection.execute_query(query, params, fetch_one=True)
         
         if not participante_data:
             raise ValueError(f"Participante con documento {documento} no encontrado")
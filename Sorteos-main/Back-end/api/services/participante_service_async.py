@@ -0,0 +1,28 @@
+from typing import List, Optional
+
+from database.async_pool import AsyncDatabaseConnection
+from models.participante import ParticipanteResponse
+from services import consultas
+
+
+class ParticipanteServiceAsync:
+    """Versiones asíncronas de las lecturas de ParticipanteService (mismas consultas, ver services.consultas)"""
+
+    @staticmethod
+    async def obtener_participante_por_documento(documento: str) -> ParticipanteResponse:
+        """Obtiene un participante específico por su documento"""
+        query, params = consultas.participante(documento)
+        participante_data = await AsyncDatabaseConnection.execute_query(query, params, fetch_one=True)
+
+        if not participante_data:
+            raise ValueError(f"Participante con documento {documento} no encontrado")
+
+        return ParticipanteResponse(**participante_data)
+
+    @staticmethod
+    async def obtener_todos_participantes(despues_de: Optional[str] = None, limite: Optional[int] = None) -> List[ParticipanteResponse]:
+        """Obtiene los participantes registrados (ver ParticipanteService.obtener_todos_participantes)"""
+        query, params = consultas.participantes(despues_de, limite)
+        return consultas.participantes_lista(
+            await AsyncDatabaseConnection.execute_query(query, params, fetch_all=True)
+        )
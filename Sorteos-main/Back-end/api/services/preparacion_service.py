@@ -0,0 +1,268 @@
+import random
+import secrets
+import struct
+from typing import Dict, Iterable, List, Optional
+
+import mysql.connector
+
+from config.database import DatabaseConnection
+from models.sorteo import PreparacionSorteoResponse, AuditoriaPreparacionResponse, EstadoSorteo
+from services.seleccion_aleatoria import ESTADOS_ELEGIBLES
+
+# Cada ID de detalle_sorteo se guarda como entero sin signo de 4 bytes
+_FORMATO_ID = "<I"
+_BYTES_POR_ID = struct.calcsize(_FORMATO_ID)
+
+
+def _empaquetar(ids: List[int]) -> bytes:
+    return struct.pack(f"<{len(ids)}I", *ids)
+
+
+def _desempaquetar(datos: bytes) -> List[int]:
+    return list(struct.unpack(f"<{len(datos) // _BYTES_POR_ID}I", datos))
+
+
+class SemillaNoRevelableError(Exception):
+    """La semilla de un sorteo solo se revela cuando el sorteo terminó"""
+    pass
+
+
+class PreparacionService:
+    """
+    Precarga de sorteos: congela los participantes elegibles y guarda una
+    permutación aleatoria completa (con su semilla) en sorteo_preparacion.
+    Durante la transmisión las revelaciones solo leen las siguientes
+    posiciones de esa permutación, sin contar ni ordenar participantes.
+
+    La semilla nunca sale en las respuestas públicas ni en el log: con ella
+    y la lista de participantes se deducirían todos los ganadores. Solo se
+    entrega para auditoría (obtener_auditoria) cuando el sorteo finalizó.
+    """
+
+    @staticmethod
+    def preparar_sorteo(sorteo_id: int) -> Optional[PreparacionSorteoResponse]:
+        """Congela los participantes elegibles del sorteo y calcula su orden de revelación"""
+        connection = None
+        cursor = None
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor()
+
+            cursor.execute("SELECT id FROM sorteo WHERE id = %s", (sorteo_id,))
+            if not cursor.fetchone():
+                return None
+
+            placeholders = ", ".join(["%s"] * len(ESTADOS_ELEGIBLES))
+            cursor.execute(f"""
+                SELECT id FROM detalle_sorteo
+                WHERE id_sorteo = %s AND estado IN ({placeholders})
+                ORDER BY id
+            """, (sorteo_id, *ESTADOS_ELEGIBLES))
+            ids = [fila[0] for fila in cursor.fetchall()]
+
+            # La semilla queda registrada (solo en sorteo_preparacion) para poder
+            # auditar/reproducir el orden una vez finalizado el sorteo
+            semilla = secrets.randbits(63)
+            random.Random(semilla).shuffle(ids)
+
+            cursor.execute("""
+                REPLACE INTO sorteo_preparacion (id_sorteo, semilla, total, posicion, orden)
+                VALUES (%s, %s, %s, 0, %s)
+            """, (sorteo_id, semilla, len(ids), _empaquetar(ids)))
+            connection.commit()
+
+            print(f"Sorteo {sorteo_id} preparado: {len(ids)} participantes")
+
+        except mysql.connector.Error as e:
+            print(f"Error preparando sorteo: {e}")
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+        return PreparacionService.obtener_preparacion(sorteo_id)
+
+    @staticmethod
+    def obtener_preparacion(sorteo_id: int) -> Optional[PreparacionSorteoResponse]:
+        """Obtiene el estado de la preparación de un sorteo"""
+        connection = None
+        cursor = None
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute("""
+                SELECT id_sorteo, total, posicion, fecha_preparacion
+                FROM sorteo_preparacion
+                WHERE id_sorteo = %s
+            """, (sorteo_id,))
+            result = cursor.fetchone()
+
+            if result:
+                return PreparacionSorteoResponse(
+                    restantes=max(result['total'] - result['posicion'], 0),
+                    **result
+                )
+            return None
+
+        except mysql.connector.Error as e:
+            print(f"Error obteniendo preparación del sorteo: {e}")
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @staticmethod
+    def obtener_auditoria(sorteo_id: int) -> Optional[AuditoriaPreparacionResponse]:
+        """
+        Semilla de la preparación, para reproducir el orden de revelación.
+        Retorna None si el sorteo no está preparado y lanza
+        SemillaNoRevelableError si todavía no finalizó.
+        """
+        connection = None
+        cursor = None
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute("""
+                SELECT p.id_sorteo, p.semilla, p.total, p.fecha_preparacion, s.estado
+                FROM sorteo_preparacion p
+                JOIN sorteo s ON s.id = p.id_sorteo
+                WHERE p.id_sorteo = %s
+            """, (sorteo_id,))
+            result = cursor.fetchone()
+
+            if not result:
+                return None
+            if result.pop('estado') != EstadoSorteo.FINALIZADO.value:
+                raise SemillaNoRevelableError(f"El sorteo {sorteo_id} aún no finalizó")
+            return AuditoriaPreparacionResponse(**result)
+
+        except mysql.connector.Error as e:
+            print(f"Error obteniendo auditoría de la preparación: {e}")
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @staticmethod
+    def eliminar_preparacion(sorteo_id: int) -> bool:
+        """Descarta la preparación de un sorteo (las revelaciones vuelven a ser en vivo)"""
+        connection = None
+        cursor = None
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor()
+
+            cursor.execute("DELETE FROM sorteo_preparacion WHERE id_sorteo = %s", (sorteo_id,))
+            connection.commit()
+
+            return cursor.rowcount > 0
+
+        except mysql.connector.Error as e:
+            print(f"Error eliminando preparación del sorteo: {e}")
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+
+    @staticmethod
+    def tomar_siguientes(connection, sorteo_id: int, cantidad: int) -> Optional[List[int]]:
+        """
+        Toma los siguientes `cantidad` IDs del orden precalculado.
+
+        Se saltan los participantes cuyo estado cambió desde la preparación
+        (ganadores, eliminados, descalificados o removidos del sorteo).
+        Retorna None si el sorteo no está preparado o su orden se agotó; en ese
+        caso quien llama debe recurrir a la selección en vivo. La posición se
+        actualiza con la conexión recibida: quien llama hace el commit.
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT posicion, total FROM sorteo_preparacion
+                WHERE id_sorteo = %s
+                FOR UPDATE
+            """, (sorteo_id,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+
+            posicion, total = result
+            if posicion >= total:
+                return None
+
+            placeholders_estados = ", ".join(["%s"] * len(ESTADOS_ELEGIBLES))
+            elegidos = []
+
+            while len(elegidos) < cantidad and posicion < total:
+                # Leer algunas posiciones de más por si hay participantes a saltar
+                lote = min((cantidad - len(elegidos)) * 2, total - posicion)
+                cursor.execute("""
+                    SELECT SUBSTRING(orden, %s, %s) FROM sorteo_preparacion
+                    WHERE id_sorteo = %s
+                """, (posicion * _BYTES_POR_ID + 1, lote * _BYTES_POR_ID, sorteo_id))
+                ids = _desempaquetar(bytes(cursor.fetchone()[0]))
+
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(f"""
+                    SELECT id FROM detalle_sorteo
+                    WHERE id IN ({placeholders})
+                    AND id_sorteo = %s
+                    AND estado IN ({placeholders_estados})
+                """, (*ids, sorteo_id, *ESTADOS_ELEGIBLES))
+                vigentes = {fila[0] for fila in cursor.fetchall()}
+
+                for detalle_id in ids:
+                    posicion += 1
+                    if detalle_id in vigentes:
+                        elegidos.append(detalle_id)
+                        if len(elegidos) == cantidad:
+                            break
+
+            cursor.execute("""
+                UPDATE sorteo_preparacion SET posicion = %s
+                WHERE id_sorteo = %s
+            """, (posicion, sorteo_id))
+
+            return elegidos or None
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def remapear_ids(cursor, sorteos: Iterable[int], mapeo: Dict[int, int]):
+        """
+        Actualiza los órdenes precalculados cuando cambian IDs de detalle_sorteo
+        (compactación en línea). Se ejecuta dentro de la transacción que movió
+        las filas; quien llama hace el commit.
+        """
+        sorteos = list(sorteos)
+        if not sorteos or not mapeo:
+            return
+
+        placeholders = ", ".join(["%s"] * len(sorteos))
+        cursor.execute(f"""
+            SELECT id_sorteo, orden FROM sorteo_preparacion
+            WHERE id_sorteo IN ({placeholders})
+            FOR UPDATE
+        """, tuple(sorteos))
+
+        for id_sorteo, orden in cursor.fetchall():
+            ids = _desempaquetar(bytes(orden))
+            nuevos = [mapeo.get(detalle_id, detalle_id) for detalle_id in ids]
+            if nuevos != ids:
+                cursor.execute(
+                    "UPDATE sorteo_preparacion SET orden = %s WHERE id_sorteo = %s",
+                    (_empaquetar(nuevos), id_sorteo)
+                )
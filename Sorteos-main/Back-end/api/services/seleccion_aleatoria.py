@@ -0,0 +1,146 @@
+import math
+import secrets
+from typing import List, Sequence
+
+from models.sorteo import EstadoParticipacion
+
+# Estados que pueden salir en una revelación (se excluyen ganador, eliminado y descalificado)
+ESTADOS_ELEGIBLES = (
+    EstadoParticipacion.PARTICIPANDO.value,
+    EstadoParticipacion.PERDEDOR.value,
+)
+
+# Generador criptográfico: los sorteos no deben ser predecibles
+_random = secrets.SystemRandom()
+
+# Parámetros del muestreo por rechazo
+MUESTRA_MINIMA = 16
+MUESTRA_MAXIMA = 5000
+RONDAS_MAXIMAS = 4
+
+
+class SelectorAleatorio:
+    """
+    Selección uniforme de participantes sin ORDER BY RAND().
+
+    Se sortean IDs al azar dentro del rango [MIN(id), MAX(id)] del sorteo y se
+    consultan solo esos IDs por clave primaria; los que no pertenecen al sorteo
+    o no están en un estado elegible se descartan. Como cada candidato es
+    uniforme sobre el rango y se aceptan en el orden en que salen, el resultado
+    es una muestra uniforme sin reemplazo de los participantes elegibles, y el
+    costo depende de la cantidad pedida y no del tamaño del sorteo.
+
+    Si tras varias rondas la densidad de elegibles en el rango es muy baja
+    (muchos ganadores/eliminados o IDs intercalados con otros sorteos), se
+    recurre a leer los IDs elegibles del índice y muestrear en memoria.
+    """
+
+    @staticmethod
+    def seleccionar_ids(connection, sorteo_id: int, cantidad: int, estados: Sequence[str] = ESTADOS_ELEGIBLES) -> List[int]:
+        """Retorna hasta `cantidad` IDs de detalle_sorteo elegidos al azar, en orden de sorteo"""
+        if cantidad <= 0:
+            return []
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT MIN(id), MAX(id) FROM detalle_sorteo WHERE id_sorteo = %s",
+                (sorteo_id,)
+            )
+            minimo, maximo = cursor.fetchone()
+            if minimo is None:
+                return []
+
+            rango = maximo - minimo + 1
+            estados_placeholders = ", ".join(["%s"] * len(estados))
+            elegidos = []
+            probados = set()
+            densidad = 1.0
+
+            for _ in range(RONDAS_MAXIMAS):
+                faltan = cantidad - len(elegidos)
+                libres = rango - len(probados)
+                if faltan <= 0 or libres <= 0:
+                    break
+
+                tamano = math.ceil(faltan / max(densidad, 0.01) * 1.25)
+                tamano = min(max(tamano, MUESTRA_MINIMA), MUESTRA_MAXIMA, libres)
+
+                if tamano * 2 > libres:
+                    # El rango restante es pequeño: mejor leer los elegibles directamente
+                    break
+
+                candidatos = []
+                while len(candidatos) < tamano:
+                    candidato = minimo + _random.randrange(rango)
+                    if candidato not in probados:
+                        probados.add(candidato)
+                        candidatos.append(candidato)
+
+                placeholders = ", ".join(["%s"] * len(candidatos))
+                cursor.execute(
+                    f"""
+                    SELECT id FROM detalle_sorteo
+                    WHERE id IN ({placeholders})
+                    AND id_sorteo = %s
+                    AND estado IN ({estados_placeholders})
+                    """,
+                    (*candidatos, sorteo_id, *estados)
+                )
+                validos = {fila[0] for fila in cursor.fetchall()}
+
+                for candidato in candidatos:
+                    if candidato in validos:
+                        elegidos.append(candidato)
+                        if len(elegidos) == cantidad:
+                            return elegidos
+
+                densidad = len(validos) / len(candidatos)
+
+            # Respaldo: leer los IDs elegibles restantes y muestrear en memoria
+            cursor.execute(
+                f"""
+                SELECT id FROM detalle_sorteo
+                WHERE id_sorteo = %s AND estado IN ({estados_placeholders})
+                """,
+                (sorteo_id, *estados)
+            )
+            ya_elegidos = set(elegidos)
+            restantes = [fila[0] for fila in cursor.fetchall() if fila[0] not in ya_elegidos]
+            faltan = min(cantidad - len(elegidos), len(restantes))
+            return elegidos + _random.sample(restantes, faltan)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def obtener_detalles(connection, ids: List[int]) -> List[dict]:
+        """Obtiene detalle_id, numero, documento y nombre de los IDs dados, respetando su orden"""
+        if not ids:
+            return []
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"""
+                SELECT ds.id as detalle_id,
+                       ds.numero,
+                       ds.documento_participante as documento,
+                       p.nombre
+                FROM detalle_sorteo ds
+                JOIN participantes p ON ds.documento_participante = p.documento
+                WHERE ds.id IN ({placeholders})
+                """,
+                tuple(ids)
+            )
+            por_id = {fila['detalle_id']: fila for fila in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+        detalles = []
+        for detalle_id in ids:
+            if detalle_id in por_id:
+                fila = por_id[detalle_id]
+                fila['row_num'] = len(detalles) + 1
+                detalles.append(fila)
+        return detalles
@@ -1,45 +1,56 @@
 import mysql.connector
 from datetime import datetime
 from typing import List, Optional, Tuple
-from config.database import DB_CONFIG
+from config.database import DatabaseConnection, BULK_CHUNK_SIZE
+from database import bulk, secuencias
+from database.streaming import ConsultaStreaming
+from database.unidad_trabajo import TransaccionPeticion
+from services import consultas
+from services.seleccion_aleatoria import SelectorAleatorio, ESTADOS_ELEGIBLES
+from services.preparacion_service import PreparacionService
+from services.contadores import ContadoresSorteo
+from services.cache_sorteos import CacheSorteos
+from services.eventos_sorteo import EventosSorteo, TIPO_ESTADO_PARTICIPANTE, TIPO_FINALIZADO
+from services.imagen_variantes import ImagenVariantes
+from services.almacen_imagenes import AlmacenImagenes
 from models.sorteo import Sorteo, SorteoResponse, DetalleSorteo, DetalleSorteoResponse, EstadoSorteo, EstadoParticipacion
 from models.participante import Participante, RegistroSorteoConParticipantesResponse
 import os
 import base64
-from fastapi import UploadFile
+from fastapi import UploadFile, HTTPException
 # Importación removida para evitar dependencia circular
 
 class SorteoService:
     
+    @staticmethod
+    def _insertar_sorteo(cursor, nombre: str, descripcion: str = None) -> int:
+        """Inserta un sorteo usando el cursor recibido (sin commit) y retorna su ID"""
+        if descripcion is None:
+            descripcion = f"Sorteo {nombre}"
+        
+        # Insertar con el menor ID liberado o el siguiente de la secuencia
+        query = """
+            INSERT INTO sorteo (id, nombre, descripcion, estado, fecha_creacion)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        
+        fecha_actual = datetime.now()
+        sorteo_id = secuencias.insertar_con_id_asignado(
+            cursor, query, (nombre, descripcion, EstadoSorteo.ACTIVO.value, fecha_actual)
+        )
+        
+        return sorteo_id
+    
     @staticmethod
     def crear_sorteo(nombre: str, descripcion: str = None) -> int:
         """Crea un nuevo sorteo y retorna su ID"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor()
             
-            if descripcion is None:
-                descripcion = f"Sorteo {nombre}"
-            
-            # Encontrar el menor ID disponible
-            cursor.execute("""
-                SELECT COALESCE(MIN(t1.id + 1), 1) as next_id
-                FROM sorteo t1
-                LEFT JOIN sorteo t2 ON t1.id + 1 = t2.id
-                WHERE t2.id IS NULL
-            """)
-            
-            result = cursor.fetchone()
-            sorteo_id = result[0] if result else 1
-            
-            # Insertar con el ID específico
-            query = """
-                INSERT INTO sorteo (id, nombre, descripcion, estado, fecha_creacion)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            
-            fecha_actual = datetime.now()
-            cursor.execute(query, (sorteo_id, nombre, descripcion, EstadoSorteo.ACTIVO.value, fecha_actual))
+            sorteo_id = SorteoService._insertar_sorteo(cursor, nombre, descripcion)
             
             connection.commit()
             
@@ -47,163 +58,85 @@ class SorteoService:
             
         except mysql.connector.Error as e:
             print(f"Error creando sorteo: {e}")
+            if connection:
+                connection.rollback()
             return 0
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     # Método eliminar_sorteo removido - solo se permite finalizar sorteos
     
     @staticmethod
-    def _compact_detalle_sorteo_ids():
+    def _reservar_numeros(cursor, sorteo_id: int, cantidad: int) -> int:
         """
-        Compacta los IDs de detalle_sorteo para que sean consecutivos desde 1,
-        eliminando gaps causados por eliminaciones.
+        Reserva `cantidad` números de participante consecutivos del contador del
+        sorteo y retorna el primero. El número es el que se muestra ("participante
+        #37"): se asigna una sola vez y no cambia aunque se eliminen otros
+        participantes, así los IDs de detalle_sorteo nunca necesitan compactarse.
+        La fila del sorteo queda bloqueada hasta el commit de quien llama.
         """
-        connection = None
-        cursor = None
-        
-        try:
-            connection = mysql.connector.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            
-            # Crear tabla temporal con IDs consecutivos
-            cursor.execute("""
-                CREATE TEMPORARY TABLE temp_detalle_sorteo AS
-                SELECT 
-                    ROW_NUMBER() OVER (ORDER BY id) as new_id,
-                    id as old_id,
-                    id_sorteo,
-                    documento_participante,
-                    estado,
-                    fecha_asignacion
-                FROM detalle_sorteo
-                ORDER BY id
-            """)
-            
-            # Deshabilitar verificación de claves foráneas temporalmente
-            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
-            
-            # Vaciar la tabla original
-            cursor.execute("DELETE FROM detalle_sorteo")
-            
-            # Resetear AUTO_INCREMENT a 1
-            cursor.execute("ALTER TABLE detalle_sorteo AUTO_INCREMENT = 1")
-            
-            # Insertar datos con nuevos IDs consecutivos
-            cursor.execute("""
-                INSERT INTO detalle_sorteo (id, id_sorteo, documento_participante, estado, fecha_asignacion)
-                SELECT new_id, id_sorteo, documento_participante, estado, fecha_asignacion
-                FROM temp_detalle_sorteo
-                ORDER BY new_id
-            """)
-            
-            # Obtener el nuevo máximo ID
-            cursor.execute("SELECT MAX(id) FROM detalle_sorteo")
-            max_id = cursor.fetchone()[0]
-            
-            if max_id is not None:
-                # Establecer AUTO_INCREMENT al siguiente valor
-                cursor.execute(f"ALTER TABLE detalle_sorteo AUTO_INCREMENT = {max_id + 1}")
-            
-            # Rehabilitar verificación de claves foráneas
-            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
-            
-            # Eliminar tabla temporal
-            cursor.execute("DROP TEMPORARY TABLE temp_detalle_sorteo")
-            
-            connection.commit()
-            
-            print(f"IDs de detalle_sorteo compactados. Nuevo AUTO_INCREMENT: {max_id + 1 if max_id else 1}")
-            
-        except mysql.connector.Error as e:
-            print(f"Error compactando IDs de detalle_sorteo: {e}")
-            if connection:
-                connection.rollback()
-                
-        finally:
-            if cursor:
-                cursor.close()
-            if connection and connection.is_connected():
-                connection.close()
-    
-    @staticmethod
-    def _participante_existe(documento: str) -> bool:
-        """Verifica si un participante existe en la base de datos"""
-        try:
-            connection = mysql.connector.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            
-            query = "SELECT documento FROM participantes WHERE documento = %s"
-            cursor.execute(query, (documento,))
-            
-            result = cursor.fetchone()
-            return result is not None
-            
-        except mysql.connector.Error as e:
-            print(f"Error verificando participante: {e}")
-            return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+        cursor.execute("""
+            UPDATE sorteo SET ultimo_numero = LAST_INSERT_ID(ultimo_numero + %s)
+            WHERE id = %s
+        """, (cantidad, sorteo_id))
+        cursor.execute("SELECT LAST_INSERT_ID()")
+        return cursor.fetchone()[0] - cantidad + 1
     
     @staticmethod
-    def _crear_participante(documento: str, nombre: str) -> bool:
-        """Crea un nuevo participante en la base de datos"""
-        try:
-            connection = mysql.connector.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            
-            query = """
-                INSERT INTO participantes (documento, nombre, fecha_registro)
-                VALUES (%s, %s, %s)
-            """
-            
-            fecha_actual = datetime.now()
-            cursor.execute(query, (documento, nombre, fecha_actual))
-            
-            connection.commit()
-            return True
-            
-        except mysql.connector.Error as e:
-            print(f"Error creando participante: {e}")
-            return False
-        finally:
-            if connection.is_connected():
+    def obtener_sorteo(sorteo_id: int, transaccion: Optional[TransaccionPeticion] = None) -> Optional[SorteoResponse]:
+        """
+        Obtiene un sorteo por su ID (desde la caché del proceso si está vigente).
+        
+        Dentro de una transacción de la petición lo lee de la base con la fila
+        bloqueada hasta el commit, para que siga existiendo (y en el mismo
+        estado) durante el resto del endpoint.
+        """
+        if transaccion is not None:
+            cursor = transaccion.connection.cursor(dictionary=True)
+            try:
+                cursor.execute("SELECT * FROM sorteo WHERE id = %s FOR UPDATE", (sorteo_id,))
+                result = cursor.fetchone()
+                return SorteoResponse(**result) if result else None
+            finally:
                 cursor.close()
-                connection.close()
+        return CacheSorteos.obtener(sorteo_id, SorteoService._cargar_sorteo)
     
     @staticmethod
-    def obtener_sorteo(sorteo_id: int) -> Optional[SorteoResponse]:
-        """Obtiene un sorteo por su ID"""
+    def _cargar_sorteo(sorteo_id: int):
+        """Lee un sorteo de la base de datos; retorna (firma de versión, SorteoResponse) o None"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
-            query = "SELECT * FROM sorteo WHERE id = %s"
-            cursor.execute(query, (sorteo_id,))
+            cursor.execute(*consultas.sorteo(sorteo_id))
             
             result = cursor.fetchone()
             
             if result:
-                return SorteoResponse(**result)
+                return CacheSorteos.firma(result), SorteoResponse(**result)
             return None
             
         except mysql.connector.Error as e:
             print(f"Error obteniendo sorteo: {e}")
             return None
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def asignar_participante_a_sorteo(sorteo_id: int, documento_participante: str) -> bool:
         """Asigna un participante a un sorteo"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor()
             
             # Verificar si ya existe la asignación
@@ -219,17 +152,20 @@ class SorteoService:
             
             # Crear nueva asignación
             query_insert = """
-                INSERT INTO detalle_sorteo (id_sorteo, documento_participante, estado, fecha_asignacion)
-                VALUES (%s, %s, %s, %s)
+                INSERT INTO detalle_sorteo (id_sorteo, documento_participante, estado, fecha_asignacion, numero)
+                VALUES (%s, %s, %s, %s, %s)
             """
             
             fecha_actual = datetime.now()
+            numero = SorteoService._reservar_numeros(cursor, sorteo_id, 1)
             cursor.execute(query_insert, (
                 sorteo_id, 
                 documento_participante, 
                 EstadoParticipacion.PARTICIPANDO.value, 
-                fecha_actual
+                fecha_actual,
+                numero
             ))
+            ContadoresSorteo.ajustar(cursor, sorteo_id, participantes=1, elegibles=1)
             
             connection.commit()
             return True
@@ -238,54 +174,65 @@ class SorteoService:
             print(f"Error asignando participante a sorteo: {e}")
             return False
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def crear_sorteo_con_participantes(nombre_sorteo: str, participantes: List[Participante], descripcion_sorteo: str = None) -> RegistroSorteoConParticipantesResponse:
-        """Crea un sorteo y asigna participantes. Retorna RegistroSorteoConParticipantesResponse"""
+        """
+        Crea un sorteo y asigna participantes. Retorna RegistroSorteoConParticipantesResponse.
+        
+        Todo se hace en una sola transacción: los participantes se deduplican en
+        memoria y se insertan por lotes (una consulta IN para detectar los que ya
+        existen, un INSERT de varias filas para los nuevos y otro para detalle_sorteo).
+        """
         errores = []
         participantes_registrados = 0
         participantes_existentes = 0
-        sorteo_id = 0
+        connection = None
+        cursor = None
+        
+        # Un documento repetido en la lista cuenta como existente y como asignación duplicada
+        unicos, duplicados = bulk.deduplicar_participantes(participantes)
         
         try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor()
+            
             # Crear el sorteo
-            sorteo_id = SorteoService.crear_sorteo(nombre_sorteo, descripcion_sorteo)
-            
-            if sorteo_id == 0:
-                errores.append("Error al crear el sorteo")
-                return RegistroSorteoConParticipantesResponse(
-                    sorteo_id=0,
-                    nombre_sorteo=nombre_sorteo,
-                    participantes_registrados=0,
-                    participantes_existentes=0,
-                    errores=errores,
-                    mensaje="Error al crear el sorteo"
+            sorteo_id = SorteoService._insertar_sorteo(cursor, nombre_sorteo, descripcion_sorteo)
+            fecha_actual = datetime.now()
+            numero = SorteoService._reservar_numeros(cursor, sorteo_id, len(unicos)) if unicos else 1
+            asignados = 0
+            
+            # Registrar participantes y asignarlos al sorteo por lotes
+            for lote in bulk.chunked(unicos, BULK_CHUNK_SIZE):
+                existentes = bulk.documentos_existentes(cursor, [p.documento for p in lote])
+                nuevos = [p for p in lote if p.documento not in existentes]
+                
+                insertados = bulk.insertar_participantes(cursor, nuevos, fecha_actual)
+                participantes_registrados += insertados
+                # Los que otro proceso insertó entre la consulta y el INSERT también ya existían
+                participantes_existentes += len(lote) - insertados
+                
+                asignados += bulk.insertar_filas(
+                    cursor,
+                    "INSERT IGNORE INTO detalle_sorteo (id_sorteo, documento_participante, estado, fecha_asignacion, numero) VALUES",
+                    [
+                        (sorteo_id, p.documento, EstadoParticipacion.PARTICIPANDO.value, fecha_actual, numero + i)
+                        for i, p in enumerate(lote)
+                    ]
                 )
+                numero += len(lote)
             
-            # Registrar participantes y asignarlos al sorteo
-            for participante in participantes:
-                try:
-                    # Verificar si el participante ya existe
-                    if SorteoService._participante_existe(participante.documento):
-                        participantes_existentes += 1
-                    else:
-                        # Crear el participante
-                        if SorteoService._crear_participante(participante.documento, participante.nombre):
-                            participantes_registrados += 1
-                        else:
-                            errores.append(f"Error creando participante {participante.documento}")
-                            continue
-                    
-                    # Asignar participante al sorteo
-                    asignacion_exitosa = SorteoService.asignar_participante_a_sorteo(sorteo_id, participante.documento)
-                    if not asignacion_exitosa:
-                        errores.append(f"Participante {participante.documento} ya está asignado al sorteo")
-                        
-                except Exception as e:
-                    errores.append(f"Error procesando participante {participante.documento}: {str(e)}")
+            ContadoresSorteo.ajustar(cursor, sorteo_id, participantes=asignados, elegibles=asignados)
+            connection.commit()
+            
+            for documento in duplicados:
+                participantes_existentes += 1
+                errores.append(f"Participante {documento} ya está asignado al sorteo")
             
             mensaje = f"Sorteo '{nombre_sorteo}' creado exitosamente. Participantes registrados: {participantes_registrados}, Ya existían: {participantes_existentes}"
             return RegistroSorteoConParticipantesResponse(
@@ -297,7 +244,10 @@ class SorteoService:
                 mensaje=mensaje
             )
             
-        except Exception as e:
+        except mysql.connector.Error as e:
+            print(f"Error creando sorteo con participantes: {e}")
+            if connection:
+                connection.rollback()
             errores.append(f"Error creando sorteo: {str(e)}")
             return RegistroSorteoConParticipantesResponse(
                 sorteo_id=0,
@@ -307,121 +257,216 @@ class SorteoService:
                 errores=errores,
                 mensaje="Error al crear sorteo con participantes"
             )
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
     
     @staticmethod
-    def obtener_participantes_sorteo(sorteo_id: int) -> List[DetalleSorteoResponse]:
-        """Obtiene todos los participantes de un sorteo"""
+    def obtener_participantes_sorteo(sorteo_id: int, despues_de: Optional[int] = None, limite: Optional[int] = None) -> List[DetalleSorteoResponse]:
+        """
+        Obtiene los participantes de un sorteo.
+        
+        Sin `limite` retorna todos, ordenados por fecha de asignación. Con `limite`
+        retorna una página ordenada por ID de detalle_sorteo, empezando después
+        de `despues_de` (paginación por clave sobre el índice (id_sorteo, id)).
+        """
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
-            query = """
-                SELECT ds.*, p.nombre as nombre_participante
-                FROM detalle_sorteo ds
-                JOIN participantes p ON ds.documento_participante = p.documento
-                WHERE ds.id_sorteo = %s
-                ORDER BY ds.fecha_asignacion
-            """
-            
-            cursor.execute(query, (sorteo_id,))
+            cursor.execute(*consultas.participantes_sorteo(sorteo_id, despues_de, limite))
             results = cursor.fetchall()
             
-            return [DetalleSorteoResponse(**result) for result in results]
+            return consultas.detalles(results)
             
         except mysql.connector.Error as e:
             print(f"Error obteniendo participantes del sorteo: {e}")
             return []
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
+    @staticmethod
+    def consultar_participantes_sorteo_streaming(sorteo_id: int, despues_de: Optional[int] = None, limite: Optional[int] = None) -> ConsultaStreaming:
+        """Abre una consulta en streaming de los participantes de un sorteo, ordenados por ID"""
+        query = """
+            SELECT ds.id, ds.numero, ds.documento_participante, p.nombre as nombre_participante,
+                   ds.estado, ds.fecha_asignacion, ds.fecha_ganador
+            FROM detalle_sorteo ds
+            JOIN participantes p ON ds.documento_participante = p.documento
+            WHERE ds.id_sorteo = %s AND ds.id > %s
+            ORDER BY ds.id
+        """
+        params = (sorteo_id, despues_de or 0)
+        if limite is not None:
+            query += " LIMIT %s"
+            params += (limite,)
+        return ConsultaStreaming(query, params)
+    
     @staticmethod
     def eliminar_participante_sorteo(sorteo_id: int, documento_participante: str) -> bool:
         """Elimina un participante de un sorteo"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor()
             
-            query = """
-                DELETE FROM detalle_sorteo 
+            if not ContadoresSorteo.bloquear(cursor, sorteo_id):
+                return False
+            
+            cursor.execute("""
+                SELECT id, estado FROM detalle_sorteo
                 WHERE id_sorteo = %s AND documento_participante = %s
-            """
+                FOR UPDATE
+            """, (sorteo_id, documento_participante))
+            detalle = cursor.fetchone()
+            if not detalle:
+                connection.commit()
+                return False
             
-            cursor.execute(query, (sorteo_id, documento_participante))
+            cursor.execute("DELETE FROM detalle_sorteo WHERE id = %s", (detalle[0],))
+            ContadoresSorteo.ajustar_baja(cursor, sorteo_id, detalle[1])
             connection.commit()
             
-            eliminado = cursor.rowcount > 0
-            
-            # Compactar IDs después de eliminar para mantener consecutividad
-            if eliminado:
-                SorteoService._compact_detalle_sorteo_ids()
-            
-            return eliminado
+            return True
             
         except mysql.connector.Error as e:
             print(f"Error eliminando participante del sorteo: {e}")
+            if connection:
+                connection.rollback()
             return False
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
-    def actualizar_estado_participante(sorteo_id: int, documento_participante: str, nuevo_estado: EstadoParticipacion) -> bool:
-        """Actualiza el estado de participación de un participante en un sorteo"""
+    def actualizar_estado_participante(sorteo_id: int, documento_participante: str, nuevo_estado: EstadoParticipacion,
+                                       transaccion: Optional[TransaccionPeticion] = None) -> bool:
+        """
+        Actualiza el estado de participación de un participante en un sorteo.
+        
+        Con `transaccion` trabaja sobre la conexión de la petición y deja el
+        commit a la petición; sin ella confirma su propia transacción.
+        """
+        # Declarar ganador debe respetar el cupo de premios
+        if nuevo_estado == EstadoParticipacion.GANADOR:
+            return SorteoService.marcar_participante_ganador(sorteo_id, documento_participante, transaccion)
+        
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = transaccion.connection if transaccion else DatabaseConnection.get_connection()
             cursor = connection.cursor()
             
-            query = """
-                UPDATE detalle_sorteo 
-                SET estado = %s
+            if not ContadoresSorteo.bloquear(cursor, sorteo_id):
+                return False
+            
+            cursor.execute("""
+                SELECT id, estado FROM detalle_sorteo
                 WHERE id_sorteo = %s AND documento_participante = %s
-            """
+                FOR UPDATE
+            """, (sorteo_id, documento_participante))
+            detalle = cursor.fetchone()
+            if not detalle:
+                if not transaccion:
+                    connection.commit()
+                return False
             
-            cursor.execute(query, (nuevo_estado.value, sorteo_id, documento_participante))
-            connection.commit()
+            cursor.execute(
+                "UPDATE detalle_sorteo SET estado = %s WHERE id = %s",
+                (nuevo_estado.value, detalle[0])
+            )
+            ContadoresSorteo.ajustar_cambio_estado(cursor, sorteo_id, detalle[1], nuevo_estado.value)
+            EventosSorteo.registrar(cursor, sorteo_id, TIPO_ESTADO_PARTICIPANTE, {
+                "id": detalle[0],
+                "documento_participante": documento_participante,
+                "estado": nuevo_estado.value
+            })
+            if transaccion:
+                transaccion.al_confirmar(EventosSorteo.notificar)
+            else:
+                connection.commit()
+                EventosSorteo.notificar()
             
-            return cursor.rowcount > 0
+            return True
             
         except mysql.connector.Error as e:
             print(f"Error actualizando estado del participante: {e}")
+            if connection and not transaccion:
+                connection.rollback()
             return False
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection and not transaccion:
                 connection.close()
     
+    @staticmethod
+    def _bloquear_cupo(connection, sorteo_id: int) -> Optional[dict]:
+        """
+        Bloquea la fila del sorteo (SELECT ... FOR UPDATE) y retorna su estado y cupo.
+        
+        Todas las operaciones que crean ganadores pasan por aquí, de modo que para un
+        mismo sorteo se serializan (sin exceder cantidad_premio) mientras sorteos
+        distintos siguen ejecutándose en paralelo. El bloqueo dura hasta el commit.
+        """
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT estado, cantidad_premio, ganadores_simultaneos,
+                       total_ganadores as ganadores_actuales
+                FROM sorteo
+                WHERE id = %s
+                FOR UPDATE
+            """, (sorteo_id,))
+            cupo = cursor.fetchone()
+            if not cupo:
+                return None
+            
+            cupo['cantidad_premio'] = cupo['cantidad_premio'] or 1  # Default a 1 si es None
+            cupo['ganadores_simultaneos'] = cupo['ganadores_simultaneos'] or 1
+            return cupo
+        finally:
+            cursor.close()
+    
     @staticmethod
     def realizar_sorteo(sorteo_id: int) -> Optional[str]:
         """Realiza el sorteo y selecciona un ganador aleatoriamente"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor()
             
-            # Verificar que el sorteo existe y está activo
-            cursor.execute("SELECT estado FROM sorteo WHERE id = %s", (sorteo_id,))
-            sorteo_result = cursor.fetchone()
+            # Verificar que el sorteo existe, está activo y le quedan premios
+            cupo = SorteoService._bloquear_cupo(connection, sorteo_id)
             
-            if not sorteo_result or sorteo_result[0] != EstadoSorteo.ACTIVO.value:
+            if not cupo or cupo['estado'] != EstadoSorteo.ACTIVO.value:
                 return None
             
-            # Obtener participantes activos
-            cursor.execute("""
-                SELECT documento_participante 
-                FROM detalle_sorteo 
-                WHERE id_sorteo = %s AND estado = %s
-                ORDER BY RAND() 
-                LIMIT 1
-            """, (sorteo_id, EstadoParticipacion.PARTICIPANDO.value))
+            if cupo['ganadores_actuales'] >= cupo['cantidad_premio']:
+                print(f"Límite de ganadores alcanzado: {cupo['ganadores_actuales']}/{cupo['cantidad_premio']}")
+                return None
             
-            ganador_result = cursor.fetchone()
+            # Seleccionar un participante activo al azar
+            ids = SelectorAleatorio.seleccionar_ids(
+                connection, sorteo_id, 1, (EstadoParticipacion.PARTICIPANDO.value,)
+            )
+            ganador_result = SelectorAleatorio.obtener_detalles(connection, ids)
             
             if not ganador_result:
                 return None
             
-            documento_ganador = ganador_result[0]
+            documento_ganador = ganador_result[0]['documento']
             fecha_actual = datetime.now()
             
             # Actualizar el ganador
@@ -430,11 +475,17 @@ class SorteoService:
                 SET estado = %s, fecha_ganador = %s
                 WHERE id_sorteo = %s AND documento_participante = %s
             """, (EstadoParticipacion.GANADOR.value, fecha_actual, sorteo_id, documento_ganador))
+            ContadoresSorteo.ajustar_cambio_estado(
+                cursor, sorteo_id, EstadoParticipacion.PARTICIPANDO.value, EstadoParticipacion.GANADOR.value,
+                cantidad=cursor.rowcount
+            )
+            EventosSorteo.registrar_ganadores(connection, cursor, sorteo_id, ids, fecha_actual)
             
             # No actualizar otros participantes como perdedores ni finalizar el sorteo automáticamente
             # El sorteo permanece activo para permitir múltiples ganadores
             
             connection.commit()
+            EventosSorteo.notificar()
             
             return documento_ganador
             
@@ -442,15 +493,18 @@ class SorteoService:
             print(f"Error realizando sorteo: {e}")
             return None
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def finalizar_sorteo(sorteo_id: int) -> bool:
         """Finaliza un sorteo cambiando su estado a FINALIZADO"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor()
             
             # Verificar que el sorteo existe (sin restricción de estado)
@@ -471,7 +525,7 @@ class SorteoService:
             # Actualizar el estado del sorteo a finalizado
             cursor.execute("""
                 UPDATE sorteo 
-                SET estado = %s, fecha_finalizacion = %s
+                SET estado = %s, fecha_finalizacion = %s, version = version + 1
                 WHERE id = %s
             """, (EstadoSorteo.FINALIZADO.value, fecha_actual, sorteo_id))
             
@@ -481,11 +535,11 @@ class SorteoService:
                 SET estado = %s
                 WHERE id_sorteo = %s AND estado = %s
             """, (EstadoParticipacion.PERDEDOR.value, sorteo_id, EstadoParticipacion.PARTICIPANDO.value))
+            EventosSorteo.registrar(cursor, sorteo_id, TIPO_FINALIZADO, {"fecha_finalizacion": fecha_actual})
             
             connection.commit()
-            
-            # Compactar IDs de detalle_sorteo después de finalizar
-            SorteoService._compact_detalle_sorteo_ids()
+            CacheSorteos.invalidar(sorteo_id)
+            EventosSorteo.notificar()
             
             return True
             
@@ -493,116 +547,99 @@ class SorteoService:
             print(f"Error finalizando sorteo: {e}")
             return False
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def obtener_ganador_sorteo(sorteo_id: int) -> Optional[DetalleSorteoResponse]:
         """Obtiene el ganador de un sorteo finalizado"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
-            query = """
-                SELECT ds.*, p.nombre as nombre_participante
-                FROM detalle_sorteo ds
-                JOIN participantes p ON ds.documento_participante = p.documento
-                WHERE ds.id_sorteo = %s AND ds.estado = %s
-            """
-            
-            cursor.execute(query, (sorteo_id, EstadoParticipacion.GANADOR.value))
-            result = cursor.fetchone()
-            
-            if result:
-                return DetalleSorteoResponse(**result)
-            return None
+            cursor.execute(*consultas.ganador_sorteo(sorteo_id))
+            return consultas.detalle(cursor.fetchone())
             
         except mysql.connector.Error as e:
             print(f"Error obteniendo ganador del sorteo: {e}")
             return None
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def obtener_ganadores_sorteo(sorteo_id: int) -> List[DetalleSorteoResponse]:
         """Obtiene todos los ganadores de un sorteo"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
-            query = """
-                SELECT ds.*, p.nombre as nombre_participante
-                FROM detalle_sorteo ds
-                JOIN participantes p ON ds.documento_participante = p.documento
-                WHERE ds.id_sorteo = %s AND ds.estado = %s
-                ORDER BY ds.fecha_ganador DESC
-            """
-            
-            cursor.execute(query, (sorteo_id, EstadoParticipacion.GANADOR.value))
-            results = cursor.fetchall()
-            
-            return [DetalleSorteoResponse(**result) for result in results]
+            cursor.execute(*consultas.ganadores_sorteo(sorteo_id))
+            return consultas.detalles(cursor.fetchall())
             
         except mysql.connector.Error as e:
             print(f"Error obteniendo ganadores del sorteo: {e}")
             return []
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def obtener_todos_los_sorteos():
         """Obtiene todos los sorteos con la cantidad de participantes"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
-            query = """
-                SELECT s.id, s.nombre, s.descripcion, s.estado, s.fecha_creacion, s.cantidad_premio, s.ganadores_simultaneos,
-                       COUNT(ds.id) as cantidad_participantes
-                FROM sorteo s
-                LEFT JOIN detalle_sorteo ds ON s.id = ds.id_sorteo
-                WHERE s.estado = 'activo'
-                GROUP BY s.id, s.nombre, s.descripcion, s.estado, s.fecha_creacion, s.cantidad_premio, s.ganadores_simultaneos
-                ORDER BY s.fecha_creacion DESC
-            """
-            
-            cursor.execute(query)
-            results = cursor.fetchall()
-            
-            from models.sorteo import SorteoListResponse
-            sorteos = []
-            for result in results:
-                sorteos.append(SorteoListResponse(**result))
-            
-            return sorteos
+            cursor.execute(*consultas.sorteos_activos())
+            return consultas.sorteos_lista(cursor.fetchall())
             
         except mysql.connector.Error as e:
             print(f"Error obteniendo sorteos: {e}")
             return []
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
+    @staticmethod
+    def _siguientes_participantes(connection, sorteo_id: int, cantidad: int) -> List[int]:
+        """
+        IDs de detalle_sorteo para la siguiente revelación: del orden precargado
+        si el sorteo fue preparado, o seleccionados en vivo si no lo fue (o se agotó)
+        """
+        ids = PreparacionService.tomar_siguientes(connection, sorteo_id, cantidad)
+        if ids is None:
+            ids = SelectorAleatorio.seleccionar_ids(connection, sorteo_id, cantidad)
+        return ids
+    
     @staticmethod
     def obtener_participante_aleatorio(sorteo_id: int) -> Optional[dict]:
         """Obtiene un participante aleatorio de un sorteo que no haya ganado"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
             # Primero verificar si ya se alcanzó el límite de ganadores
             cursor.execute("""
-                SELECT s.cantidad_premio, COUNT(ds.id) as ganadores_actuales
-                FROM sorteo s
-                LEFT JOIN detalle_sorteo ds ON s.id = ds.id_sorteo AND ds.estado = 'ganador'
-                WHERE s.id = %s
-                GROUP BY s.id, s.cantidad_premio
+                SELECT cantidad_premio, total_ganadores as ganadores_actuales
+                FROM sorteo
+                WHERE id = %s
             """, (sorteo_id,))
             
             limite_result = cursor.fetchone()
@@ -617,43 +654,16 @@ class SorteoService:
                 print(f"Límite de ganadores alcanzado: {ganadores_actuales}/{cantidad_premio}")
                 return None
             
-            # Obtener múltiples participantes aleatorios que no sean ganadores
-            # Primero, ver cuántos participantes disponibles hay
-            count_query = """
-                SELECT COUNT(*) as total
-                FROM detalle_sorteo ds
-                WHERE ds.id_sorteo = %s 
-                AND ds.estado != 'ganador'
-                AND ds.estado != 'eliminado'
-                AND ds.estado != 'descalificado'
-            """
-            cursor.execute(count_query, (sorteo_id,))
-            total_participantes = cursor.fetchone()['total']
+            # Obtener a la vez tantos participantes como premios queden
+            # (el selector devuelve menos si no hay suficientes elegibles)
+            limite = cantidad_premio - ganadores_actuales
+            ids = SorteoService._siguientes_participantes(connection, sorteo_id, limite)
+            results = SelectorAleatorio.obtener_detalles(connection, ids)
+            connection.commit()
             
-            if total_participantes == 0:
+            if not results:
                 print("No hay participantes disponibles para el sorteo")
                 return None
-                
-            # Asegurarse de no pedir más participantes de los disponibles
-            limite = min(cantidad_premio - ganadores_actuales, total_participantes)
-            
-            # Obtener múltiples ganadores a la vez
-            query = """
-                SELECT ds.id as detalle_id, 
-                       ds.documento_participante as documento, 
-                       p.nombre,
-                       @rownum := @rownum + 1 as row_num
-                FROM (SELECT @rownum := 0) r,
-                     detalle_sorteo ds
-                JOIN participantes p ON ds.documento_participante = p.documento
-                WHERE ds.id_sorteo = %s 
-                AND ds.estado NOT IN ('ganador', 'eliminado', 'descalificado')
-                ORDER BY RAND()
-                LIMIT %s
-            """
-            
-            cursor.execute(query, (sorteo_id, limite))
-            results = cursor.fetchall()
             
             # Si solo necesitamos un ganador, devolver el primero
             if len(results) == 1:
@@ -668,24 +678,25 @@ class SorteoService:
             print(f"Error obteniendo participante aleatorio: {e}")
             return None
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def obtener_multiples_participantes_aleatorios(sorteo_id: int, cantidad: int) -> List[dict]:
         """Obtiene múltiples participantes aleatorios únicos de un sorteo que no hayan ganado"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
             # Verificar límite de ganadores
             cursor.execute("""
-                SELECT s.cantidad_premio, COUNT(ds.id) as ganadores_actuales
-                FROM sorteo s
-                LEFT JOIN detalle_sorteo ds ON s.id = ds.id_sorteo AND ds.estado = 'ganador'
-                WHERE s.id = %s
-                GROUP BY s.id, s.cantidad_premio
+                SELECT cantidad_premio, total_ganadores as ganadores_actuales
+                FROM sorteo
+                WHERE id = %s
             """, (sorteo_id,))
             
             limite_result = cursor.fetchone()
@@ -705,22 +716,9 @@ class SorteoService:
             cantidad = min(cantidad, disponibles)
             
             # Obtener participantes aleatorios que no sean ganadores, eliminados o descalificados
-            query = """
-                SELECT ds.id as detalle_id, 
-                       ds.documento_participante as documento, 
-                       p.nombre,
-                       @rownum := @rownum + 1 as row_num
-                FROM (SELECT @rownum := 0) r,
-                     detalle_sorteo ds
-                JOIN participantes p ON ds.documento_participante = p.documento
-                WHERE ds.id_sorteo = %s 
-                AND ds.estado NOT IN ('ganador', 'eliminado', 'descalificado')
-                ORDER BY RAND()
-                LIMIT %s
-            """
-            
-            cursor.execute(query, (sorteo_id, cantidad))
-            resultados = cursor.fetchall()
+            ids = SorteoService._siguientes_participantes(connection, sorteo_id, cantidad)
+            resultados = SelectorAleatorio.obtener_detalles(connection, ids)
+            connection.commit()
             
             # Formatear resultados para mantener consistencia con el método existente
             participantes = []
@@ -737,28 +735,43 @@ class SorteoService:
             print(f"Error obteniendo múltiples participantes aleatorios: {e}")
             return []
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
-    def marcar_participante_ganador(sorteo_id: int, documento_participante: str) -> bool:
-        """Marca un participante como ganador en un sorteo"""
+    def marcar_participante_ganador(sorteo_id: int, documento_participante: str,
+                                    transaccion: Optional[TransaccionPeticion] = None) -> bool:
+        """
+        Marca un participante como ganador en un sorteo.
+        
+        El cupo se verifica con la fila del sorteo bloqueada; si ya no quedan premios
+        se lanza ValueError. Marcar de nuevo a quien ya es ganador (p.ej. una
+        solicitud reintentada) no cuenta como otro ganador y retorna True. Con
+        `transaccion` deja el commit a la petición.
+        """
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = transaccion.connection if transaccion else DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
             fecha_actual = datetime.now()
             print(f"Marcando ganador - Sorteo: {sorteo_id}, Documento: {documento_participante}, Fecha: {fecha_actual}")
             
+            cupo = SorteoService._bloquear_cupo(connection, sorteo_id)
+            if not cupo:
+                print(f"Error: Sorteo {sorteo_id} no encontrado")
+                return False
+            
             # Verificar que el participante existe en el sorteo
-            verify_query = """
+            cursor.execute("""
                 SELECT id, estado, fecha_ganador
                 FROM detalle_sorteo 
                 WHERE id_sorteo = %s AND documento_participante = %s
-            """
-            
-            cursor.execute(verify_query, (sorteo_id, documento_participante))
+                FOR UPDATE
+            """, (sorteo_id, documento_participante))
             participante = cursor.fetchone()
             
             if not participante:
@@ -767,28 +780,33 @@ class SorteoService:
             
             print(f"Participante encontrado - ID: {participante['id']}, Estado actual: {participante['estado']}, Fecha ganador actual: {participante['fecha_ganador']}")
             
+            if participante['estado'] == EstadoParticipacion.GANADOR.value:
+                print(f"El participante {documento_participante} ya era ganador")
+                return True
+            
+            if cupo['ganadores_actuales'] >= cupo['cantidad_premio']:
+                raise ValueError(
+                    f"Límite de ganadores alcanzado: {cupo['ganadores_actuales']}/{cupo['cantidad_premio']}"
+                )
+            
             # Actualizar el participante como ganador
-            update_query = """
+            cursor.execute("""
                 UPDATE detalle_sorteo 
                 SET estado = %s, fecha_ganador = %s
-                WHERE id_sorteo = %s AND documento_participante = %s
-            """
-            
-            cursor.execute(update_query, (EstadoParticipacion.GANADOR.value, fecha_actual, sorteo_id, documento_participante))
-            connection.commit()
+                WHERE id = %s
+            """, (EstadoParticipacion.GANADOR.value, fecha_actual, participante['id']))
+            actualizado = cursor.rowcount > 0
+            ContadoresSorteo.ajustar_cambio_estado(
+                cursor, sorteo_id, participante['estado'], EstadoParticipacion.GANADOR.value
+            )
+            EventosSorteo.registrar_ganadores(connection, cursor, sorteo_id, [participante['id']], fecha_actual)
+            if transaccion:
+                transaccion.al_confirmar(EventosSorteo.notificar)
+            else:
+                connection.commit()
+                EventosSorteo.notificar()
             
-            if cursor.rowcount > 0:
-                # Verificar que la actualización fue exitosa
-                cursor.execute(verify_query, (sorteo_id, documento_participante))
-                participante_actualizado = cursor.fetchone()
-                
-                print(f"Actualización exitosa - Estado: {participante_actualizado['estado']}, Fecha ganador: {participante_actualizado['fecha_ganador']}")
-                
-                # Validar que fecha_ganador no sea NULL
-                if participante_actualizado['fecha_ganador'] is None:
-                    print(f"ERROR CRÍTICO: fecha_ganador es NULL después de la actualización")
-                    return False
-                
+            if actualizado:
                 return True
             else:
                 print(f"Error: No se pudo actualizar el participante")
@@ -798,15 +816,89 @@ class SorteoService:
             print(f"Error marcando participante como ganador: {e}")
             return False
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection and not transaccion:
+                connection.close()
+    
+    @staticmethod
+    def sortear_ganadores(sorteo_id: int) -> Optional[List[DetalleSorteoResponse]]:
+        """
+        Sortea `ganadores_simultaneos` ganadores y los marca en una sola transacción.
+        
+        La fila del sorteo se bloquea (ver _bloquear_cupo) mientras se cuenta,
+        se sortea y se marca, así dos operadores no pueden superar cantidad_premio.
+        Retorna None si el sorteo no existe o no está activo, y una lista vacía si
+        ya no quedan premios o participantes disponibles.
+        """
+        connection = None
+        cursor = None
+        try:
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor(dictionary=True)
+            
+            cupo = SorteoService._bloquear_cupo(connection, sorteo_id)
+            
+            if not cupo or cupo['estado'] != EstadoSorteo.ACTIVO.value:
+                return None
+            
+            cantidad = min(cupo['ganadores_simultaneos'], cupo['cantidad_premio'] - cupo['ganadores_actuales'])
+            if cantidad <= 0:
+                print(f"Límite de ganadores alcanzado: {cupo['ganadores_actuales']}/{cupo['cantidad_premio']}")
+                return []
+            
+            ids = SorteoService._siguientes_participantes(connection, sorteo_id, cantidad)
+            if not ids:
+                connection.commit()
+                return []
+            
+            # Marcar todos los ganadores con un único UPDATE
+            fecha_actual = datetime.now()
+            placeholders = ", ".join(["%s"] * len(ids))
+            estados_placeholders = ", ".join(["%s"] * len(ESTADOS_ELEGIBLES))
+            cursor.execute(f"""
+                UPDATE detalle_sorteo
+                SET estado = %s, fecha_ganador = %s
+                WHERE id IN ({placeholders}) AND estado IN ({estados_placeholders})
+            """, (EstadoParticipacion.GANADOR.value, fecha_actual, *ids, *ESTADOS_ELEGIBLES))
+            # Todas las filas actualizadas eran elegibles
+            ContadoresSorteo.ajustar(cursor, sorteo_id, elegibles=-cursor.rowcount, ganadores=cursor.rowcount)
+            
+            cursor.execute(f"""
+                SELECT ds.*, p.nombre as nombre_participante
+                FROM detalle_sorteo ds
+                JOIN participantes p ON ds.documento_participante = p.documento
+                WHERE ds.id IN ({placeholders}) AND ds.estado = %s
+            """, (*ids, EstadoParticipacion.GANADOR.value))
+            por_id = {result['id']: result for result in cursor.fetchall()}
+            EventosSorteo.registrar_ganadores(
+                connection, cursor, sorteo_id, [detalle_id for detalle_id in ids if detalle_id in por_id], fecha_actual
+            )
+            
+            connection.commit()
+            EventosSorteo.notificar()
+            
+            # Conservar el orden en que salieron sorteados
+            return [DetalleSorteoResponse(**por_id[detalle_id]) for detalle_id in ids if detalle_id in por_id]
+            
+        except mysql.connector.Error as e:
+            print(f"Error sorteando ganadores: {e}")
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def actualizar_sorteo(sorteo_id: int, cantidad_premio: Optional[int] = None, ganadores_simultaneos: Optional[int] = None, imagen_fondo: Optional[str] = None, nombre: Optional[str] = None, descripcion: Optional[str] = None) -> Optional[SorteoResponse]:
         """Actualiza la configuración de un sorteo"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = DatabaseConnection.get_connection()
             cursor = connection.cursor(dictionary=True)
             
             # Construir la consulta de actualización dinámicamente
@@ -840,11 +932,13 @@ class SorteoService:
             # Agregar el ID del sorteo al final de los parámetros
             params.append(sorteo_id)
             
+            update_fields.append("version = version + 1")
             query = f"UPDATE sorteo SET {', '.join(update_fields)} WHERE id = %s"
             print(f"Ejecutando query: {query}")
             print(f"Con parámetros: {params}")
             cursor.execute(query, params)
             connection.commit()
+            CacheSorteos.invalidar(sorteo_id)
             
             print(f"Filas afectadas: {cursor.rowcount}")
             
@@ -868,102 +962,138 @@ class SorteoService:
             print(f"Parámetros: {params}")
             raise e
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
     def guardar_imagen_sorteo(sorteo_id: int, file: UploadFile) -> Optional[str]:
-        """Guarda una imagen para un sorteo"""
+        """
+        Guarda una imagen para un sorteo.
+        Lanza ImagenInvalidaError o ImagenDemasiadoGrandeError (ValueError) si la subida no es válida.
+        """
+        connection = None
+        cursor = None
         try:
-            # Crear directorio de imágenes si no existe
-            images_dir = "images/sorteos"
-            os.makedirs(images_dir, exist_ok=True)
-            
-            # Generar nombre de archivo único
-            file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-            filename = f"sorteo_{sorteo_id}.{file_extension}"
-            file_path = os.path.join(images_dir, filename)
-            
-            # Guardar archivo
-            with open(file_path, "wb") as buffer:
-                content = file.file.read()
-                buffer.write(content)
-            
-            # Actualizar la base de datos con la ruta de la imagen
-            connection = mysql.connector.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            
-            query = "UPDATE sorteo SET imagen = %s WHERE id = %s"
-            cursor.execute(query, (file_path, sorteo_id))
-            connection.commit()
+            # Copiar la subida a un temporal por bloques (con límite de tamaño y
+            # verificación del formato) antes de tocar el almacén o la base de datos
+            recibida = AlmacenImagenes.recibir(file.file)
+            file_path = None
+            referenciada = False
+            try:
+                connection = DatabaseConnection.get_connection()
+                cursor = connection.cursor()
+                
+                # Publicar y guardar la referencia con el blob bloqueado: otro
+                # proceso que libere la misma imagen espera al commit
+                with AlmacenImagenes.bloquear(cursor, recibida.ruta):
+                    cursor.execute("SELECT imagen FROM sorteo WHERE id = %s FOR UPDATE", (sorteo_id,))
+                    result = cursor.fetchone()
+                    if result is None:
+                        connection.rollback()
+                        return None
+                    imagen_anterior = result[0]
+                    
+                    file_path = recibida.publicar()
+                    query = "UPDATE sorteo SET imagen = %s, version = version + 1 WHERE id = %s"
+                    cursor.execute(query, (file_path, sorteo_id))
+                    connection.commit()
+                    referenciada = True
+                CacheSorteos.invalidar(sorteo_id)
+            except Exception:
+                # No dejar publicado un blob que ningún sorteo referencia
+                if file_path and not referenciada and cursor:
+                    try:
+                        connection.rollback()
+                        AlmacenImagenes.liberar(cursor, file_path)
+                    except Exception as e:
+                        print(f"Error liberando imagen sin referencia {file_path}: {e}")
+                raise
+            finally:
+                recibida.descartar()
+            
+            if imagen_anterior and imagen_anterior != file_path:
+                AlmacenImagenes.liberar(cursor, imagen_anterior)
+            
+            # Generar miniatura y tamaños reducidos en segundo plano
+            ImagenVariantes.programar(file_path)
             
             return file_path
             
+        except (HTTPException, ValueError):
+            raise
         except Exception as e:
             print(f"Error guardando imagen: {e}")
             return None
         finally:
-            if 'connection' in locals() and connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
     
     @staticmethod
-    def obtener_imagen_sorteo(sorteo_id: int) -> Optional[str]:
-        """Obtiene la imagen de un sorteo en formato base64"""
+    def obtener_ruta_imagen_sorteo(sorteo_id: int) -> Optional[str]:
+        """Obtiene la ruta en disco de la imagen de un sorteo, si existe"""
+        sorteo = SorteoService.obtener_sorteo(sorteo_id)
+        
+        if sorteo and sorteo.imagen and os.path.exists(sorteo.imagen):
+            return sorteo.imagen
+        
+        return None
+    
+    @staticmethod
+    def obtener_imagen_sorteo(sorteo_id: int, ancho: Optional[int] = None) -> Optional[str]:
+        """Obtiene la imagen de un sorteo en formato base64 (para clientes antiguos)"""
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
-            cursor = connection.cursor(dictionary=True)
+            ruta = SorteoService.obtener_ruta_imagen_sorteo(sorteo_id)
             
-            query = "SELECT imagen FROM sorteo WHERE id = %s"
-            cursor.execute(query, (sorteo_id,))
-            result = cursor.fetchone()
-            
-            if result and result['imagen'] and os.path.exists(result['imagen']):
-                with open(result['imagen'], "rb") as image_file:
+            if ruta:
+                ruta = ImagenVariantes.seleccionar(ruta, ancho)
+                with open(ruta, "rb") as image_file:
                     encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
                     return encoded_string
             
             return None
             
-        except Exception as e:
+        except OSError as e:
             print(f"Error obteniendo imagen: {e}")
             return None
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
     
     @staticmethod
     def eliminar_imagen_sorteo(sorteo_id: int) -> bool:
         """Elimina la imagen de un sorteo"""
+        connection = None
+        cursor = None
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
-            cursor = connection.cursor(dictionary=True)
+            connection = DatabaseConnection.get_connection()
+            cursor = connection.cursor()
             
             # Obtener la ruta de la imagen actual
-            query = "SELECT imagen FROM sorteo WHERE id = %s"
+            query = "SELECT imagen FROM sorteo WHERE id = %s FOR UPDATE"
             cursor.execute(query, (sorteo_id,))
             result = cursor.fetchone()
             
-            if result and result['imagen']:
-                # Eliminar archivo físico si existe
-                if os.path.exists(result['imagen']):
-                    os.remove(result['imagen'])
-                
-                # Actualizar base de datos
-                update_query = "UPDATE sorteo SET imagen = NULL WHERE id = %s"
+            if result and result[0]:
+                # Quitar la referencia; el archivo se borra solo si ningún otro sorteo lo usa
+                update_query = "UPDATE sorteo SET imagen = NULL, version = version + 1 WHERE id = %s"
                 cursor.execute(update_query, (sorteo_id,))
                 connection.commit()
+                CacheSorteos.invalidar(sorteo_id)
+                
+                AlmacenImagenes.liberar(cursor, result[0])
                 
                 return True
             
             return False
             
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error eliminando imagen: {e}")
             return False
         finally:
-            if connection.is_connected():
+            if cursor:
                 cursor.close()
+            if connection:
                 connection.close()
\ No newline at end of file
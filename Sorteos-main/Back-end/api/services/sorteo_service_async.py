@@ -0,0 +1,76 @@
+from typing import List, Optional
+
+from database.async_pool import AsyncDatabaseConnection
+from services.cache_sorteos import CacheSorteos
+from config.database import CACHE_SORTEOS_CONFIG
+from models.sorteo import SorteoResponse, SorteoListResponse, DetalleSorteoResponse
+from services import consultas
+
+
+class SorteoServiceAsync:
+    """
+    Versiones asíncronas de las lecturas de SorteoService que consultan las
+    pantallas del sorteo (datos del sorteo, participantes y ganadores). Las
+    escrituras siguen en SorteoService; desde código asíncrono se llaman con
+    database.async_pool.en_hilo. El SQL y el mapeo de filas son los mismos
+    que usa SorteoService (services.consultas).
+    """
+
+    @staticmethod
+    async def _verificar_cache():
+        """Verificación periódica de versiones de CacheSorteos, sin ocupar un hilo"""
+        firmas = CacheSorteos.reclamar_verificacion()
+        if not firmas:
+            return
+        query, params = CacheSorteos.consulta_versiones(firmas)
+        try:
+            filas = await AsyncDatabaseConnection.execute_query(query, params, fetch_all=True)
+            actuales = {fila["id"]: CacheSorteos.firma(fila) for fila in filas}
+        except Exception as e:
+            # Sin poder verificar, no se puede garantizar que algo siga vigente
+            print(f"Error verificando versiones de sorteos en caché: {e}")
+            actuales = {}
+        CacheSorteos.descartar_cambiados(firmas, actuales)
+
+    @staticmethod
+    async def obtener_sorteo(sorteo_id: int) -> Optional[SorteoResponse]:
+        """Obtiene un sorteo por su ID (desde la caché del proceso si está vigente)"""
+        if CACHE_SORTEOS_CONFIG["habilitada"]:
+            await SorteoServiceAsync._verificar_cache()
+            sorteo = CacheSorteos.consultar(sorteo_id)
+            if sorteo:
+                return sorteo
+
+        query, params = consultas.sorteo(sorteo_id)
+        result = await AsyncDatabaseConnection.execute_query(query, params, fetch_one=True)
+        if not result:
+            return None
+
+        sorteo = SorteoResponse(**result)
+        if CACHE_SORTEOS_CONFIG["habilitada"]:
+            CacheSorteos.guardar(sorteo_id, (CacheSorteos.firma(result), sorteo))
+        return sorteo
+
+    @staticmethod
+    async def obtener_participantes_sorteo(sorteo_id: int, despues_de: Optional[int] = None, limite: Optional[int] = None) -> List[DetalleSorteoResponse]:
+        """Obtiene los participantes de un sorteo (ver SorteoService.obtener_participantes_sorteo)"""
+        query, params = consultas.participantes_sorteo(sorteo_id, despues_de, limite)
+        return consultas.detalles(await AsyncDatabaseConnection.execute_query(query, params, fetch_all=True))
+
+    @staticmethod
+    async def obtener_ganador_sorteo(sorteo_id: int) -> Optional[DetalleSorteoResponse]:
+        """Obtiene el ganador de un sorteo finalizado"""
+        query, params = consultas.ganador_sorteo(sorteo_id)
+        return consultas.detalle(await AsyncDatabaseConnection.execute_query(query, params, fetch_one=True))
+
+    @staticmethod
+    async def obtener_ganadores_sorteo(sorteo_id: int) -> List[DetalleSorteoResponse]:
+        """Obtiene todos los ganadores de un sorteo"""
+        query, params = consultas.ganadores_sorteo(sorteo_id)
+        return consultas.detalles(await AsyncDatabaseConnection.execute_query(query, params, fetch_all=True))
+
+    @staticmethod
+    async def obtener_todos_los_sorteos() -> List[SorteoListResponse]:
+        """Obtiene todos los sorteos activos con sus contadores"""
+        query, params = consultas.sorteos_activos()
+        return consultas.sorteos_lista(await AsyncDatabaseConnection.execute_query(query, params, fetch_all=True))
@@ -0,0 +1,13 @@
+"""
+Configuración común de las pruebas unitarias.
+
+Las pruebas cubren las piezas que no necesitan MySQL; lo que toca la base de
+datos se reemplaza con conexiones falsas. Se ejecutan desde Back-end/api con
+`python -m pytest`.
+"""
+
+import os
+import sys
+
+# Los módulos de la API se importan como en main.py (config, database, services...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,153 @@
+import io
+import os
+
+import pytest
+
+from services import almacen_imagenes
+from services.almacen_imagenes import (
+    AlmacenImagenes,
+    BloqueoImagenError,
+    ImagenDemasiadoGrandeError,
+    ImagenInvalidaError,
+    detectar_extension,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+@pytest.fixture(autouse=True)
+def directorio_temporal(tmp_path, monkeypatch):
+    # El almacén usa rutas relativas al directorio de trabajo
+    monkeypatch.chdir(tmp_path)
+
+
+class CursorFalso:
+    """Cursor con GET_LOCK y el conteo de referencias de sorteo.imagen"""
+
+    def __init__(self, referencias=0, bloqueo=1):
+        self.referencias = referencias
+        self.bloqueo = bloqueo
+        self.ejecutadas = []
+
+    def execute(self, query, params=None):
+        self.ejecutadas.append(query.split("(")[0])
+        self._ultima = query
+
+    def fetchone(self):
+        if "GET_LOCK" in self._ultima:
+            return (self.bloqueo,)
+        if "COUNT" in self._ultima:
+            return (self.referencias,)
+        return (1,)
+
+
+@pytest.mark.parametrize("cabecera, extension", [
+    (b"\xff\xd8\xff\xe0" + b"\x00" * 8, "jpg"),
+    (PNG, "png"),
+    (b"GIF89a" + b"\x00" * 8, "gif"),
+    (b"GIF87a" + b"\x00" * 8, "gif"),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "webp"),
+    (b"<svg xmlns='http://www.w3.org/2000/svg'>", None),
+    (b"RIFF\x00\x00\x00\x00WAVEfmt ", None),
+    (b"", None),
+])
+def test_detecta_el_formato_por_su_contenido(cabecera, extension):
+    assert detectar_extension(cabecera) == extension
+
+
+def test_recibir_calcula_digest_y_ruta():
+    recibida = AlmacenImagenes.recibir(io.BytesIO(PNG))
+
+    assert recibida.extension == "png"
+    assert recibida.tamano == len(PNG)
+    assert recibida.ruta == AlmacenImagenes.ruta_blob(recibida.digest, "png")
+    assert AlmacenImagenes.es_blob(recibida.ruta)
+    with open(recibida.temporal, "rb") as archivo:
+        assert archivo.read() == PNG
+
+
+def test_recibir_rechaza_lo_que_no_es_imagen():
+    with pytest.raises(ImagenInvalidaError):
+        AlmacenImagenes.recibir(io.BytesIO(b"%PDF-1.7 no es una imagen"))
+    assert os.listdir(os.path.join(almacen_imagenes.DIRECTORIO_BLOBS, "tmp")) == []
+
+
+def test_recibir_rechaza_archivos_vacios():
+    with pytest.raises(ImagenInvalidaError):
+        AlmacenImagenes.recibir(io.BytesIO(b""))
+
+
+def test_recibir_corta_al_superar_el_limite(monkeypatch):
+    monkeypatch.setattr(almacen_imagenes, "TAMANO_BLOQUE", 16)
+    leidos = []
+
+    class Origen(io.BytesIO):
+        def read(self, tamano=-1):
+            bloque = super().read(tamano)
+            leidos.append(len(bloque))
+            return bloque
+
+    with pytest.raises(ImagenDemasiadoGrandeError):
+        AlmacenImagenes.recibir(Origen(PNG + b"\x00" * 1000), tamano_maximo=64)
+
+    # No sigue leyendo después de pasar el límite
+    assert sum(leidos) <= 64 + 16
+    assert os.listdir(os.path.join(almacen_imagenes.DIRECTORIO_BLOBS, "tmp")) == []
+
+
+def test_misma_imagen_mismo_blob():
+    primera = AlmacenImagenes.recibir(io.BytesIO(PNG))
+    segunda = AlmacenImagenes.recibir(io.BytesIO(PNG))
+    try:
+        assert primera.publicar() == segunda.publicar()
+    finally:
+        primera.descartar()
+        segunda.descartar()
+    assert os.path.exists(primera.ruta)
+    assert not os.path.exists(primera.temporal)
+
+
+def test_liberar_con_referencias_no_borra():
+    recibida = AlmacenImagenes.recibir(io.BytesIO(PNG))
+    ruta = recibida.publicar()
+    recibida.descartar()
+    cursor = CursorFalso(referencias=1)
+
+    assert not AlmacenImagenes.liberar(cursor, ruta)
+    assert os.path.exists(ruta)
+    assert cursor.ejecutadas == ["SELECT GET_LOCK", "SELECT COUNT", "SELECT RELEASE_LOCK"]
+
+
+def test_liberar_sin_referencias_borra_con_el_blob_bloqueado():
+    recibida = AlmacenImagenes.recibir(io.BytesIO(PNG))
+    ruta = recibida.publicar()
+    recibida.descartar()
+    cursor = CursorFalso(referencias=0)
+
+    assert AlmacenImagenes.liberar(cursor, ruta)
+    assert not os.path.exists(ruta)
+    assert cursor.ejecutadas == ["SELECT GET_LOCK", "SELECT COUNT", "SELECT RELEASE_LOCK"]
+
+
+def test_liberar_sin_bloqueo_falla_sin_borrar():
+    recibida = AlmacenImagenes.recibir(io.BytesIO(PNG))
+    ruta = recibida.publicar()
+    recibida.descartar()
+
+    with pytest.raises(BloqueoImagenError):
+        AlmacenImagenes.liberar(CursorFalso(referencias=0, bloqueo=0), ruta)
+    assert os.path.exists(ruta)
+
+
+def test_nombre_de_bloqueo_cabe_en_mysql():
+    blob = AlmacenImagenes.ruta_blob("ab" * 32, "png")
+
+    assert AlmacenImagenes.nombre_bloqueo(blob) == f"blob:{('ab' * 32)[:40]}"
+    assert len(AlmacenImagenes.nombre_bloqueo("images/sorteos/antigua.jpg")) <= 64
+
+
+def test_etag_de_blobs_y_variantes():
+    digest = "cd" * 32
+    assert AlmacenImagenes.etag(AlmacenImagenes.ruta_blob(digest, "jpg")) == f'"{digest}"'
+    assert AlmacenImagenes.etag(f"images/sorteos/variantes/{digest}/thumb.webp") == f'"{digest}-thumb.webp"'
+    assert AlmacenImagenes.etag("images/sorteos/sorteo_1.jpg") is None
@@ -0,0 +1,74 @@
+from database import bulk
+from models.participante import Participante
+
+
+class CursorFalso:
+    def __init__(self, filas=()):
+        self.ejecutadas = []
+        self.rowcount = 0
+        self._filas = list(filas)
+
+    def execute(self, query, params=None):
+        self.ejecutadas.append((query, params))
+        self.rowcount = len(params) if params else 0
+
+    def fetchall(self):
+        return self._filas
+
+
+def test_chunked_divide_en_lotes():
+    assert list(bulk.chunked([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+
+
+def test_chunked_exacto_y_vacio():
+    assert list(bulk.chunked(list(range(4)), 2)) == [[0, 1], [2, 3]]
+    assert list(bulk.chunked([], 3)) == []
+
+
+def test_chunked_acepta_rangos():
+    assert [list(lote) for lote in bulk.chunked(range(5), 3)] == [[0, 1, 2], [3, 4]]
+
+
+def test_deduplicar_conserva_la_primera_aparicion():
+    participantes = [
+        Participante(documento="1", nombre="Ana"),
+        Participante(documento="2", nombre="Luis"),
+        Participante(documento="1", nombre="Otra Ana"),
+        Participante(documento="1", nombre="Tercera"),
+    ]
+
+    unicos, duplicados = bulk.deduplicar_participantes(participantes)
+
+    assert [(p.documento, p.nombre) for p in unicos] == [("1", "Ana"), ("2", "Luis")]
+    assert duplicados == ["1", "1"]
+
+
+def test_deduplicar_sin_repetidos():
+    participantes = [Participante(documento=str(n), nombre=f"P{n}") for n in range(3)]
+
+    unicos, duplicados = bulk.deduplicar_participantes(participantes)
+
+    assert unicos == participantes
+    assert duplicados == []
+
+
+def test_insertar_filas_una_sola_sentencia():
+    cursor = CursorFalso()
+
+    insertadas = bulk.insertar_filas(cursor, "INSERT INTO t (a, b) VALUES", [(1, "x"), (2, "y")])
+
+    assert insertadas == 4
+    assert cursor.ejecutadas == [("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)", [1, "x", 2, "y"])]
+
+
+def test_insertar_filas_vacio_no_ejecuta():
+    cursor = CursorFalso()
+
+    assert bulk.insertar_filas(cursor, "INSERT INTO t (a) VALUES", []) == 0
+    assert cursor.ejecutadas == []
+
+
+def test_documentos_existentes_acepta_tuplas_y_diccionarios():
+    assert bulk.documentos_existentes(CursorFalso([("1",)]), ["1", "2"]) == {"1"}
+    assert bulk.documentos_existentes(CursorFalso([{"documento": "2"}]), ["1", "2"]) == {"2"}
+    assert bulk.documentos_existentes(CursorFalso(), []) == set()
@@ -0,0 +1,101 @@
+import pytest
+
+from services import compactacion_service
+from services.compactacion_service import CompactacionService
+
+
+class ConexionFalsa:
+    """detalle_sorteo en memoria: {id: id_sorteo}, con los sorteos activos aparte"""
+
+    def __init__(self, filas, activos=()):
+        self.filas = dict(filas)
+        self.activos = set(activos)
+        self.commits = 0
+        self._resultado = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=None):
+        query = " ".join(query.split())
+        if query.startswith("SELECT GET_LOCK") or query.startswith("SELECT RELEASE_LOCK"):
+            self._resultado = [(1,)]
+        elif query == "SELECT MIN(id) FROM detalle_sorteo":
+            self._resultado = [(min(self.filas, default=None),)]
+        elif query.startswith("SELECT a.id + 1"):
+            self._resultado = [(min(i + 1 for i in self.filas if i + 1 not in self.filas),)]
+        elif query.startswith("SELECT COUNT(*)"):
+            self._resultado = [(sum(1 for i, s in self.filas.items() if i > params[0] and s not in self.activos),)]
+        elif query.startswith("SELECT id, id_sorteo FROM detalle_sorteo"):
+            desde, limite = params
+            self._resultado = sorted((i, s) for i, s in self.filas.items() if i > desde)[:limite]
+        elif query.startswith("SELECT id FROM sorteo"):
+            self._resultado = [(s,) for s in params[:-1] if s in self.activos]
+        elif query.startswith("UPDATE detalle_sorteo SET id"):
+            nuevo, actual = params
+            assert nuevo not in self.filas, f"el ID {nuevo} está ocupado"
+            self.filas[nuevo] = self.filas.pop(actual)
+        elif query.startswith("ALTER TABLE"):
+            pass
+        else:
+            raise AssertionError(f"consulta inesperada: {query}")
+
+    def fetchone(self):
+        return self._resultado[0] if self._resultado else None
+
+    def fetchall(self):
+        return list(self._resultado)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def remapeos(monkeypatch):
+    llamadas = []
+
+    def remapear(cursor, sorteos, mapeo):
+        llamadas.append(dict(mapeo))
+
+    monkeypatch.setattr(compactacion_service.PreparacionService, "remapear_ids", staticmethod(remapear))
+    monkeypatch.setattr(compactacion_service.EventosSorteo, "remapear_ids", staticmethod(lambda *a: None))
+    return llamadas
+
+
+def compactar(monkeypatch, conexion, tamano_lote):
+    monkeypatch.setattr(compactacion_service.DatabaseConnection, "get_connection", staticmethod(lambda: conexion))
+    return CompactacionService.compactar_en_linea(tamano_lote=tamano_lote, pausa_ms=0)
+
+
+def test_compacta_sin_sorteos_activos(monkeypatch, remapeos):
+    conexion = ConexionFalsa({1: 10, 4: 10, 5: 11, 9: 11})
+
+    progreso = compactar(monkeypatch, conexion, tamano_lote=2)
+
+    assert progreso.estado == "completada"
+    assert progreso.movidas == 3
+    assert conexion.filas == {1: 10, 2: 10, 3: 11, 4: 11}
+    assert remapeos == [{4: 2, 5: 3}, {9: 4}]
+
+
+@pytest.mark.parametrize("tamano_lote", [1, 2, 3, 100])
+def test_las_filas_de_sorteos_activos_quedan_en_su_lugar(monkeypatch, remapeos, tamano_lote):
+    # El sorteo 20 está activo: sus filas 3, 4 y 8 no se mueven y los demás IDs las saltan
+    conexion = ConexionFalsa({1: 10, 3: 20, 4: 20, 6: 10, 7: 11, 8: 20, 12: 11, 15: 10}, activos={20})
+
+    progreso = compactar(monkeypatch, conexion, tamano_lote)
+
+    assert progreso.estado == "completada"
+    assert conexion.filas == {1: 10, 2: 10, 3: 20, 4: 20, 5: 11, 6: 11, 7: 10, 8: 20}
+    assert progreso.movidas == 4
+    movidas = {}
+    for mapeo in remapeos:
+        movidas.update(mapeo)
+    assert movidas == {6: 2, 7: 5, 12: 6, 15: 7}
+
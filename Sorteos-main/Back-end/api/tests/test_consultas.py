@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from services import sorteo_service, sorteo_service_async, participante_service
+from services.participante_service import ParticipanteService
+from services.participante_service_async import ParticipanteServiceAsync
+from services.sorteo_service import SorteoService
+from services.sorteo_service_async import SorteoServiceAsync
+from database.async_pool import AsyncDatabaseConnection
+
+
+class ConexionFalsa:
+    """Registra las consultas y no retorna filas"""
+
+    def __init__(self, ejecutadas):
+        self.ejecutadas = ejecutadas
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, query, params=None):
+        self.ejecutadas.append((" ".join(query.split()), tuple(params or ())))
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def consultas(monkeypatch):
+    sincronas = []
+    asincronas = []
+
+    async def execute_query(query, params=None, fetch_one=False, fetch_all=False):
+        asincronas.append((" ".join(query.split()), tuple(params or ())))
+        return None if fetch_one else []
+
+    conexion = staticmethod(lambda *a, **k: ConexionFalsa(sincronas))
+    monkeypatch.setattr(sorteo_service.DatabaseConnection, "get_connection", conexion)
+    monkeypatch.setattr(participante_service.DatabaseConnection, "get_connection", conexion)
+    monkeypatch.setattr(AsyncDatabaseConnection, "execute_query", staticmethod(execute_query))
+    monkeypatch.setitem(sorteo_service_async.CACHE_SORTEOS_CONFIG, "habilitada", False)
+    return sincronas, asincronas
+
+
+@pytest.mark.parametrize("nombre, args", [
+    ("obtener_participantes_sorteo", (3,)),
+    ("obtener_participantes_sorteo", (3, 40, 100)),
+    ("obtener_ganador_sorteo", (3,)),
+    ("obtener_ganadores_sorteo", (3,)),
+    ("obtener_todos_los_sorteos", ()),
+])
+def test_sorteos_mismo_sql_en_los_dos_caminos(consultas, nombre, args):
+    sincronas, asincronas = consultas
+
+    getattr(SorteoService, nombre)(*args)
+    asyncio.run(getattr(SorteoServiceAsync, nombre)(*args))
+
+    assert sincronas == asincronas != []
+
+
+def test_sorteo_mismo_sql_en_los_dos_caminos(consultas):
+    sincronas, asincronas = consultas
+
+    SorteoService._cargar_sorteo(3)
+    asyncio.run(SorteoServiceAsync.obtener_sorteo(3))
+
+    assert sincronas == asincronas != []
+
+
+@pytest.mark.parametrize("args", [(), ("123", 50)])
+def test_participantes_mismo_sql_en_los_dos_caminos(consultas, args):
+    sincronas, asincronas = consultas
+
+    ParticipanteService.obtener_todos_participantes(*args)
+    asyncio.run(ParticipanteServiceAsync.obtener_todos_participantes(*args))
+
+    assert sincronas == asincronas != []
+
+
+def test_ganador_limita_a_una_fila(consultas):
+    _, asincronas = consultas
+
+    asyncio.run(SorteoServiceAsync.obtener_ganador_sorteo(3))
+
+    assert asincronas[0][0].endswith("ORDER BY ds.fecha_ganador DESC LIMIT 1")
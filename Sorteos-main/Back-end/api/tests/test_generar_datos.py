@@ -0,0 +1,132 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import generar_datos
+from database import bulk
+from models.sorteo import EstadoParticipacion
+
+
+@pytest.fixture(autouse=True)
+def semilla():
+    random.seed(1234)
+
+
+@pytest.mark.parametrize("total, habituales, cantidad, solapamiento", [
+    (1000, 100, 200, 0.5),
+    # Pocos no habituales: se completa con habituales
+    (100, 10, 95, 0.05),
+    (100, 10, 100, 0.0),
+    # Más habituales pedidos que los que hay
+    (1000, 10, 50, 0.9),
+    # Más que el total
+    (50, 5, 80, 0.5),
+])
+def test_elegir_participantes_retorna_la_cantidad_pedida(total, habituales, cantidad, solapamiento):
+    indices = generar_datos.elegir_participantes(total, habituales, cantidad, solapamiento)
+
+    assert len(indices) == min(cantidad, total)
+    assert len(set(indices)) == len(indices)
+    assert all(0 <= indice < total for indice in indices)
+
+
+def test_elegir_participantes_respeta_el_solapamiento():
+    indices = generar_datos.elegir_participantes(10_000, 1_000, 2_000, 0.25)
+
+    assert sum(1 for indice in indices if indice < 1_000) == 500
+
+
+@pytest.mark.parametrize("tipo", ["finalizado", "en_curso", "nuevo"])
+def test_planear_estados_cuadra_con_la_cantidad(tipo):
+    estados = generar_datos.planear_estados(500, tipo, premio=10)
+
+    assert len(estados) == 500
+    ganadores = estados.count(EstadoParticipacion.GANADOR.value)
+    bajas = sum(1 for estado in estados if estado in (
+        EstadoParticipacion.ELIMINADO.value, EstadoParticipacion.DESCALIFICADO.value
+    ))
+    assert bajas == 5
+    if tipo == "finalizado":
+        assert ganadores == 10
+        assert estados.count(EstadoParticipacion.PERDEDOR.value) == 500 - 10 - 5
+    elif tipo == "en_curso":
+        assert 1 <= ganadores <= 10
+        assert EstadoParticipacion.PERDEDOR.value not in estados
+    else:
+        assert ganadores == 0
+
+
+def test_planear_estados_con_mas_premios_que_participantes():
+    estados = generar_datos.planear_estados(3, "finalizado", premio=50)
+
+    assert estados == [EstadoParticipacion.GANADOR.value] * 3
+
+
+def test_detalles_uno_por_indice_con_numero_consecutivo():
+    creacion = datetime(2024, 1, 1)
+    fin = creacion + timedelta(days=2)
+    indices = [7, 3, 9]
+    estados = generar_datos.planear_estados(3, "finalizado", premio=1)
+
+    filas = list(generar_datos.generar_detalles(5, "gen", indices, estados, creacion, fin))
+
+    assert [fila[1] for fila in filas] == [1, 2, 3]
+    assert [fila[2] for fila in filas] == ["gen_000000007", "gen_000000003", "gen_000000009"]
+
+
+def test_documentos_generados_tienen_separador():
+    assert generar_datos.documento("gen", 42) == "gen_000000042"
+
+
+def test_patron_prefijo_escapa_comodines():
+    assert bulk.patron_prefijo("gen_") == "gen\\_%"
+    assert bulk.patron_prefijo("100%") == "100\\%%"
+    assert bulk.patron_prefijo("a\\b") == "a\\\\b%"
+
+
+class ConexionFalsa:
+    def __init__(self):
+        self.ejecutadas = []
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=None):
+        self.ejecutadas.append((" ".join(query.split()), params))
+        self.rowcount = len(params) if "IN (" in query else 0
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_limpiar_borra_solo_lo_registrado(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(generar_datos, "LOTE_BORRADO_DOCUMENTOS", 2)
+    conexion = ConexionFalsa()
+    monkeypatch.setattr(generar_datos.mysql.connector, "connect", lambda **_: conexion)
+    generar_datos.guardar_manifiesto("gen", 3, [41, 42])
+
+    assert generar_datos.limpiar("gen")
+
+    assert ("DELETE FROM sorteo WHERE id = %s", (41,)) in conexion.ejecutadas
+    assert ("DELETE FROM sorteo WHERE id = %s", (42,)) in conexion.ejecutadas
+    documentos = [params for query, params in conexion.ejecutadas if query.startswith("DELETE FROM participantes")]
+    assert documentos == [["gen_000000000", "gen_000000001"], ["gen_000000002"]]
+    assert not any("LIKE" in query for query, _ in conexion.ejecutadas)
+    assert not (tmp_path / generar_datos.ruta_manifiesto("gen")).exists()
+
+
+def test_limpiar_sin_manifiesto_no_borra_nada(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def conectar(**_):
+        raise AssertionError("no debe conectarse")
+
+    monkeypatch.setattr(generar_datos.mysql.connector, "connect", conectar)
+
+    assert not generar_datos.limpiar("gen")
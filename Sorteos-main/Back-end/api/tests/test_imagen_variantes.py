@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from services.imagen_variantes import ImagenVariantes
+
+
+@pytest.fixture(autouse=True)
+def directorio_temporal(tmp_path, monkeypatch):
+    # Las rutas de imágenes y variantes son relativas al directorio de trabajo
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def programadas(monkeypatch):
+    programadas = []
+    monkeypatch.setattr(ImagenVariantes, "programar", staticmethod(programadas.append))
+    return programadas
+
+
+@pytest.fixture
+def imagen_grande():
+    Image.new("RGB", (2400, 1200), "red").save("fondo.jpg")
+    ImagenVariantes.generar("fondo.jpg")
+    return "fondo.jpg"
+
+
+def test_sin_ancho_ni_webp_sirve_el_original(imagen_grande):
+    assert ImagenVariantes.seleccionar(imagen_grande) == imagen_grande
+
+
+def test_sin_ancho_con_webp_no_reduce(imagen_grande):
+    ruta = ImagenVariantes.seleccionar(imagen_grande, webp=True)
+
+    assert ruta.endswith("original.webp")
+    with Image.open(ruta) as imagen:
+        assert imagen.size == (2400, 1200)
+
+
+def test_ancho_elige_la_menor_variante_que_alcanza(imagen_grande):
+    assert ImagenVariantes.seleccionar(imagen_grande, 300).endswith("thumb.jpg")
+    assert ImagenVariantes.seleccionar(imagen_grande, 321).endswith("720p.jpg")
+    assert ImagenVariantes.seleccionar(imagen_grande, 1280, webp=True).endswith("720p.webp")
+
+
+def test_ancho_mayor_que_las_variantes(imagen_grande):
+    assert ImagenVariantes.seleccionar(imagen_grande, 2000) == imagen_grande
+    assert ImagenVariantes.seleccionar(imagen_grande, 2000, webp=True).endswith("original.webp")
+
+
+def test_nunca_agranda_imagenes_pequenas():
+    Image.new("RGB", (500, 250), "blue").save("chica.jpg")
+
+    manifiesto = ImagenVariantes.generar("chica.jpg")
+
+    assert list(manifiesto["variantes"]) == ["thumb"]
+    assert ImagenVariantes.seleccionar("chica.jpg", 400) == "chica.jpg"
+
+
+def test_sin_variantes_sirve_el_original_y_las_programa(programadas):
+    Image.new("RGB", (2400, 1200), "red").save("nueva.jpg")
+
+    assert ImagenVariantes.seleccionar("nueva.jpg", 320, webp=True) == "nueva.jpg"
+    assert programadas == ["nueva.jpg"]
+
+
+def test_original_reemplazado_vence_las_variantes(imagen_grande, programadas):
+    Image.new("RGB", (1000, 500), "green").save(imagen_grande)
+    os.utime(imagen_grande, ns=(1, 1))
+
+    assert ImagenVariantes.seleccionar(imagen_grande, 320) == imagen_grande
+    assert programadas == [imagen_grande]
@@ -0,0 +1,132 @@
+import pytest
+
+from database import instrumentacion
+from database.instrumentacion import (
+    CursorMedido,
+    MedicionSolicitud,
+    PresupuestoConsultasExcedido,
+    redactar_sql,
+)
+
+
+class CursorFalso:
+    def __init__(self, filas=()):
+        self._filas = list(filas)
+        self.cerrado = False
+
+    def execute(self, operation, params=None):
+        pass
+
+    def fetchone(self):
+        return self._filas.pop(0) if self._filas else None
+
+    def fetchall(self):
+        filas, self._filas = self._filas, []
+        return filas
+
+    def fetchmany(self, size=1):
+        filas, self._filas = self._filas[:size], self._filas[size:]
+        return filas
+
+    def close(self):
+        self.cerrado = True
+
+
+@pytest.mark.parametrize("sql, esperado", [
+    ("SELECT * FROM participantes WHERE documento = '123'", "SELECT * FROM participantes WHERE documento = ?"),
+    ("SELECT * FROM t WHERE id = 15 AND monto > 3.5", "SELECT * FROM t WHERE id = ? AND monto > ?"),
+    ("SELECT 'x''y', 'a\\'b'", "SELECT ?, ?"),
+    ("SELECT *\n  FROM   t\n WHERE id = %s", "SELECT * FROM t WHERE id = %s"),
+    (b"SELECT 'secreto'", "SELECT ?"),
+    # Los números dentro de identificadores no se tocan
+    ("SELECT col1 FROM tabla2", "SELECT col1 FROM tabla2"),
+])
+def test_redactar_sql_quita_literales(sql, esperado):
+    assert redactar_sql(sql) == esperado
+
+
+def test_redactar_sql_recorta_sentencias_largas():
+    redactada = redactar_sql("SELECT " + ", ".join(f"col{n}" for n in range(200)))
+
+    assert len(redactada) == instrumentacion.LARGO_MAXIMO_SQL + 3
+    assert redactada.endswith("...")
+
+
+def test_cursor_medido_cuenta_sentencias_y_filas():
+    medicion = MedicionSolicitud()
+    cursor = CursorMedido(CursorFalso([(1,), (2,), (3,), (4,)]), medicion)
+
+    cursor.execute("SELECT id FROM t WHERE x = %s", (1,))
+    cursor.fetchone()
+    cursor.fetchmany(2)
+    cursor.fetchall()
+
+    assert medicion.consultas == 1
+    assert medicion.filas == 4
+
+
+def test_cursor_medido_cuenta_filas_al_iterar():
+    medicion = MedicionSolicitud()
+    cursor = CursorMedido(CursorFalso([(1,), (2,), (3,)]), medicion)
+
+    assert [fila for fila in cursor] == [(1,), (2,), (3,)]
+    assert medicion.filas == 3
+
+
+def test_lentas_solo_sobre_el_umbral_y_sin_parametros():
+    medicion = MedicionSolicitud(maximo_lentas=2)
+    medicion.registrar_sentencia("SELECT * FROM t WHERE doc = '1'", ("1",), 0.05)
+    medicion.registrar_sentencia("SELECT * FROM a WHERE id = 9", None, 0.3)
+    medicion.registrar_sentencia("SELECT * FROM b WHERE id = %s", (1, 2), 0.2)
+
+    assert medicion.lentas(0.1) == [
+        (0.3, "SELECT * FROM a WHERE id = ?", 0),
+        (0.2, "SELECT * FROM b WHERE id = %s", 2),
+    ]
+    assert medicion.consultas == 3
+
+
+def test_server_timing():
+    medicion = MedicionSolicitud()
+    medicion.registrar_sentencia("SELECT 1", None, 0.002)
+    medicion.registrar_filas(5, 0.001)
+    medicion.registrar_conexion(0.0005)
+
+    assert medicion.server_timing(0.01) == (
+        'db;dur=3.0;desc="1 consultas, 5 filas", '
+        'conexion;dur=0.5;desc="1 conexiones", '
+        'total;dur=10.0'
+    )
+
+
+def test_medicion_solo_dentro_de_la_peticion():
+    assert instrumentacion.medicion_actual() is None
+    medicion, token = instrumentacion.iniciar_medicion()
+    assert instrumentacion.medicion_actual() is medicion
+    instrumentacion.terminar_medicion(token)
+    assert instrumentacion.medicion_actual() is None
+
+
+def test_verificar_presupuestos_lanza_y_vacia_el_registro():
+    instrumentacion.verificar_presupuestos()
+    instrumentacion.registrar_presupuesto_excedido("GET /x ejecutó 9 consultas (presupuesto: 3)")
+
+    with pytest.raises(PresupuestoConsultasExcedido, match="GET /x"):
+        instrumentacion.verificar_presupuestos()
+    instrumentacion.verificar_presupuestos()
+
+
+def test_presupuesto_estricto_marca_la_respuesta_sin_error(monkeypatch):
+    testclient = pytest.importorskip("fastapi.testclient")
+    import main
+
+    monkeypatch.setitem(main.INSTRUMENTACION_CONFIG, "presupuesto_estricto", True)
+    monkeypatch.setitem(main.PRESUPUESTO_CONSULTAS, "GET /", -1)
+
+    respuesta = testclient.TestClient(main.app).get("/")
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers["X-Presupuesto-Consultas-Excedido"] == "0/-1"
+    assert respuesta.headers["Server-Timing"].startswith('db;dur=0.0;desc="0 consultas, 0 filas"')
+    with pytest.raises(PresupuestoConsultasExcedido):
+        instrumentacion.verificar_presupuestos()
@@ -0,0 +1,172 @@
+import threading
+
+import pytest
+from mysql.connector import Error
+
+from database import pool as pool_module
+from database.pool import ConnectionPool, PoolTimeoutError
+
+
+class ConexionFalsa:
+    """Conexión de mysql.connector mínima para el pool"""
+
+    def __init__(self):
+        self.cerrada = False
+        self.pings = 0
+        self.sana = True
+        self.unread_result = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return not self.cerrada
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.sana:
+            raise Error("conexión perdida")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.cerrada = True
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(pool_module.time, "monotonic", reloj)
+    return reloj
+
+
+def crear_pool(monkeypatch, **opciones):
+    creadas = []
+
+    def conectar(self):
+        conexion = ConexionFalsa()
+        creadas.append(conexion)
+        return conexion
+
+    monkeypatch.setattr(ConnectionPool, "_connect", conectar)
+    return ConnectionPool({}, **opciones), creadas
+
+
+def test_reutiliza_la_conexion_devuelta(monkeypatch):
+    pool, creadas = crear_pool(monkeypatch, pool_size=2)
+
+    primera = pool.acquire()
+    primera.close()
+    segunda = pool.acquire()
+
+    assert len(creadas) == 1
+    assert segunda._raw is creadas[0]
+    assert pool.stats()["en_uso"] == 1
+
+
+def test_agotado_lanza_timeout(monkeypatch):
+    pool, _ = crear_pool(monkeypatch, pool_size=1, wait_timeout=0.05)
+
+    pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    estadisticas = pool.stats()
+    assert estadisticas["timeouts"] == 1
+    assert estadisticas["abiertas"] == 1
+    assert estadisticas["esperando"] == 0
+
+
+def test_espera_hasta_que_se_devuelva_una_conexion(monkeypatch):
+    pool, creadas = crear_pool(monkeypatch, pool_size=1, wait_timeout=5)
+    prestada = pool.acquire()
+
+    threading.Timer(0.05, prestada.close).start()
+    segunda = pool.acquire()
+
+    assert segunda._raw is creadas[0]
+
+
+def test_recicla_conexiones_vencidas(monkeypatch, reloj):
+    pool, creadas = crear_pool(monkeypatch, pool_size=2, max_lifetime=60)
+
+    pool.acquire().close()
+    reloj.ahora += 61
+    nueva = pool.acquire()
+
+    assert len(creadas) == 2
+    assert creadas[0].cerrada
+    assert nueva._raw is creadas[1]
+    assert pool.stats()["recicladas"] == 1
+    assert pool.stats()["abiertas"] == 1
+
+
+def test_vencida_al_devolverla_no_vuelve_al_pool(monkeypatch, reloj):
+    pool, creadas = crear_pool(monkeypatch, pool_size=2, max_lifetime=60)
+
+    prestada = pool.acquire()
+    reloj.ahora += 61
+    prestada.close()
+
+    assert creadas[0].cerrada
+    assert pool.stats()["libres"] == 0
+    assert pool.stats()["abiertas"] == 0
+
+
+def test_ping_solo_tras_inactividad(monkeypatch, reloj):
+    pool, creadas = crear_pool(monkeypatch, pool_size=1, health_check_after=30)
+
+    pool.acquire().close()
+    reloj.ahora += 10
+    pool.acquire().close()
+    assert creadas[0].pings == 0
+
+    reloj.ahora += 31
+    pool.acquire().close()
+    assert creadas[0].pings == 1
+
+
+def test_descarta_conexion_caida(monkeypatch, reloj):
+    pool, creadas = crear_pool(monkeypatch, pool_size=1, health_check_after=30)
+
+    pool.acquire().close()
+    creadas[0].sana = False
+    reloj.ahora += 31
+    nueva = pool.acquire()
+
+    assert nueva._raw is creadas[1]
+    assert pool.stats()["descartadas"] == 1
+
+
+def test_revierte_transaccion_abierta_al_devolver(monkeypatch):
+    pool, creadas = crear_pool(monkeypatch, pool_size=1)
+
+    prestada = pool.acquire()
+    creadas[0].in_transaction = True
+    prestada.close()
+    prestada.close()
+
+    assert creadas[0].rollbacks == 1
+    assert pool.stats()["libres"] == 1
+
+
+def test_error_al_conectar_libera_el_cupo(monkeypatch):
+    def fallar(self):
+        raise Error("sin servidor")
+
+    monkeypatch.setattr(ConnectionPool, "_connect", fallar)
+    pool = ConnectionPool({}, pool_size=1, wait_timeout=0.05)
+
+    with pytest.raises(Error):
+        pool.acquire()
+    assert pool.stats()["abiertas"] == 0
+    assert pool.stats()["en_uso"] == 0
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+
+from models.sorteo import PreparacionSorteoResponse
+from services import preparacion_service
+from services.preparacion_service import PreparacionService, SemillaNoRevelableError
+
+
+class ConexionFalsa:
+    """Conexión con un cursor de diccionarios que devuelve siempre la misma fila"""
+
+    def __init__(self, fila):
+        self.fila = fila
+
+    def cursor(self, dictionary=False):
+        return self
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return dict(self.fila) if self.fila else None
+
+    def close(self):
+        pass
+
+
+def usar_fila(monkeypatch, fila):
+    monkeypatch.setattr(
+        preparacion_service.DatabaseConnection, "get_connection", staticmethod(lambda: ConexionFalsa(fila))
+    )
+
+
+def test_la_respuesta_publica_no_incluye_la_semilla():
+    assert "semilla" not in PreparacionSorteoResponse.model_fields
+
+
+def test_auditoria_solo_con_el_sorteo_finalizado(monkeypatch):
+    fila = {"id_sorteo": 3, "semilla": 987654321, "total": 10, "fecha_preparacion": datetime(2024, 1, 1)}
+
+    usar_fila(monkeypatch, {**fila, "estado": "activo"})
+    with pytest.raises(SemillaNoRevelableError):
+        PreparacionService.obtener_auditoria(3)
+
+    usar_fila(monkeypatch, {**fila, "estado": "finalizado"})
+    assert PreparacionService.obtener_auditoria(3).semilla == 987654321
+
+
+def test_auditoria_sin_preparacion(monkeypatch):
+    usar_fila(monkeypatch, None)
+
+    assert PreparacionService.obtener_auditoria(3) is None
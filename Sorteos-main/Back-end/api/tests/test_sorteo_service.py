@@ -0,0 +1,266 @@
+"""
+Cupo de ganadores, reserva de números y conteos de la creación masiva con
+una conexión falsa: cada sentencia se responde según su texto.
+"""
+
+import re
+from datetime import datetime
+
+import pytest
+
+from models.participante import Participante
+from models.sorteo import EstadoParticipacion, EstadoSorteo
+from services import sorteo_service
+from services.sorteo_service import SorteoService
+
+
+def _normalizar(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip()
+
+
+class CursorFalso:
+    def __init__(self, base, dictionary=False):
+        self.base = base
+        self.dictionary = dictionary
+        self.rowcount = 0
+        self._filas = []
+        self.cerrado = False
+
+    def execute(self, query, params=None):
+        query = _normalizar(query)
+        self.base.ejecutadas.append((query, tuple(params) if params else ()))
+        filas, self.rowcount = self.base.responder(query, tuple(params) if params else ())
+        self._filas = list(filas)
+
+    def fetchone(self):
+        return self._filas.pop(0) if self._filas else None
+
+    def fetchall(self):
+        filas, self._filas = self._filas, []
+        return filas
+
+    def close(self):
+        self.cerrado = True
+
+
+class BaseFalsa:
+    """Conexión falsa; `responder(query, params)` retorna (filas, rowcount)"""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.ejecutadas = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, dictionary=False):
+        return CursorFalso(self, dictionary)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+    def consultas(self, inicio: str):
+        return [(query, params) for query, params in self.ejecutadas if query.startswith(inicio)]
+
+
+@pytest.fixture
+def contadores(monkeypatch):
+    ajustes = []
+
+    def ajustar(cursor, sorteo_id, **deltas):
+        ajustes.append((sorteo_id, deltas))
+
+    monkeypatch.setattr(sorteo_service.ContadoresSorteo, "ajustar", staticmethod(ajustar))
+    return ajustes
+
+
+def usar_base(monkeypatch, base):
+    monkeypatch.setattr(sorteo_service.DatabaseConnection, "get_connection", staticmethod(lambda *a, **k: base))
+
+
+# --- _bloquear_cupo ---
+
+def test_bloquear_cupo_bloquea_la_fila_y_completa_valores_por_defecto():
+    base = BaseFalsa(lambda query, params: ([{
+        "estado": "activo", "cantidad_premio": None, "ganadores_simultaneos": None, "ganadores_actuales": 2
+    }], 1))
+
+    cupo = SorteoService._bloquear_cupo(base, 5)
+
+    assert cupo == {"estado": "activo", "cantidad_premio": 1, "ganadores_simultaneos": 1, "ganadores_actuales": 2}
+    query, params = base.ejecutadas[0]
+    assert query.endswith("FOR UPDATE")
+    assert params == (5,)
+
+
+def test_bloquear_cupo_sorteo_inexistente():
+    base = BaseFalsa(lambda query, params: ([], 0))
+
+    assert SorteoService._bloquear_cupo(base, 5) is None
+
+
+# --- _reservar_numeros ---
+
+def test_reservar_numeros_retorna_el_primero_del_bloque():
+    def responder(query, params):
+        if query == "SELECT LAST_INSERT_ID()":
+            # ultimo_numero pasó de 10 a 13
+            return [(13,)], 1
+        return [], 1
+
+    base = BaseFalsa(responder)
+
+    assert SorteoService._reservar_numeros(base.cursor(), 5, 3) == 11
+    update, params = base.ejecutadas[0]
+    assert "LAST_INSERT_ID(ultimo_numero + %s)" in update
+    assert params == (3, 5)
+
+
+# --- crear_sorteo_con_participantes ---
+
+def test_crear_sorteo_cuenta_duplicados_existentes_y_carreras(monkeypatch, contadores):
+    monkeypatch.setattr(sorteo_service.secuencias, "insertar_con_id_asignado", lambda cursor, query, params: 7)
+
+    def responder(query, params):
+        if query == "SELECT LAST_INSERT_ID()":
+            return [(4,)], 1
+        if query.startswith("SELECT documento FROM participantes"):
+            # "B" ya estaba registrado
+            return [("B",)], 1
+        if query.startswith("INSERT IGNORE INTO participantes"):
+            # De los nuevos (A, C y D) solo entra uno: los otros los insertó otro proceso
+            return [], 1
+        if query.startswith("INSERT IGNORE INTO detalle_sorteo"):
+            return [], len(params) // 5
+        return [], 1
+
+    base = BaseFalsa(responder)
+    usar_base(monkeypatch, base)
+    participantes = [Participante(documento=d, nombre=d) for d in ("A", "B", "A", "C", "D")]
+
+    resultado = SorteoService.crear_sorteo_con_participantes("Rifa", participantes)
+
+    assert resultado.sorteo_id == 7
+    assert resultado.participantes_registrados == 1
+    # Tres del lote que no se insertaron (B ya existía, dos perdieron la carrera) y la A repetida
+    assert resultado.participantes_existentes == 4
+    assert resultado.errores == ["Participante A ya está asignado al sorteo"]
+    assert base.commits == 1
+
+    # Un número por participante único, consecutivos desde el reservado
+    _, params = base.consultas("INSERT IGNORE INTO detalle_sorteo")[0]
+    filas = [params[i:i + 5] for i in range(0, len(params), 5)]
+    assert [(fila[1], fila[4]) for fila in filas] == [("A", 1), ("B", 2), ("C", 3), ("D", 4)]
+    assert contadores == [(7, {"participantes": 4, "elegibles": 4})]
+
+
+def test_crear_sorteo_revierte_ante_error(monkeypatch, contadores):
+    monkeypatch.setattr(sorteo_service.secuencias, "insertar_con_id_asignado", lambda cursor, query, params: 7)
+
+    def responder(query, params):
+        if query.startswith("INSERT IGNORE INTO detalle_sorteo"):
+            raise sorteo_service.mysql.connector.Error("se perdió la conexión")
+        if query == "SELECT LAST_INSERT_ID()":
+            return [(1,)], 1
+        return [], 1
+
+    base = BaseFalsa(responder)
+    usar_base(monkeypatch, base)
+
+    resultado = SorteoService.crear_sorteo_con_participantes("Rifa", [Participante(documento="A", nombre="A")])
+
+    assert resultado.sorteo_id == 0
+    assert resultado.participantes_registrados == 0
+    assert base.rollbacks == 1
+    assert base.commits == 0
+    assert contadores == []
+
+
+# --- sortear_ganadores ---
+
+@pytest.fixture
+def sin_eventos(monkeypatch):
+    monkeypatch.setattr(sorteo_service.EventosSorteo, "registrar_ganadores", staticmethod(lambda *a, **k: None))
+    monkeypatch.setattr(sorteo_service.EventosSorteo, "notificar", staticmethod(lambda: None))
+
+
+def base_sorteo(cupo, marcados=None):
+    """Sorteo con el `cupo` dado; el UPDATE de ganadores afecta `marcados` filas"""
+    def responder(query, params):
+        if query.startswith("SELECT estado, cantidad_premio"):
+            return ([dict(cupo)] if cupo else []), 1
+        if query.startswith("UPDATE detalle_sorteo"):
+            ids = params[2:len(params) - len(sorteo_service.ESTADOS_ELEGIBLES)]
+            return [], len(ids) if marcados is None else marcados
+        if query.startswith("SELECT ds.*"):
+            ids = params[:-1]
+            return [{
+                "id": detalle_id, "id_sorteo": 5, "documento_participante": f"doc{detalle_id}",
+                "nombre_participante": f"Participante {detalle_id}", "estado": EstadoParticipacion.GANADOR.value,
+                "fecha_asignacion": datetime(2024, 1, 1), "fecha_ganador": datetime(2024, 1, 2), "numero": detalle_id
+            } for detalle_id in ids], len(ids)
+        return [], 0
+
+    return BaseFalsa(responder)
+
+
+def cupo(estado=EstadoSorteo.ACTIVO.value, premio=5, simultaneos=3, actuales=0):
+    return {"estado": estado, "cantidad_premio": premio, "ganadores_simultaneos": simultaneos, "ganadores_actuales": actuales}
+
+
+def test_sortear_ganadores_respeta_el_cupo_restante(monkeypatch, contadores, sin_eventos):
+    pedidos = []
+
+    def siguientes(connection, sorteo_id, cantidad):
+        pedidos.append(cantidad)
+        return [30, 10][:cantidad]
+
+    monkeypatch.setattr(SorteoService, "_siguientes_participantes", staticmethod(siguientes))
+    base = base_sorteo(cupo(premio=5, simultaneos=3, actuales=3))
+    usar_base(monkeypatch, base)
+
+    ganadores = SorteoService.sortear_ganadores(5)
+
+    # Quedaban 2 premios aunque se sortean 3 a la vez
+    assert pedidos == [2]
+    # En el orden en que salieron sorteados
+    assert [ganador.id for ganador in ganadores] == [30, 10]
+    assert contadores == [(5, {"elegibles": -2, "ganadores": 2})]
+    assert base.commits == 1
+
+
+def test_sortear_ganadores_sin_premios_no_marca(monkeypatch, contadores, sin_eventos):
+    monkeypatch.setattr(
+        SorteoService, "_siguientes_participantes",
+        staticmethod(lambda *a: pytest.fail("no debe sortear con el cupo completo"))
+    )
+    base = base_sorteo(cupo(premio=3, actuales=3))
+    usar_base(monkeypatch, base)
+
+    assert SorteoService.sortear_ganadores(5) == []
+    assert base.consultas("UPDATE") == []
+    assert contadores == []
+
+
+def test_sortear_ganadores_sorteo_no_activo(monkeypatch, contadores, sin_eventos):
+    base = base_sorteo(cupo(estado=EstadoSorteo.FINALIZADO.value))
+    usar_base(monkeypatch, base)
+
+    assert SorteoService.sortear_ganadores(5) is None
+    assert base.consultas("UPDATE") == []
+
+
+def test_sortear_ganadores_cuenta_solo_las_filas_marcadas(monkeypatch, contadores, sin_eventos):
+    # Uno de los sorteados dejó de ser elegible entre la selección y el UPDATE
+    monkeypatch.setattr(SorteoService, "_siguientes_participantes", staticmethod(lambda *a: [1, 2]))
+    base = base_sorteo(cupo(), marcados=1)
+    usar_base(monkeypatch, base)
+
+    SorteoService.sortear_ganadores(5)
+
+    assert contadores == [(5, {"elegibles": -1, "ganadores": 1})]
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from database import unidad_trabajo
+from database.unidad_trabajo import TransaccionPeticion, transaccion_de_peticion, unidad_de_trabajo
+
+
+class ConexionFalsa:
+    """Conexión del pool mínima: registra commits, rollbacks y cierres en orden"""
+
+    def __init__(self, registro):
+        self.registro = registro
+        self.unread_result = False
+        self.in_transaction = False
+
+    def commit(self):
+        self.registro.append("commit")
+
+    def rollback(self):
+        self.registro.append("rollback")
+
+    def close(self):
+        self.registro.append("close")
+
+
+@pytest.fixture
+def registro(monkeypatch):
+    registro = []
+    monkeypatch.setattr(unidad_trabajo.UnidadTrabajo, "_adquirir", staticmethod(lambda: ConexionFalsa(registro)))
+    return registro
+
+
+@pytest.fixture
+def cliente():
+    router = APIRouter(dependencies=[Depends(unidad_de_trabajo)])
+
+    @router.put("/ok")
+    def ok(transaccion: TransaccionPeticion = Depends(transaccion_de_peticion, scope="function")):
+        transaccion.al_confirmar(lambda: transaccion.connection.registro.append("aviso"))
+        return {"ok": True}
+
+    @router.put("/no-encontrado")
+    def no_encontrado(transaccion: TransaccionPeticion = Depends(transaccion_de_peticion, scope="function")):
+        transaccion.al_confirmar(lambda: transaccion.connection.registro.append("aviso"))
+        raise HTTPException(status_code=404, detail="no existe")
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_confirma_una_vez_y_avisa_despues_del_commit(registro, cliente):
+    assert cliente.put("/ok").status_code == 200
+
+    # Devuelta a la unidad de trabajo y después al pool
+    assert registro == ["commit", "aviso", "close"]
+
+
+def test_una_http_exception_revierte_sin_avisar(registro, cliente):
+    assert cliente.put("/no-encontrado").status_code == 404
+
+    assert registro == ["rollback", "close"]
@@ -19,7 +19,13 @@ CREATE TABLE `sorteo` (
   `cantidad_premio` int(11) DEFAULT 1,
   `imagen` varchar(500) DEFAULT NULL,
   `ganadores_simultaneos` int(11) NOT NULL DEFAULT 1,
-  PRIMARY KEY (`id`)
+  `ultimo_numero` int(11) NOT NULL DEFAULT 0,
+  `total_participantes` int(11) NOT NULL DEFAULT 0,
+  `total_elegibles` int(11) NOT NULL DEFAULT 0,
+  `total_ganadores` int(11) NOT NULL DEFAULT 0,
+  `version` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`id`),
+  KEY `idx_sorteo_estado_fecha` (`estado`,`fecha_creacion`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
  
 -- junio5.detalle_sorteo 
@@ -27,15 +33,61 @@ CREATE TABLE `sorteo` (
 CREATE TABLE `detalle_sorteo` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
   `id_sorteo` int(11) NOT NULL,
+  `numero` int(11) DEFAULT NULL,
   `documento_participante` varchar(50) NOT NULL,
   `estado` enum('participando','ganador','perdedor','eliminado','descalificado') DEFAULT 'participando',
   `fecha_asignacion` timestamp NOT NULL DEFAULT current_timestamp(),
   `fecha_ganador` timestamp NULL DEFAULT NULL,
   PRIMARY KEY (`id`),
-  UNIQUE KEY `unique_sorteo_participante` (`id_sorteo`,`documento_participante`),
   UNIQUE KEY `uq_sorteo_participante` (`id_sorteo`,`documento_participante`),
+  UNIQUE KEY `uq_sorteo_numero` (`id_sorteo`,`numero`),
   KEY `fk_detalle_sorteo_participante` (`documento_participante`),
+  KEY `idx_detalle_sorteo_rango` (`id_sorteo`,`id`),
+  KEY `idx_detalle_sorteo_estado` (`id_sorteo`,`estado`,`documento_participante`),
   CONSTRAINT `fk_detalle_sorteo_participante` FOREIGN KEY (`documento_participante`) REFERENCES `participantes` (`documento`) ON DELETE CASCADE,
   CONSTRAINT `fk_detalle_sorteo_sorteo` FOREIGN KEY (`id_sorteo`) REFERENCES `sorteo` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB AUTO_INCREMENT=3528 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
- 
\ No newline at end of file
+ 
+-- junio5.sorteo_preparacion 
+
+CREATE TABLE `sorteo_preparacion` (
+  `id_sorteo` int(11) NOT NULL,
+  `semilla` bigint(20) UNSIGNED NOT NULL,
+  `total` int(11) NOT NULL,
+  `posicion` int(11) NOT NULL DEFAULT 0,
+  `orden` longblob NOT NULL,
+  `fecha_preparacion` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`id_sorteo`),
+  CONSTRAINT `fk_sorteo_preparacion_sorteo` FOREIGN KEY (`id_sorteo`) REFERENCES `sorteo` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+ 
+-- junio5.sorteo_id_secuencia / sorteo_id_libre (asignación de IDs de sorteo)
+
+CREATE TABLE `sorteo_id_secuencia` (
+  `nombre` varchar(50) NOT NULL,
+  `siguiente` int(11) NOT NULL,
+  PRIMARY KEY (`nombre`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE `sorteo_id_libre` (
+  `id` int(11) NOT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TRIGGER `trg_sorteo_liberar_id` AFTER DELETE ON `sorteo`
+FOR EACH ROW INSERT IGNORE INTO `sorteo_id_libre` (`id`) VALUES (OLD.`id`);
+
+INSERT INTO `sorteo_id_secuencia` (`nombre`, `siguiente`) VALUES ('sorteo', 1);
+ 
+-- junio5.sorteo_evento (eventos enviados a las pantallas)
+
+CREATE TABLE `sorteo_evento` (
+  `id` bigint(20) NOT NULL AUTO_INCREMENT,
+  `id_sorteo` int(11) NOT NULL,
+  `tipo` varchar(30) NOT NULL,
+  `datos` text NOT NULL,
+  `fecha` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`id`),
+  KEY `idx_sorteo_evento_sorteo` (`id_sorteo`,`id`),
+  CONSTRAINT `fk_sorteo_evento_sorteo` FOREIGN KEY (`id_sorteo`) REFERENCES `sorteo` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;